@@ -112,9 +112,14 @@ build_app() {
     # Pulizia della build precedente
     clean_previous_build
 
+    # Compila le tabelle di lookup caricate su richiesta (vedi tools/map_tables.py)
+    PYTHONPATH="$SCRIPT_DIR/src" python -m visualex_ui.tools.map_tables
+
     # Esegui il comando PyInstaller
     pyinstaller --onedir --windowed \
         --add-data "$SCRIPT_DIR/src/visualex_ui/resources/icon.icns:resources" \
+        --add-data "$SCRIPT_DIR/src/visualex_ui/resources/brocardi_map.marshal:resources" \
+        --hidden-import visualex_ui.tools.brocardi_map \
         --add-data "$SCRIPT_DIR/src/visualex_ui/resources/custom_style.qss:resources" \
         --add-data "$SCRIPT_DIR/src/visualex_ui/resources/version.txt:resources" \
         --name "$output_name" --icon "$icon_path" \
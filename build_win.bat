@@ -114,8 +114,12 @@ REM Funzione per costruire l'applicazione
     REM Pulizia della build precedente
     call :CLEAN_PREVIOUS_BUILD
 
+    REM Compila le tabelle di lookup caricate su richiesta (vedi tools/map_tables.py)
+    set "PYTHONPATH=%SCRIPT_DIR%src"
+    python -m visualex_ui.tools.map_tables
+
     REM Esegui il comando PyInstaller
-    pyinstaller --onedir --windowed --add-data "%SCRIPT_DIR%src\visualex_ui\resources;visualex_ui/resources" --name "%output_name%" --icon "%icon_path%" --noconfirm "%SCRIPT_DIR%src\main.py"
+    pyinstaller --onedir --windowed --add-data "%SCRIPT_DIR%src\visualex_ui\resources;visualex_ui/resources" --add-data "%SCRIPT_DIR%src\visualex_ui\resources\brocardi_map.marshal;resources" --hidden-import visualex_ui.tools.brocardi_map --name "%output_name%" --icon "%icon_path%" --noconfirm "%SCRIPT_DIR%src\main.py"
 
     REM Controlla se la build è stata creata correttamente
     if exist "dist\%output_name%\%output_name%.exe" (
@@ -1,12 +1,25 @@
 # main.py
 import sys
+from visualex_ui.utils.startup_profiler import StartupProfiler, profiling_requested
+
+# Il profiler va creato prima degli altri import, per misurarli (python main.py --profile-startup)
+profiler = StartupProfiler(detailed=profiling_requested())
+
 from PyQt6.QtWidgets import QApplication
+from PyQt6.QtCore import QTimer
+from visualex_ui.utils.logging_setup import setup_logging
 from visualex_ui.components.main_window import NormaViewer
 
 def main():
+    setup_logging()
+    profiler.mark("import")
     app = QApplication(sys.argv)
+    profiler.mark("QApplication")
     viewer = NormaViewer()
+    profiler.mark("NormaViewer")
     viewer.show()
+    # Eseguito dal primo giro dell'event loop, dopo che la finestra è stata mostrata
+    QTimer.singleShot(0, profiler.finish)
     sys.exit(app.exec())
 
 if __name__ == "__main__":
@@ -1,8 +1,9 @@
 # visualex_ui/components/brocardi_dock.py
-from PyQt6.QtWidgets import QDockWidget, QVBoxLayout, QWidget, QLabel, QTabWidget, QListWidget, QTextBrowser, QListWidgetItem, QScrollArea, QSizePolicy
-from PyQt6.QtCore import Qt, QSize
+from PyQt6.QtWidgets import QDockWidget, QVBoxLayout, QWidget, QLabel, QTabWidget, QTextBrowser, QScrollArea, QSizePolicy
+from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QTextOption
 import logging
+from .brocardi_list import BrocardiListModel, BrocardiListView
 
 class BrocardiDockWidget(QDockWidget):
     def __init__(self, parent):
@@ -58,7 +59,7 @@ class BrocardiDockWidget(QDockWidget):
             return
 
         # Se la posizione è valida, aggiorna il contenuto
-        logging.info(f"Aggiungo informazioni Brocardi con posizione: {position}")
+        logging.info("Aggiungo informazioni Brocardi con posizione: %s", position)
         
         # Incorpora il link all'interno della posizione e rendi l'etichetta cliccabile
         html_text = f'<a href="{link}">{position}</a>'
@@ -80,33 +81,15 @@ class BrocardiDockWidget(QDockWidget):
     def add_dynamic_list_tab(self, section_name, content):
         """
         Crea una tab dinamica con una lista di item per Brocardi o Massime.
+        La lista è un modello con una vista virtualizzata: vengono impaginate e disegnate solo le righe visibili.
         """
         tab = QWidget()
 
-        # Crea il QListWidget con elementi wrappati
-        list_widget = QListWidget()
-        list_widget.setSelectionMode(QListWidget.SelectionMode.NoSelection)
-        list_widget.setStyleSheet("QListWidget::item { border: 1px solid #4E878C; margin: 4px; padding: 8px; }")
-
-        # Abilita il wrapping del testo negli elementi
-        list_widget.setWordWrap(True)
-        list_widget.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)  # Disabilita scrollbar orizzontale
-        list_widget.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)    # Abilita scrollbar verticale se necessario
-
-        # Aggiungi gli item alla lista
-        for item_text in content:
-            item_text = item_text.strip()
-            self.create_collapsible_list_item(item_text, list_widget)
-
-        # Avvolgi il QListWidget in una QScrollArea
-        scroll_area = QScrollArea()
-        scroll_area.setWidgetResizable(True)
-        scroll_area.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)  # Disabilita scrollbar orizzontale
-        scroll_area.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)     # Abilita scrollbar verticale se necessario
-        scroll_area.setWidget(list_widget)
+        list_view = BrocardiListView()
+        list_view.setModel(BrocardiListModel(content, list_view))
 
         tab_layout = QVBoxLayout()
-        tab_layout.addWidget(scroll_area)
+        tab_layout.addWidget(list_view)
         tab.setLayout(tab_layout)
 
         # Aggiungi la tab dinamica al widget tabs
@@ -144,41 +127,6 @@ class BrocardiDockWidget(QDockWidget):
         self.dynamic_tabs[section_name] = tab
 
 
-    def create_collapsible_list_item(self, text, parent_widget):
-        """
-        Crea un elemento QListWidgetItem con un QTextBrowser all'interno per gestire il testo lungo.
-        """
-        if not text.strip():  # Verifica se l'elemento è un riempitivo (stringa vuota o solo spazi)
-            # Crea un riempitivo senza widget aggiuntivi
-            item = QListWidgetItem(parent_widget)
-            item.setSizeHint(QSize(0, 20))  # Altezza fissa per il riempitivo
-            item.setFlags(Qt.ItemFlag.NoItemFlags)  # Nessuna interazione per il riempitivo
-            return
-
-        # Creiamo un item per il QListWidget
-        item = QListWidgetItem(parent_widget)
-        item_widget = QWidget()  # Crea un QWidget per ospitare il layout
-
-        # Layout verticale per contenere QTextBrowser
-        layout = QVBoxLayout()
-        layout.setContentsMargins(0, 0, 0, 0)  # Rimuovi i margini per evitare il ritaglio
-
-        # QTextBrowser per visualizzare il testo lungo
-        text_browser = QTextBrowser()
-        text_browser.setText(text)
-        text_browser.setOpenExternalLinks(True)  # Permette di cliccare su link se presenti
-        text_browser.setWordWrapMode(QTextOption.WrapMode.WordWrap)  # Abilita il wrapping del testo
-        text_browser.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)  # Disabilita scrollbar orizzontale
-        text_browser.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)    # Se non vuoi scrolling verticale in questo widget
-        text_browser.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Minimum)
-
-        # Aggiungi QTextBrowser al layout
-        layout.addWidget(text_browser)
-
-        item_widget.setLayout(layout)
-        item.setSizeHint(item_widget.sizeHint())  # Assicurati che l'elemento abbia la dimensione corretta
-        parent_widget.setItemWidget(item, item_widget)  # Imposta il widget come item di QListWidget
-
     def clear_dynamic_tabs(self):
         """Pulisce le tabs dinamiche esistenti."""
         self.tabs.clear()
@@ -208,13 +156,13 @@ class BrocardiDockWidget(QDockWidget):
         """
         Extract content from a specific tab widget.
         """
-        # Example implementation to extract text from QListWidget or QTextBrowser inside the tab
+        # Extract text from the BrocardiListView or QTextBrowser inside the tab
         content_list = []
-        if isinstance(tab_widget, QListWidget):
-            for index in range(tab_widget.count()):
-                item = tab_widget.item(index)
-                content_list.append(item.text())
-        elif isinstance(tab_widget, QTextBrowser):
-            content_list.append(tab_widget.toPlainText())
-        
+        list_view = tab_widget.findChild(BrocardiListView)
+        text_browser = tab_widget.findChild(QTextBrowser)
+        if list_view is not None:
+            content_list.extend(list_view.plain_texts())
+        elif text_browser is not None:
+            content_list.append(text_browser.toPlainText())
+
         return "\n".join(content_list)
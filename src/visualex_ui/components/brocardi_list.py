@@ -0,0 +1,214 @@
+# visualex_ui/components/brocardi_list.py
+from collections import OrderedDict
+from PyQt6.QtWidgets import QListView, QStyledItemDelegate, QStyleOptionViewItem, QAbstractItemView
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex, QSize, QRect, QPointF, QUrl
+from PyQt6.QtGui import QTextDocument, QTextOption, QColor, QPen, QDesktopServices, QAbstractTextDocumentLayout, QPalette
+import logging
+
+PlainTextRole = Qt.ItemDataRole.UserRole + 1  # Testo dell'elemento senza markup, per la copia
+
+FILLER_HEIGHT = 20  # Altezza degli elementi vuoti usati come riempitivo
+ITEM_MARGIN = 4
+ITEM_PADDING = 8
+BORDER_COLOR = "#4E878C"
+DOCUMENT_CACHE_SIZE = 64  # Documenti impaginati tenuti in memoria, all'incirca le righe visibili
+
+
+def make_document(text, width=None, font=None):
+    """Crea il QTextDocument di un elemento, interpretando il testo come HTML solo se lo sembra."""
+    document = QTextDocument()
+    document.setDocumentMargin(0)
+    document.setDefaultTextOption(QTextOption(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignTop))
+    if font is not None:
+        document.setDefaultFont(font)
+    if Qt.mightBeRichText(text):
+        document.setHtml(text)
+    else:
+        document.setPlainText(text)
+    if width is not None:
+        document.setTextWidth(max(width, 1))
+    return document
+
+
+class BrocardiListModel(QAbstractListModel):
+    """
+    Modello di sola lettura per i Brocardi e le Massime di un articolo.
+    Conserva soltanto le stringhe: l'impaginazione è lasciata al delegate, che la fa per le sole righe visibili.
+    """
+
+    def __init__(self, items=None, parent=None):
+        super().__init__(parent)
+        self._items = []
+        self._plain_texts = {}  # riga -> testo senza markup, calcolato alla prima copia
+        self.set_items(items or [])
+
+    def set_items(self, items):
+        self.beginResetModel()
+        self._items = [item.strip() for item in items]
+        self._plain_texts = {}
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._items)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or not 0 <= index.row() < len(self._items):
+            return None
+        row = index.row()
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self._items[row]
+        if role == PlainTextRole:
+            if row not in self._plain_texts:
+                self._plain_texts[row] = make_document(self._items[row]).toPlainText().strip()
+            return self._plain_texts[row]
+        return None
+
+    def flags(self, index):
+        if not index.isValid() or not self._items[index.row()]:
+            return Qt.ItemFlag.NoItemFlags  # Nessuna interazione per il riempitivo
+        return Qt.ItemFlag.ItemIsEnabled
+
+    def plain_texts(self):
+        """Restituisce il testo di tutti gli elementi non vuoti, nell'ordine della lista."""
+        texts = (self.data(self.index(row), PlainTextRole) for row in range(len(self._items)))
+        return [text for text in texts if text]
+
+
+class RichTextDelegate(QStyledItemDelegate):
+    """
+    Disegna ogni elemento come testo formattato dentro un riquadro, senza creare widget.
+
+    Le altezze delle righe sono memorizzate per larghezza, così lo scorrimento non reimpagina nulla;
+    i documenti impaginati più recenti restano in una piccola cache LRU per il disegno e i clic sui link.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._width = None
+        self._heights = {}  # riga -> altezza, valida per self._width
+        self._documents = OrderedDict()  # (riga, larghezza) -> QTextDocument
+
+    def clear_cache(self):
+        self._width = None
+        self._heights.clear()
+        self._documents.clear()
+
+    def _text_width(self, option):
+        width = option.rect.width()
+        if width <= 0 and isinstance(self.parent(), QListView):
+            width = self.parent().viewport().width()  # La vista non sempre passa il rettangolo dell'elemento
+        return width - 2 * (ITEM_MARGIN + ITEM_PADDING)
+
+    def document(self, index, text_width, font=None):
+        key = (index.row(), text_width)
+        document = self._documents.get(key)
+        if document is None:
+            document = make_document(index.data(Qt.ItemDataRole.DisplayRole) or "", text_width, font)
+            self._documents[key] = document
+            if len(self._documents) > DOCUMENT_CACHE_SIZE:
+                self._documents.popitem(last=False)
+        else:
+            self._documents.move_to_end(key)
+        return document
+
+    def sizeHint(self, option, index):
+        text = index.data(Qt.ItemDataRole.DisplayRole)
+        if not text:
+            return QSize(0, FILLER_HEIGHT)
+        text_width = self._text_width(option)
+        if text_width != self._width:
+            # La vista è stata ridimensionata: le altezze memorizzate non valgono più
+            self._width = text_width
+            self._heights.clear()
+        height = self._heights.get(index.row())
+        if height is None:
+            document = self.document(index, text_width, option.font)
+            height = int(document.size().height()) + 2 * (ITEM_MARGIN + ITEM_PADDING)
+            self._heights[index.row()] = height
+        return QSize(option.rect.width(), height)
+
+    def paint(self, painter, option, index):
+        text = index.data(Qt.ItemDataRole.DisplayRole)
+        if not text:
+            return
+        painter.save()
+        box = option.rect.adjusted(ITEM_MARGIN, ITEM_MARGIN, -ITEM_MARGIN, -ITEM_MARGIN)
+        painter.setPen(QPen(QColor(BORDER_COLOR), 1))
+        painter.drawRect(box.adjusted(0, 0, -1, -1))
+
+        document = self.document(index, self._text_width(option), option.font)
+        painter.translate(self.text_origin(option.rect))
+        painter.setClipRect(QRect(0, 0, int(document.textWidth()), int(document.size().height())))
+        context = QAbstractTextDocumentLayout.PaintContext()
+        context.palette.setColor(QPalette.ColorRole.Text, option.palette.color(QPalette.ColorRole.Text))
+        document.documentLayout().draw(painter, context)
+        painter.restore()
+
+    @staticmethod
+    def text_origin(rect):
+        return QPointF(rect.left() + ITEM_MARGIN + ITEM_PADDING, rect.top() + ITEM_MARGIN + ITEM_PADDING)
+
+    def anchor_at(self, index, option, pos):
+        """Restituisce il link sotto la posizione pos (coordinate della vista), o una stringa vuota."""
+        if not index.data(Qt.ItemDataRole.DisplayRole):
+            return ""
+        document = self.document(index, self._text_width(option), option.font)
+        return document.documentLayout().anchorAt(QPointF(pos) - self.text_origin(option.rect))
+
+
+class BrocardiListView(QListView):
+    """
+    Vista per BrocardiListModel: scorrimento per pixel, impaginazione a blocchi per non bloccare
+    l'interfaccia con liste lunghe, apertura dei link con un clic.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setItemDelegate(RichTextDelegate(self))
+        self.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
+        self.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)  # Disabilita scrollbar orizzontale
+        self.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)    # Abilita scrollbar verticale se necessario
+        self.setResizeMode(QListView.ResizeMode.Adjust)
+        self.setLayoutMode(QListView.LayoutMode.Batched)
+        self.setBatchSize(50)
+        self.setWordWrap(True)
+        self.setMouseTracking(True)
+
+    def setModel(self, model):
+        self.itemDelegate().clear_cache()
+        super().setModel(model)
+        model.modelReset.connect(self.itemDelegate().clear_cache)
+
+    def plain_texts(self):
+        model = self.model()
+        return model.plain_texts() if model is not None else []
+
+    def _anchor_at(self, pos):
+        index = self.indexAt(pos)
+        if not index.isValid():
+            return ""
+        option = QStyleOptionViewItem()
+        self.initViewItemOption(option)
+        option.rect = self.visualRect(index)
+        return self.itemDelegate().anchor_at(index, option, pos)
+
+    def mouseMoveEvent(self, event):
+        anchor = self._anchor_at(event.position().toPoint())
+        if anchor:
+            self.viewport().setCursor(Qt.CursorShape.PointingHandCursor)
+            self.setToolTip(anchor)
+        else:
+            self.viewport().unsetCursor()
+            self.setToolTip("")
+        super().mouseMoveEvent(event)
+
+    def mouseReleaseEvent(self, event):
+        if event.button() == Qt.MouseButton.LeftButton:
+            anchor = self._anchor_at(event.position().toPoint())
+            if anchor:
+                logging.info("Apertura del link: %s", anchor)
+                QDesktopServices.openUrl(QUrl(anchor))
+                return
+        super().mouseReleaseEvent(event)
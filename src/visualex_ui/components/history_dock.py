@@ -1,5 +1,7 @@
 from PyQt6.QtWidgets import QDockWidget, QListWidget, QListWidgetItem
 from PyQt6.QtCore import Qt
+from ..tools.urn_parser import canonical_urn
+from ..tools.norma import NormaVisitata
 import logging
 
 class HistoryDockWidget(QDockWidget):
@@ -12,23 +14,23 @@ class HistoryDockWidget(QDockWidget):
         # Collegare il clic su una voce della cronologia a un'azione
         self.history_list.itemClicked.connect(self.on_history_item_clicked)
 
-        # Manteniamo un set per evitare duplicati
+        # Manteniamo un set per evitare duplicati, indicizzato per URN canonici (vedi generate_entry_key)
         self.history_entries = set()
 
     def add_search_to_history(self, norma_visitata):
         """Aggiunge una ricerca alla cronologia."""
-        # Convertiamo l'oggetto NormaVisitata in una stringa unica per evitare duplicati
         entry_str = self.generate_entry_string(norma_visitata)
+        entry_key = self.generate_entry_key(norma_visitata)
 
-        if entry_str not in self.history_entries:
+        if entry_key not in self.history_entries:
             # Aggiunge l'elemento alla lista della cronologia se non è già presente
-            self.history_entries.add(entry_str)
+            self.history_entries.add(entry_key)
             item = QListWidgetItem(entry_str)
             item.setData(Qt.ItemDataRole.UserRole, norma_visitata)  # Memorizza l'oggetto NormaVisitata
             self.history_list.addItem(item)
-            logging.info(f"Aggiunta ricerca alla cronologia: {entry_str}")
+            logging.info("Aggiunta ricerca alla cronologia: %s", entry_str)
         else:
-            logging.info(f"Ricerca già presente in cronologia: {entry_str}")
+            logging.info("Ricerca già presente in cronologia: %s", entry_str)
 
     def generate_entry_string(self, norma_visitata):
         """Genera una stringa univoca per rappresentare una ricerca, distinguendo le ricerche multiple."""
@@ -41,6 +43,15 @@ class HistoryDockWidget(QDockWidget):
             entry_str = str(norma_visitata)
         return entry_str
 
+    def generate_entry_key(self, norma_visitata):
+        """
+        Genera la chiave con cui si riconoscono le ricerche già in cronologia: gli URN canonici degli articoli,
+        che a differenza del testo mostrato distinguono anche allegato, versione e data di vigenza.
+        """
+        items = norma_visitata if isinstance(norma_visitata, list) else [norma_visitata]
+        NormaVisitata.fill_urns(items)
+        return tuple(canonical_urn(item.urn) or str(item) for item in items)
+
     def on_history_item_clicked(self, item):
         """Carica una ricerca dalla cronologia quando viene cliccata."""
         norma_visitata = item.data(Qt.ItemDataRole.UserRole)
@@ -2,30 +2,31 @@ from PyQt6.QtWidgets import (
     QMainWindow, QStatusBar, QVBoxLayout, QWidget, QMessageBox, QInputDialog, QMenu, QApplication,
     QPushButton, QDockWidget, QSizePolicy, QHBoxLayout
 )
-from PyQt6.QtCore import QSettings, Qt, QSize, pyqtSlot
-from PyQt6.QtGui import QAction, QKeySequence, QShortcut
+from PyQt6.QtCore import QSettings, Qt, QSize, QUrl, QTimer, pyqtSlot
+from PyQt6.QtGui import QAction, QKeySequence, QShortcut, QDesktopServices
 from .search_input import SearchInputSection
 from .norma_info import NormaInfoSection
 from .brocardi_dock import BrocardiDockWidget
 from .output_area import OutputArea
 from .history_dock import HistoryDockWidget
 from ..theming.theme_manager import ThemeManager, ThemeDialog
-from ..network.data_fetcher import FetchDataThread
+from ..network.data_fetcher import get_fetch_engine, shutdown_fetch_engine
+from ..network.prefetcher import ArticlePrefetcher
 from ..utils.helpers import get_resource_path
-from ..utils.cache_manager import CacheManager
+from ..utils.cache_manager import CacheManager, make_cache_key
 from ..tools.map import FONTI_PRINCIPALI
+from ..tools.config import UPDATE_CHECK_DELAY_MS
+from ..tools.brocardi_index import get_brocardi_index
 from ..tools.text_op import clean_text, clean_article_input
 from ..tools.norma import NormaVisitata
 from ..utils.updater import UpdateNotifier
+from ..utils.logging_setup import summarize
 import logging
 import subprocess
 import threading
 import sys
 import os
 
-# Configurazione del logging
-logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
-
 class NormaViewer(QMainWindow):
     def __init__(self):
         logging.info("Inizializzazione di NormaViewer.")
@@ -62,6 +63,11 @@ class NormaViewer(QMainWindow):
         self.cache_manager = CacheManager()
         logging.debug("CacheManager configurato.")
 
+        # Prefetch in background degli articoli vicini a quello visualizzato
+        self.prefetcher = ArticlePrefetcher(self.cache_manager, parent=self)
+        self.prefetcher.tree_loaded.connect(lambda url: self.update_navigation_buttons())
+        self.search_payload = None  # Payload dell'ultima ricerca singola, base per il prefetch
+
         # Carica le impostazioni del tema salvate
         self.load_theme_settings()
         logging.debug("Impostazioni del tema caricate.")
@@ -76,7 +82,7 @@ class NormaViewer(QMainWindow):
         # Impostazioni dell'applicazione
         self.settings = QSettings("NormaApp", "NormaViewer")
         self.api_url = self.settings.value("api_url", "https://localhost:8000")  # URL di default
-        logging.debug(f"URL API impostato: {self.api_url}")
+        logging.debug("URL API impostato: %s", self.api_url)
         self.status_bar = QStatusBar()
         self.setStatusBar(self.status_bar)
         logging.debug("Barra di stato creata.")
@@ -138,9 +144,10 @@ class NormaViewer(QMainWindow):
         logging.debug("Dimensioni minime del widget centrale impostate.")
         self.setup_shortcuts()
         logging.debug("Scorciatoie da tastiera configurate.")
-        # Verifica la presenza di aggiornamenti all'avvio
-        self.manual_update_check()
-        logging.debug("Controllo manuale degli aggiornamenti avviato.")
+        # Verifica la presenza di aggiornamenti all'avvio: il timer parte solo con l'event loop,
+        # quindi il controllo avviene dopo che la finestra è stata mostrata
+        QTimer.singleShot(UPDATE_CHECK_DELAY_MS, self.automatic_update_check)
+        logging.debug("Controllo automatico degli aggiornamenti programmato.")
 
     def create_update_icon(self):
         """Crea un'icona di notifica per l'aggiornamento e la aggiunge alla barra di stato."""
@@ -156,22 +163,26 @@ class NormaViewer(QMainWindow):
             update_action.setVisible(True)
             logging.info("Icona di aggiornamento aggiunta alla barra di stato.")
         except Exception as e:
-            logging.error(f"Errore durante la creazione dell'icona di aggiornamento: {e}")
+            logging.error("Errore durante la creazione dell'icona di aggiornamento: %s", e)
 
     def manual_update_check(self):
         """Metodo per avviare manualmente il controllo degli aggiornamenti."""
         logging.debug("Avvio del controllo manuale degli aggiornamenti.")
 
         current_version = self.get_app_version()
-        logging.debug(f"Versione corrente dell'applicazione: {current_version}")
+        logging.debug("Versione corrente dell'applicazione: %s", current_version)
 
         self.update_notifier.check_for_update(current_version)
 
+    def automatic_update_check(self):
+        """Controllo degli aggiornamenti all'avvio: avvisa solo se è disponibile una nuova versione."""
+        self.update_notifier.check_for_update_in_background(self.get_app_version())
+
     @pyqtSlot(bool, str)
     def on_update_checked(self, is_newer, latest_version):
         """Slot chiamato quando il controllo degli aggiornamenti è completo."""
         if is_newer:
-            logging.info(f"Trovata nuova versione: {latest_version}. Avvio del processo di aggiornamento.")
+            logging.info("Trovata nuova versione: %s. Avvio del processo di aggiornamento.", latest_version)
             self.update_notifier.prompt_update()
         else:
             logging.info("L'applicazione è già aggiornata.")
@@ -190,7 +201,7 @@ class NormaViewer(QMainWindow):
             # Apri la cartella dove si trova l'applicazione aggiornata
             subprocess.Popen(['open', os.path.dirname(message)])
         else:
-            logging.error(f"Aggiornamento fallito: {message}")
+            logging.error("Aggiornamento fallito: %s", message)
             QMessageBox.warning(self, "Aggiornamento Fallito", message)
 
     @pyqtSlot()
@@ -203,16 +214,16 @@ class NormaViewer(QMainWindow):
         """Ottiene la versione dell'applicazione dal file delle risorse."""
         try:
             version_file_path = get_resource_path('version.txt')
-            logging.debug(f"Percorso del file version.txt: {version_file_path}")
+            logging.debug("Percorso del file version.txt: %s", version_file_path)
             with open(version_file_path, 'r') as f:
                 version = f.read().strip()
-                logging.debug(f"Versione letta dal file: {version}")
+                logging.debug("Versione letta dal file: %s", version)
                 return version
         except FileNotFoundError:
             logging.error("File version.txt non trovato.")
             return "0.0.1"  # Versione predefinita
         except Exception as e:
-            logging.error(f"Errore nel caricamento della versione dell'app: {e}")
+            logging.error("Errore nel caricamento della versione dell'app: %s", e)
             return "0.0.1"
 
     def moveEvent(self, event):
@@ -368,6 +379,18 @@ class NormaViewer(QMainWindow):
         settings_menu.addAction(check_update_action)
         logging.debug("Azione per controllare gli aggiornamenti aggiunta al menu.")
 
+        # Aggiungi azione per la ricerca multipla di più citazioni
+        batch_search_action = QAction("Ricerca Multipla", self)
+        batch_search_action.triggered.connect(self.open_batch_search_dialog)
+        settings_menu.addAction(batch_search_action)
+        logging.debug("Azione per la ricerca multipla aggiunta al menu.")
+
+        # Aggiungi azione per cercare una pagina di Brocardi nell'indice locale
+        brocardi_search_action = QAction("Cerca su Brocardi", self)
+        brocardi_search_action.triggered.connect(self.open_brocardi_search_dialog)
+        settings_menu.addAction(brocardi_search_action)
+        logging.debug("Azione per la ricerca su Brocardi aggiunta al menu.")
+
         # Aggiungi azione per mostrare/nascondere la cronologia
         toggle_history_action = QAction("Mostra/Nascondi cronologia", self)
         toggle_history_action.triggered.connect(self.toggle_history_dock)
@@ -397,7 +420,7 @@ class NormaViewer(QMainWindow):
             self.api_url = new_url
             self.settings.setValue("api_url", self.api_url)
             QMessageBox.information(self, "URL Aggiornato", "L'URL dell'API è stato aggiornato correttamente.")
-            logging.info(f"URL API aggiornato a: {self.api_url}")
+            logging.info("URL API aggiornato a: %s", self.api_url)
         else:
             logging.debug("Modifica dell'URL API annullata o input non valido.")
 
@@ -437,7 +460,7 @@ class NormaViewer(QMainWindow):
                 self.custom_theme = None
                 self.change_theme(self.current_theme)  # Usa il nuovo metodo change_theme
                 self.save_theme_settings()  # Save default theme setting
-                logging.info(f"Tema predefinito '{self.current_theme}' applicato e salvato.")
+                logging.info("Tema predefinito '%s' applicato e salvato.", self.current_theme)
         else:
             logging.debug("Dialogo di personalizzazione del tema annullato.")
 
@@ -460,17 +483,17 @@ class NormaViewer(QMainWindow):
                 logging.debug("Tema personalizzato applicato.")
         else:
             self.change_theme(self.current_theme)
-            logging.debug(f"Tema predefinito '{self.current_theme}' applicato.")
+            logging.debug("Tema predefinito '%s' applicato.", self.current_theme)
 
     def change_theme(self, theme_name):
         """Cambia il tema dell'applicazione al tema predefinito selezionato."""
-        logging.debug(f"Cambio del tema a '{theme_name}'.")
+        logging.debug("Cambio del tema a '%s'.", theme_name)
         try:
             ThemeManager.apply_custom_theme(self, ThemeManager.get_themes()[theme_name])
-            logging.info(f"Tema '{theme_name}' applicato con successo.")
+            logging.info("Tema '%s' applicato con successo.", theme_name)
         except KeyError:
             QMessageBox.warning(self, "Errore", f"Tema '{theme_name}' non trovato.")
-            logging.error(f"Tema '{theme_name}' non trovato.")
+            logging.error("Tema '%s' non trovato.", theme_name)
 
     def apply_custom_theme(self, custom_theme):
         """Applica il tema personalizzato."""
@@ -480,14 +503,25 @@ class NormaViewer(QMainWindow):
             logging.info("Tema personalizzato applicato con successo.")
         except Exception as e:
             QMessageBox.warning(self, "Errore", "Impossibile applicare il tema personalizzato.")
-            logging.error(f"Errore durante l'applicazione del tema personalizzato: {e}")
+            logging.error("Errore durante l'applicazione del tema personalizzato: %s", e)
+
+    def cancel_search(self):
+        """
+        Annulla la ricerca ancora in corso e il prefetch del risultato precedente.
+        Va chiamata prima di mostrare i risultati di una nuova ricerca, anche se questi arrivano dalla cache:
+        altrimenti la ricerca precedente continuerebbe a sovrascrivere normavisitate e la cronologia.
+        """
+        get_fetch_engine().cancel_group("search")
+        self.prefetcher.cancel()
+        self.search_request = None
+        self.search_input_section.search_progress_bar.setVisible(False)
 
     def on_search_button_clicked(self):
         """Metodo per gestire il clic sul pulsante di ricerca."""
         logging.debug("Pulsante di ricerca cliccato.")
         # Ottieni il payload di ricerca dalla sezione di input
         payload = self.search_input_section.get_search_payload()
-        logging.debug(f"Payload di ricerca ottenuto: {payload}")
+        logging.debug("Payload di ricerca ottenuto: %s", payload)
 
         # Controlla se il payload è valido
         if not payload.get('act_type'):
@@ -500,16 +534,19 @@ class NormaViewer(QMainWindow):
         self.output_dock.clear()  # Pulisce l'area di output
         logging.debug("Tab di Brocardi e area di output pulite.")
 
+        self.cancel_search()
+        self.search_payload = payload
+
         # Genera la chiave di cache dinamicamente in base al contenuto del payload
-        cache_key_parts = [f"{key}={value}" for key, value in payload.items() if value]
-        cache_key = "&".join(cache_key_parts)
-        logging.debug(f"Chiave di cache generata: {cache_key}")
+        cache_key = make_cache_key(payload)
+        logging.debug("Chiave di cache generata: %s", cache_key)
 
-        # Controlla se i dati sono già nella cache
+        # Controlla se i dati sono già nella cache (in memoria o su disco)
         cached_result = self.cache_manager.get_cached_data(cache_key)
         if cached_result:
-            logging.info("Risultato trovato nella cache.")
-            self.handle_data_fetch(cached_result, cache_key)
+            logging.info("Risultato trovato nella cache. Statistiche: %s", self.cache_manager.stats())
+            # Nessuna chiave: il risultato è già in cache e la sua scadenza non va rinnovata
+            self.handle_data_fetch(cached_result, None)
             return
 
         # Mostra la barra di caricamento
@@ -517,31 +554,210 @@ class NormaViewer(QMainWindow):
         self.search_input_section.search_progress_bar.setRange(0, 0)  # Modalità indeterminata
         logging.debug("Barra di progresso della ricerca mostrata.")
 
-        # Avvia il thread di fetching dei dati
-        self.thread = FetchDataThread(url=self.api_url+'/fetch_all_data', payload=payload, endpoint_type="fetch_all_data")
-        self.thread.data_fetched.connect(lambda data: self.handle_data_fetch(data, cache_key))
-        self.thread.start()
-        logging.info("Thread di fetching dei dati avviato.")
+        # Invia la richiesta al motore di fetch
+        version = payload.get('version')
+        request = get_fetch_engine().submit(
+            url=self.api_url+'/fetch_all_data', payload=payload, endpoint_type="fetch_all_data", group="search",
+            stream=True
+        )
+        request.items_received = 0
+        request.item_decoded.connect(lambda normavisitata: self.on_search_item_decoded(request, normavisitata))
+        request.data_fetched.connect(lambda data: self.on_search_data_fetched(request, data, cache_key, version))
+        self.search_request = request
+        logging.info("Richiesta di fetching dei dati inviata.")
+
+    def open_batch_search_dialog(self):
+        """Apre il dialogo per inserire più citazioni da cercare in parallelo."""
+        logging.debug("Apertura del dialogo di ricerca multipla.")
+        text, ok = QInputDialog.getMultiLineText(
+            self, "Ricerca Multipla",
+            "Inserisci una citazione per riga nel formato:\n"
+            "tipo atto; articolo; data; numero atto (data e numero sono facoltativi)\n"
+            "La versione e la data di vigenza sono quelle selezionate nel modulo di ricerca."
+        )
+        if not ok or not text.strip():
+            logging.debug("Ricerca multipla annullata o vuota.")
+            return
+
+        payloads = self.build_batch_payloads(text)
+        if not payloads:
+            QMessageBox.warning(self, "Errore di Input", "Nessuna citazione valida trovata.")
+            return
+        self.start_batch_search(payloads)
+
+    def open_brocardi_search_dialog(self):
+        """Cerca una pagina di Brocardi nell'indice locale, senza interrogare il server."""
+        query, ok = QInputDialog.getText(
+            self, "Cerca su Brocardi", "Parole chiave (es. \"affido condiviso art 3\"):"
+        )
+        if not ok or not query.strip():
+            return
+        # Il primo utilizzo costruisce l'indice: lo si esegue fuori dal thread dell'interfaccia
+        request = get_fetch_engine().submit_call(lambda: get_brocardi_index().search(query, limit=20), group="brocardi")
+        request.data_fetched.connect(lambda results: self.show_brocardi_results(query, results))
+
+    def show_brocardi_results(self, query, results):
+        """Mostra i risultati della ricerca su Brocardi e apre nel browser la pagina scelta."""
+        if isinstance(results, dict) and 'error' in results:
+            QMessageBox.critical(self, "Errore", results['error'])
+            return
+        if not results:
+            QMessageBox.information(self, "Cerca su Brocardi", f"Nessun risultato per \"{query}\".")
+            return
+        labels = [f"{heading} — {url}" for heading, url in results]
+        choice, ok = QInputDialog.getItem(self, "Cerca su Brocardi", "Risultati:", labels, 0, False)
+        if ok and choice:
+            url = results[labels.index(choice)][1]
+            logging.info("Apertura della pagina Brocardi: %s", url)
+            QDesktopServices.openUrl(QUrl(url))
+
+    def build_batch_payloads(self, text):
+        """Converte le righe del dialogo di ricerca multipla in payload per /fetch_all_data."""
+        base_payload = self.search_input_section.get_search_payload()
+        payloads = []
+        for line in text.splitlines():
+            fields = [field.strip() for field in line.split(';')]
+            if not fields[0]:
+                continue
+            payload = {"act_type": fields[0], "version": base_payload["version"]}
+            if len(fields) > 1 and fields[1]:
+                payload["article"] = fields[1]
+            if len(fields) > 2 and fields[2]:
+                payload["date"] = fields[2]
+            if len(fields) > 3 and fields[3]:
+                payload["act_number"] = fields[3]
+            if base_payload.get("version_date"):
+                payload["version_date"] = base_payload["version_date"]
+            payloads.append(payload)
+        logging.debug("Payload della ricerca multipla: %s", payloads)
+        return payloads
+
+    def start_batch_search(self, payloads):
+        """Avvia una ricerca multipla: i risultati vengono aggiunti a normavisitate man mano che arrivano."""
+        logging.info("Avvio della ricerca multipla di %s citazioni.", len(payloads))
+        # Prima dei risultati in cache: una ricerca precedente ancora in corso li cancellerebbe
+        self.cancel_search()
+        self.brocardi_dock.clear_dynamic_tabs()
+        self.output_dock.clear()
+        self.normavisitate = []
+        self.current_index = 0
+        self.batch_errors = []
+        self.search_payload = None  # Ogni citazione ha la propria versione
+        self.update_navigation_buttons()
+
+        # Le citazioni già in cache vengono mostrate subito, le altre sono richieste in parallelo
+        pending = []
+        for payload in payloads:
+            cache_key = make_cache_key(payload)
+            cached_result = self.cache_manager.get_cached_data(cache_key)
+            if cached_result:
+                self.add_batch_results(cached_result)
+            else:
+                pending.append(payload)
+
+        if not pending:
+            self.finish_batch_search()
+            return
+
+        self.search_input_section.search_progress_bar.setVisible(True)
+        self.search_input_section.search_progress_bar.setRange(0, len(pending))
+        self.search_input_section.search_progress_bar.setValue(0)
 
-    def handle_data_fetch(self, normavisitate, cache_key):
-        """Gestisce i dati ricevuti dal thread di fetch."""
+        batch = get_fetch_engine().submit_batch(
+            url=self.api_url+'/fetch_all_data', payloads=pending, endpoint_type="fetch_all_data", group="search"
+        )
+        batch.item_fetched.connect(lambda index, data: self.on_batch_item_fetched(batch, pending[index], data))
+        batch.data_fetched.connect(lambda results: self.finish_batch_search(batch))
+        self.search_request = batch
+
+    def on_batch_item_fetched(self, batch, payload, data):
+        """Riceve il risultato di una singola citazione della ricerca multipla."""
+        if batch.cancelled:
+            return
+        progress_bar = self.search_input_section.search_progress_bar
+        progress_bar.setValue(progress_bar.value() + 1)
+
+        if isinstance(data, dict) and 'error' in data:
+            logging.error("Errore nella ricerca di %s: %s", payload, data['error'])
+            self.batch_errors.append(f"{payload.get('act_type')} {payload.get('article', '')}: {data['error']}")
+            return
+
+        cache_key = make_cache_key(payload)
+        self.cache_manager.cache_data(cache_key, data, version=payload.get('version'))
+        self.add_batch_results(data)
+
+    def add_batch_results(self, normavisitate):
+        """Aggiunge i risultati alla lista corrente, mostrando il primo non appena disponibile."""
+        if isinstance(normavisitate, NormaVisitata):
+            normavisitate = [normavisitate]
+        was_empty = not self.normavisitate
+        self.normavisitate.extend(normavisitate)
+        if was_empty and self.normavisitate:
+            self.current_index = 0
+            self.display_data(self.normavisitate[self.current_index])
+        self.update_navigation_buttons()
+
+    def finish_batch_search(self, batch=None):
+        """Conclude la ricerca multipla aggiornando la cronologia e segnalando gli eventuali errori."""
+        if batch is not None and batch.cancelled:
+            return
+        self.search_input_section.search_progress_bar.setVisible(False)
+        if self.normavisitate:
+            self.history_dock.add_search_to_history(list(self.normavisitate))
+        logging.info("Ricerca multipla completata: %s articoli, %s errori.", len(self.normavisitate), len(self.batch_errors))
+        if self.batch_errors:
+            QMessageBox.warning(self, "Ricerca Multipla", "Alcune citazioni non sono state trovate:\n" + "\n".join(self.batch_errors))
+
+    def on_search_item_decoded(self, request, normavisitata):
+        """Mostra gli articoli man mano che arrivano, senza attendere la fine della risposta."""
+        if request.cancelled:
+            return
+        if request.items_received == 0:
+            self.normavisitate = []
+            self.current_index = 0
+            self.brocardi_dock.clear_dynamic_tabs()
+            self.output_dock.clear()
+        request.items_received += 1
+        self.normavisitate.append(normavisitata)
+        if request.items_received == 1:
+            self.display_data(self.normavisitate[self.current_index])
+        self.update_navigation_buttons()
+
+    def on_search_data_fetched(self, request, data, cache_key, version):
+        """Riceve il risultato di una ricerca, scartandolo se nel frattempo è stata superata da una nuova."""
+        if request.cancelled:
+            logging.debug("Risultato di una ricerca superata scartato.")
+            return
+        if request.items_received and isinstance(data, list):
+            # Gli articoli sono già stati mostrati durante lo streaming: resta solo da completare la ricerca
+            self.search_input_section.search_progress_bar.setVisible(False)
+            self.cache_manager.cache_data(cache_key, data, version=version)
+            self.normavisitate = data
+            self.history_dock.add_search_to_history(self.normavisitate)
+            self.update_navigation_buttons()
+            return
+        self.handle_data_fetch(data, cache_key, version)
+
+    def handle_data_fetch(self, normavisitate, cache_key, version=None):
+        """Gestisce i dati ricevuti dal thread di fetch. Se cache_key è None i dati non vengono salvati in cache."""
         logging.debug("Dati ricevuti dal thread di fetch.")
         self.search_input_section.search_progress_bar.setVisible(False)
 
         # Controllo degli errori
         if isinstance(normavisitate, dict) and 'error' in normavisitate:
-            logging.error(f"Errore dal fetching dei dati: {normavisitate['error']}")
+            logging.error("Errore dal fetching dei dati: %s", normavisitate['error'])
             QMessageBox.critical(self, "Errore", normavisitate['error'])
             return
 
         # Salva i risultati nella cache
-        self.cache_manager.cache_data(cache_key, normavisitate)
-        logging.debug("Risultati salvati nella cache.")
+        if cache_key:
+            self.cache_manager.cache_data(cache_key, normavisitate, version=version)
+            logging.debug("Risultati salvati nella cache.")
 
         # Verifica se è una ricerca multipla o singola
         if isinstance(normavisitate, list):
             logging.debug("Risultati multipli ricevuti.")
-            logging.debug(f"Numero di risultati ricevuti: {len(normavisitate)}")
+            logging.debug("Numero di risultati ricevuti: %s", len(normavisitate))
 
             self.normavisitate = normavisitate  # Salva la lista dei risultati
             self.current_index = 0  # Ripristina l'indice all'inizio
@@ -560,7 +776,7 @@ class NormaViewer(QMainWindow):
 
         elif isinstance(normavisitate, NormaVisitata):
             logging.debug("Risultato singolo ricevuto.")
-            logging.debug(f"Risultato dell'API: {normavisitate}")
+            logging.debug("Risultato dell'API: %s", normavisitate)
 
             # Gestione della ricerca singola
             self.normavisitate = [normavisitate]
@@ -584,8 +800,8 @@ class NormaViewer(QMainWindow):
 
     def display_data(self, normavisitata):
         """Visualizza un singolo articolo e le informazioni correlate."""
-        logging.info(f"Inizio visualizzazione dei dati per l'articolo: {normavisitata.numero_articolo}.")
-        logging.debug(f"Dettagli di normavisitata: {normavisitata}")
+        logging.info("Inizio visualizzazione dei dati per l'articolo: %s.", normavisitata.numero_articolo)
+        logging.debug("Dettagli di normavisitata: %s", normavisitata)
 
         # Pulisce le tab dinamiche di Brocardi prima di visualizzare nuovi dati
         logging.info("Pulizia delle tab dinamiche di Brocardi in corso.")
@@ -600,8 +816,9 @@ class NormaViewer(QMainWindow):
         # Visualizza il testo dell'articolo
         if normavisitata._article_text:
             logging.info("Pulizia del testo dell'articolo.")
-            cleaned_text = clean_text(normavisitata._article_text)
-            logging.debug(f"Testo dell'articolo dopo la pulizia: {cleaned_text}")
+            # Il testo pulito è riusato se l'articolo torna a video con lo stesso testo (navigazione, cronologia)
+            cleaned_text = clean_text(normavisitata._article_text, urn=normavisitata.urn)
+            logging.debug("Testo dell'articolo dopo la pulizia: %s", summarize(cleaned_text))
         else:
             logging.warning("Testo dell'articolo mancante in normavisitata.")
             cleaned_text = ''
@@ -613,7 +830,7 @@ class NormaViewer(QMainWindow):
         brocardi_info = normavisitata._brocardi_info if normavisitata._brocardi_info else None
         if brocardi_info:
             logging.info("Informazioni Brocardi trovate, elaborazione in corso.")
-            logging.debug(f"Dettagli di brocardi_info: {brocardi_info}")
+            logging.debug("Dettagli di brocardi_info: %s", summarize(brocardi_info))
             position = brocardi_info.get('position', "").strip()
             link = brocardi_info.get('link', "#")
             brocardi_details = {
@@ -630,7 +847,10 @@ class NormaViewer(QMainWindow):
             self.brocardi_dock.hide()
             logging.debug("brocardi_dock nascosto poiché brocardi_info è assente.")
 
-        logging.info(f"Fine visualizzazione dei dati per l'articolo: {normavisitata.numero_articolo}.")
+        # Scarica in anticipo gli articoli vicini mentre l'utente legge
+        self.prefetcher.prefetch_around(self.api_url, normavisitata, self.search_payload)
+
+        logging.info("Fine visualizzazione dei dati per l'articolo: %s.", normavisitata.numero_articolo)
 
     def load_multiple_articles_from_history(self, normavisitate):
         """Carica una ricerca multipla dalla cronologia."""
@@ -651,12 +871,18 @@ class NormaViewer(QMainWindow):
     def update_navigation_buttons(self):
         """Abilita o disabilita i pulsanti e gestisce la visibilità in base alla presenza di più articoli."""
         logging.debug("Aggiornamento dei pulsanti di navigazione.")
-        if len(self.normavisitate) > 1:
+        # Oltre i risultati della ricerca si può proseguire lungo l'albero della norma, se già caricato
+        current = self.normavisitate[self.current_index] if self.current_index < len(self.normavisitate) else None
+        has_previous = self.current_index > 0 or (
+            current is not None and self.prefetcher.neighbour(current, -1) is not None)
+        has_next = self.current_index < len(self.normavisitate) - 1 or (
+            current is not None and self.prefetcher.neighbour(current, 1) is not None)
+        if len(self.normavisitate) > 1 or has_previous or has_next:
             # Mostra i pulsanti e abilita/disabilita in base alla posizione
             self.previous_button.setVisible(True)
             self.next_button.setVisible(True)
-            self.previous_button.setEnabled(self.current_index > 0)
-            self.next_button.setEnabled(self.current_index < len(self.normavisitate) - 1)
+            self.previous_button.setEnabled(has_previous)
+            self.next_button.setEnabled(has_next)
             logging.debug("Pulsanti di navigazione aggiornati per risultati multipli.")
         else:
             # Nascondi i pulsanti se c'è solo un articolo
@@ -671,7 +897,9 @@ class NormaViewer(QMainWindow):
             self.current_index -= 1
             self.display_data(self.normavisitate[self.current_index])
             self.update_navigation_buttons()
-            logging.debug(f"Articolo precedente mostrato: indice {self.current_index}.")
+            logging.debug("Articolo precedente mostrato: indice %s.", self.current_index)
+        elif self.normavisitate:
+            self.step_beyond_results(-1)
 
     def show_next_article(self):
         """Mostra l'articolo successivo nei risultati di ricerca multipla."""
@@ -680,7 +908,59 @@ class NormaViewer(QMainWindow):
             self.current_index += 1
             self.display_data(self.normavisitate[self.current_index])
             self.update_navigation_buttons()
-            logging.debug(f"Articolo successivo mostrato: indice {self.current_index}.")
+            logging.debug("Articolo successivo mostrato: indice %s.", self.current_index)
+        elif self.normavisitate:
+            self.step_beyond_results(1)
+
+    def step_beyond_results(self, offset):
+        """Prosegue oltre i risultati della ricerca verso l'articolo vicino nell'albero della norma."""
+        current = self.normavisitate[self.current_index]
+        article = self.prefetcher.neighbour(current, offset)
+        if article is None:
+            return
+        payload = self.prefetcher.payload_for(current, article, self.search_payload)
+        cache_key = make_cache_key(payload)
+        cached_result = self.cache_manager.get_cached_data(cache_key)
+        if cached_result:
+            logging.debug("Articolo %s già scaricato dal prefetch.", article)
+            self.insert_neighbour_article(cached_result, offset)
+            return
+
+        # Il prefetch non è ancora arrivato a questo articolo: lo si richiede come una normale ricerca
+        logging.debug("Articolo %s non ancora in cache, richiesta in corso.", article)
+        self.search_input_section.search_progress_bar.setVisible(True)
+        self.search_input_section.search_progress_bar.setRange(0, 0)
+        request = get_fetch_engine().submit(
+            url=self.api_url+'/fetch_all_data', payload=payload, endpoint_type="fetch_all_data", group="search"
+        )
+        request.data_fetched.connect(lambda data: self.on_neighbour_fetched(request, data, cache_key, payload, offset))
+        self.search_request = request
+
+    def on_neighbour_fetched(self, request, data, cache_key, payload, offset):
+        """Riceve un articolo vicino richiesto durante la navigazione."""
+        if request.cancelled:
+            return
+        self.search_input_section.search_progress_bar.setVisible(False)
+        if isinstance(data, dict) and 'error' in data:
+            logging.error("Errore dal fetching dell'articolo vicino: %s", data['error'])
+            QMessageBox.critical(self, "Errore", data['error'])
+            return
+        if data:
+            self.cache_manager.cache_data(cache_key, data, version=payload.get('version'))
+            self.insert_neighbour_article(data, offset)
+
+    def insert_neighbour_article(self, normavisitate, offset):
+        """Aggiunge un articolo vicino in testa o in coda ai risultati e lo visualizza."""
+        if isinstance(normavisitate, NormaVisitata):
+            normavisitate = [normavisitate]
+        if offset > 0:
+            self.normavisitate = self.normavisitate + list(normavisitate)
+            self.current_index += 1
+        else:
+            self.normavisitate = list(normavisitate) + self.normavisitate
+            self.current_index = len(normavisitate) - 1
+        self.display_data(self.normavisitate[self.current_index])
+        self.update_navigation_buttons()
 
     
     def clipboard(self):
@@ -690,7 +970,7 @@ class NormaViewer(QMainWindow):
 
     def show_message(self, title, message):
         """Mostra un messaggio popup con il titolo e il messaggio forniti."""
-        logging.debug(f"Mostra messaggio: {title} - {message}")
+        logging.debug("Mostra messaggio: %s - %s", title, message)
         QMessageBox.information(self, title, message)
 
     def setup_shortcuts(self):
@@ -727,6 +1007,13 @@ class NormaViewer(QMainWindow):
         next_article_shortcut.activated.connect(self.show_next_article)
         logging.debug("Scorciatoia per l'articolo successivo configurata.")
 
+    def closeEvent(self, event):
+        """Arresta il motore di fetch alla chiusura della finestra."""
+        logging.debug("Chiusura della finestra principale.")
+        self.prefetcher.cancel()
+        shutdown_fetch_engine()
+        super().closeEvent(event)
+
     def restart_application(self):
         """Riavvia l'applicazione quando si preme Ctrl+R."""
         logging.info("Riavvio dell'applicazione richiesto.")
@@ -1,9 +1,12 @@
 # visualex_ui/components/output_area.py
 
-from PyQt6.QtWidgets import QGroupBox, QVBoxLayout, QTextEdit, QPushButton, QLabel, QScrollArea, QMessageBox, QApplication, QListWidget, QListWidgetItem, QTextBrowser, QDockWidget, QWidget
-from PyQt6.QtGui import QFont, QTextOption
-from PyQt6.QtCore import Qt
+from PyQt6.QtWidgets import QGroupBox, QVBoxLayout, QTextEdit, QPushButton, QLabel, QScrollArea, QMessageBox, QApplication, QTextBrowser, QDockWidget, QWidget
+from PyQt6.QtGui import QFont, QTextOption, QTextCursor
+from PyQt6.QtCore import Qt, QTimer
+from collections import deque
 import logging
+from .brocardi_list import BrocardiListView
+from ..tools.config import OUTPUT_CHUNK_SIZE
 
 class OutputArea(QDockWidget):
     def __init__(self, parent):
@@ -14,6 +17,10 @@ class OutputArea(QDockWidget):
         self.setFeatures(QDockWidget.DockWidgetFeature.DockWidgetMovable |
                          QDockWidget.DockWidgetFeature.DockWidgetClosable |
                          QDockWidget.DockWidgetFeature.DockWidgetFloatable)
+        # Testo ancora da inserire nel documento, a blocchi, e contatore che invalida gli inserimenti programmati
+        self._pending = deque()
+        self._generation = 0
+        self._scheduled = False
         self.setup_ui()
 
     def setup_ui(self):
@@ -27,6 +34,7 @@ class OutputArea(QDockWidget):
         self.norma_text_edit.setReadOnly(True)
         self.norma_text_edit.setWordWrapMode(QTextOption.WrapMode.WordWrap)
         self.norma_text_edit.setFont(QFont("Arial", 12))
+        self.norma_text_edit.setUndoRedoEnabled(False)  # Area di sola lettura: non serve tenere la storia degli inserimenti
         logging.debug("Impostata l'area di testo per la visualizzazione della norma")
 
         # Area di scorrimento per la visualizzazione del testo
@@ -49,11 +57,57 @@ class OutputArea(QDockWidget):
     def display_text(self, text):
         """
         Visualizza il testo fornito nell'area di output.
+        I testi lunghi vengono inseriti a blocchi, restituendo il controllo all'event loop tra un blocco e l'altro.
         """
         logging.info("Visualizzazione del testo nella OutputArea")
         if text:
-            logging.debug(f"Testo visualizzato: {text[:100]}...")  # Mostra solo i primi 100 caratteri per non sovraccaricare i log
-        self.norma_text_edit.setText(text)
+            logging.debug("Testo visualizzato: %s...", text[:100])  # Mostra solo i primi 100 caratteri per non sovraccaricare i log
+        self.clear()
+        if text and Qt.mightBeRichText(text):
+            # Il testo formattato va interpretato tutto insieme, non si può spezzare a metà di un tag
+            self.norma_text_edit.setText(text)
+            return
+        self._enqueue(text)
+
+    def flush(self):
+        """Inserisce subito tutto il testo ancora in attesa, ad esempio prima di copiarlo."""
+        while self._pending:
+            self._insert_chunk()
+
+    def _enqueue(self, text):
+        if not text:
+            return
+        self._pending.append(text)
+        # Il primo blocco è inserito subito, così l'inizio del testo appare senza attese
+        self._insert_chunk()
+        self._schedule()
+
+    def _schedule(self):
+        if self._pending and not self._scheduled:
+            self._scheduled = True
+            generation = self._generation
+            QTimer.singleShot(0, lambda: self._insert_next_chunk(generation))
+
+    def _insert_next_chunk(self, generation):
+        if generation != self._generation:
+            return  # Il testo è stato sostituito o cancellato nel frattempo
+        self._scheduled = False
+        self._insert_chunk()
+        self._schedule()
+
+    def _insert_chunk(self):
+        if not self._pending:
+            return
+        text = self._pending.popleft()
+        if len(text) > OUTPUT_CHUNK_SIZE:
+            # Spezza preferibilmente a fine riga, per non tagliare le parole
+            split = text.rfind("\n", OUTPUT_CHUNK_SIZE // 2, OUTPUT_CHUNK_SIZE)
+            split = split + 1 if split != -1 else OUTPUT_CHUNK_SIZE
+            self._pending.appendleft(text[split:])
+            text = text[:split]
+        cursor = QTextCursor(self.norma_text_edit.document())
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        cursor.insertText(text)
 
     def copy_all_norma_info(self):
         """
@@ -77,7 +131,8 @@ class OutputArea(QDockWidget):
         if norma_info_section.numero_atto_label.text():
             info.append(f"Numero Atto: {norma_info_section.numero_atto_label.text()}")
 
-        # Add the law text
+        # Add the law text, including any part not yet inserted
+        self.flush()
         norma_text = self.norma_text_edit.toPlainText()
         if norma_text:
             info.append("\n=== Testo della Norma ===\n" + norma_text)
@@ -127,26 +182,19 @@ class OutputArea(QDockWidget):
 
     def get_all_items(self, tab_widget):
         """
-        Returns a list of strings for all items in QListWidget.
+        Returns a list of strings for all items in the Brocardi/Massime list of a tab.
         """
         if not tab_widget:
             logging.warning("Tab widget non trovato per la raccolta di tutti gli elementi")
             return []
 
-        list_widget_obj = tab_widget.findChild(QListWidget)
-        if not list_widget_obj:
-            logging.warning("QListWidget non trovato all'interno della tab")
+        list_view = tab_widget.findChild(BrocardiListView)
+        if not list_view:
+            logging.warning("Lista dei Brocardi non trovata all'interno della tab")
             return []
 
-        items = []
-        for i in range(list_widget_obj.count()):
-            item = list_widget_obj.item(i)
-            item_widget = list_widget_obj.itemWidget(item)
-            if item_widget:
-                text_browser = item_widget.findChild(QTextBrowser)
-                if text_browser and text_browser.toPlainText().strip():
-                    items.append(text_browser.toPlainText().strip())
-        logging.debug(f"Elementi raccolti: {items}")
+        items = list_view.plain_texts()
+        logging.debug("Elementi raccolti: %s", len(items))
         return items
 
     def get_text_edit_content(self, tab_widget):
@@ -163,23 +211,24 @@ class OutputArea(QDockWidget):
             return ""
 
         content = text_browser.toPlainText()
-        logging.debug(f"Contenuto QTextBrowser raccolto: {content[:100]}...")  # Mostra i primi 100 caratteri
+        logging.debug("Contenuto QTextBrowser raccolto: %s...", content[:100])  # Mostra i primi 100 caratteri
         return content
 
     def clear(self):
-        """Pulisce il contenuto del QTextEdit."""
+        """Pulisce il contenuto del QTextEdit e annulla gli inserimenti in attesa."""
         logging.info("Pulizia dell'area di testo della norma")
+        self._generation += 1
+        self._pending.clear()
+        self._scheduled = False
         self.norma_text_edit.clear()
 
-
     def append_text(self, text):
         """
         Aggiunge il testo fornito all'area di output senza sovrascrivere il contenuto esistente.
+        Il testo è inserito in coda al documento, senza rileggere né reimpostare quello già presente.
         """
         logging.info("Aggiunta di testo nella OutputArea")
         if text:
-            logging.debug(f"Testo aggiunto: {text[:100]}...")  # Mostra solo i primi 100 caratteri per non sovraccaricare i log
-        current_text = self.norma_text_edit.toPlainText()
-        new_text = current_text + "\n\n" + text  # Aggiunge due righe vuote tra gli articoli
-        self.norma_text_edit.setText(new_text)
-
+            logging.debug("Testo aggiunto: %s...", text[:100])  # Mostra solo i primi 100 caratteri per non sovraccaricare i log
+        separator = "\n\n" if self._pending or not self.norma_text_edit.document().isEmpty() else ""
+        self._enqueue(separator + text)  # Aggiunge due righe vuote tra gli articoli
@@ -1,155 +1,437 @@
 # visualex_ui/network/data_fetcher.py
 
-from PyQt6.QtCore import QThread, pyqtSignal
-import requests
+from PyQt6.QtCore import QObject, pyqtSignal
+import asyncio
 import logging
-import time
+import threading
 import json
+from concurrent.futures import ThreadPoolExecutor
 from ..tools.norma import NormaVisitata
+from ..tools.config import FETCH_MAX_CONCURRENCY, FETCH_MAX_RETRIES, FETCH_TIMEOUT, FETCH_STREAM_CHUNK_SIZE
+from .http_client import get_session
+from .json_stream import JsonArrayStream
+from ..utils.logging_setup import SAMPLED, summarize
 from requests.exceptions import Timeout, ConnectionError, HTTPError, RequestException
 
-class FetchDataThread(QThread):
+
+class FetchRequest(QObject):
+    """
+    Richiesta gestita dal FetchEngine. Emette data_fetched una sola volta, sul thread dell'interfaccia.
+    Per le richieste in streaming, item_decoded emette ogni NormaVisitata appena il relativo elemento
+    JSON è stato ricevuto, prima del risultato completo.
+    """
     data_fetched = pyqtSignal(object)
+    item_decoded = pyqtSignal(object)
 
-    def __init__(self, url, payload, endpoint_type):
+    def __init__(self, engine, endpoint_type, group=None):
         super().__init__()
-        self.url = url
-        self.payload = payload
-        self.endpoint_type = endpoint_type  # Tipo di endpoint per decidere quale chiamata effettuare
-        self.max_retries = 3  # Numero massimo di tentativi
-        self.timeout = 1000  # Timeout per le richieste in secondi
+        self.engine = engine
+        self.endpoint_type = endpoint_type
+        self.group = group
+        self.cancelled = False
+        self._future = None
 
-    def run(self):
-        attempts = 0
-        while attempts < self.max_retries:
-            try:
-                logging.info(f"Tentativo {attempts + 1} di inviare la richiesta a {self.url} con payload: {self.payload}")
-                response = requests.post(self.url, json=self.payload, timeout=self.timeout)
-                response.raise_for_status()  # Lancia un'eccezione per codici di stato HTTP 4xx/5xx
-                logging.info(f"Richiesta riuscita al tentativo {attempts + 1}. Status code: {response.status_code}")
-                data = response.json()
-                logging.debug(f"Dati ricevuti: {data}")
-
-                if self.endpoint_type == "fetch_all_data":
-                    self.handle_fetch_all_data(data)
-                elif self.endpoint_type == "fetch_article_text":
-                    self.handle_fetch_article_text(data)
-                elif self.endpoint_type == "fetch_brocardi_info":
-                    self.handle_fetch_brocardi_info(data)
-                elif self.endpoint_type == "fetch_normattiva_info":
-                    self.handle_fetch_normattiva_info(data)
-                else:
-                    logging.error("Endpoint non valido specificato")
-                    self.data_fetched.emit({'error': "Endpoint non valido"})
-
-                logging.info("Richiesta completata con successo.")
-                return  # Se la richiesta ha successo, esci dal metodo
-            except (Timeout, ConnectionError) as e:
-                attempts += 1
-                logging.warning(f"Tentativo {attempts} fallito: {e}")
-                backoff_time = 2 ** attempts  # Exponential backoff
-                logging.info(f"Attesa di {backoff_time} secondi prima di riprovare.")
-                time.sleep(backoff_time)  # Attendi per un periodo crescente
-                if attempts == self.max_retries:
-                    logging.error("Numero massimo di tentativi raggiunto. Impossibile connettersi al server.")
-                    self.data_fetched.emit({'error': "Impossibile connettersi al server. Verifica la tua connessione internet."})
-            except HTTPError as e:
-                logging.error(f"Errore HTTP: {e.response.status_code}")
-                self.data_fetched.emit({'error': f"Errore HTTP: {e.response.status_code}"})
-                return
-            except json.JSONDecodeError as e:
-                logging.error("Errore nel decodificare la risposta del server.")
-                self.data_fetched.emit({'error': "Errore nel decodificare la risposta del server."})
-                return
-            except RequestException as e:
-                logging.error(f"Errore nella richiesta: {str(e)}")
-                self.data_fetched.emit({'error': f"Errore nella richiesta: {str(e)}"})
-                return
-            except Exception as e:
-                logging.error(f"Errore inaspettato: {e}")
-                self.data_fetched.emit({'error': "Si è verificato un errore inaspettato."})
-                return
-
-    def handle_fetch_all_data(self, data):
-        logging.info("Gestione dei dati per fetch_all_data.")
+    def cancel(self):
+        """Annulla la richiesta: i tentativi pendenti vengono interrotti e nessun risultato viene emesso."""
+        self.engine.cancel(self)
+
+
+class FetchBatch(FetchRequest):
+    """
+    Gruppo di richieste inviate in parallelo. item_fetched(indice, risultato) viene emesso per ogni
+    payload appena la sua risposta è pronta; data_fetched emette infine la lista completa dei risultati,
+    nello stesso ordine dei payload.
+    """
+    item_fetched = pyqtSignal(int, object)
+
+
+class _StreamCollector:
+    """Costruisce le NormaVisitata decodificate in streaming e le consegna alla richiesta una alla volta."""
+
+    def __init__(self, request):
+        self.request = request
+        self.items = []
+
+    def __call__(self, item):
+        # Eseguito sul thread di I/O, il segnale raggiunge l'interfaccia tramite una connessione in coda
+        normavisitata = build_normavisitata(item)
+        self.items.append(normavisitata)
+        if not self.request.cancelled:
+            self.request.item_decoded.emit(normavisitata)
+
+
+class FetchEngine:
+    """
+    Motore di fetch basato su un unico event loop asyncio, eseguito su un thread dedicato.
+
+    Tutte le richieste in corso sono multiplexate sullo stesso loop: le chiamate HTTP bloccanti
+    vengono eseguite su un pool di thread limitato, mentre le attese tra un tentativo e l'altro
+    non occupano alcun thread. I risultati tornano all'interfaccia tramite i segnali Qt di FetchRequest.
+    """
+
+    def __init__(self, max_concurrency=FETCH_MAX_CONCURRENCY, max_retries=FETCH_MAX_RETRIES, timeout=FETCH_TIMEOUT):
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries  # Numero massimo di tentativi
+        self.timeout = timeout  # Timeout per le richieste in secondi
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="FetchEngineIO")
+        self._semaphore = None  # Creato all'interno del loop
+        self._active_groups = {}  # Gruppo -> ultima FetchRequest inviata, usato per annullare le ricerche superate
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_loop, name="FetchEngine", daemon=True)
+        self._thread.start()
+        logging.info("FetchEngine avviato (concorrenza massima: %s)", max_concurrency)
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_forever()
+
+    def _get_semaphore(self):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    def submit(self, url, payload, endpoint_type, group=None, stream=False):
+        """
+        Invia una richiesta al motore.
+
+        Args:
+            url (str): L'URL dell'endpoint.
+            payload (dict): Il corpo JSON della richiesta.
+            endpoint_type (str): Il tipo di endpoint, decide come interpretare la risposta.
+            group (str): Se indicato, la richiesta precedente dello stesso gruppo viene annullata.
+            stream (bool): Solo per fetch_all_data: decodifica la risposta in modo incrementale emettendo item_decoded.
+
+        Returns:
+            FetchRequest: L'oggetto a cui collegarsi per ricevere il risultato.
+        """
+        request = FetchRequest(self, endpoint_type, group)
+        self._register(request)
+        request._future = asyncio.run_coroutine_threadsafe(self._fetch(request, url, payload, stream), self._loop)
+        return request
+
+    def submit_batch(self, url, payloads, endpoint_type, group=None, max_concurrency=None):
+        """
+        Invia più richieste allo stesso endpoint, eseguite in parallelo entro il limite di concorrenza del motore.
+
+        Args:
+            url (str): L'URL dell'endpoint.
+            payloads (list): I corpi JSON delle richieste.
+            endpoint_type (str): Il tipo di endpoint, decide come interpretare le risposte.
+            group (str): Se indicato, la richiesta precedente dello stesso gruppo viene annullata.
+            max_concurrency (int): Limite ulteriore alle richieste contemporanee di questo gruppo.
+
+        Returns:
+            FetchBatch: L'oggetto a cui collegarsi per ricevere i risultati man mano che arrivano.
+        """
+        batch = FetchBatch(self, endpoint_type, group)
+        self._register(batch)
+        batch._future = asyncio.run_coroutine_threadsafe(
+            self._fetch_batch(batch, url, list(payloads), max_concurrency), self._loop
+        )
+        return batch
+
+    def submit_call(self, func, *args, group=None):
+        """
+        Esegue una funzione bloccante sul pool di I/O del motore, ad esempio il recupero dell'albero di una norma.
+
+        Returns:
+            FetchRequest: data_fetched emette il valore restituito da func, oppure {'error': ...} in caso di eccezione.
+        """
+        request = FetchRequest(self, None, group)
+        self._register(request)
+        request._future = asyncio.run_coroutine_threadsafe(self._call(request, func, args), self._loop)
+        return request
+
+    def _register(self, request):
+        if request.group is not None:
+            previous = self._active_groups.get(request.group)
+            if previous is not None:
+                logging.info("Annullamento della richiesta superata nel gruppo '%s'.", request.group)
+                previous.cancel()
+            self._active_groups[request.group] = request
+
+    def cancel(self, request):
+        """Annulla una richiesta inviata al motore."""
+        request.cancelled = True
+        if request._future is not None:
+            request._future.cancel()
+        if request.group is not None and self._active_groups.get(request.group) is request:
+            del self._active_groups[request.group]
+
+    def cancel_group(self, group):
+        """Annulla la richiesta attiva del gruppo indicato, se presente."""
+        request = self._active_groups.get(group)
+        if request is not None:
+            request.cancel()
+
+    def _post(self, url, payload):
+        response = get_session().post(url, json=payload, timeout=self.timeout)
+        response.raise_for_status()  # Lancia un'eccezione per codici di stato HTTP 4xx/5xx
+        logging.info("Richiesta riuscita. Status code: %s, risposta: %s", response.status_code,
+                     summarize(response.content), extra=SAMPLED)
+        return response.json()
+
+    def _post_streaming(self, url, payload, on_item, skip):
+        """
+        Esegue la richiesta leggendo la risposta a blocchi e passando a on_item ogni elemento completo.
+
+        Args:
+            skip (int): Elementi già consegnati da un tentativo precedente, da non ripetere.
+
+        Returns:
+            object: Il documento decodificato se la risposta non era una lista, altrimenti None.
+        """
+        with get_session().post(url, json=payload, timeout=self.timeout, stream=True) as response:
+            response.raise_for_status()  # Lancia un'eccezione per codici di stato HTTP 4xx/5xx
+            logging.info("Richiesta riuscita. Status code: %s", response.status_code, extra=SAMPLED)
+            decoder = JsonArrayStream(response.encoding or 'utf-8')
+            index = 0
+            for chunk in response.iter_content(chunk_size=FETCH_STREAM_CHUNK_SIZE):
+                for item in decoder.feed(chunk):
+                    if index >= skip:
+                        on_item(item)
+                    index += 1
+            return decoder.close()
+
+    async def _fetch(self, request, url, payload, stream=False):
+        collector = None
+        if stream and request.endpoint_type == "fetch_all_data":
+            collector = _StreamCollector(request)
         try:
-            # Se data è un dict, estrai 'response' se presente
-            if isinstance(data, dict):
-                if 'response' in data:
-                    data = data['response']
-                elif 'error' in data:
-                    error_msg = data['error']
-                    logging.error(f"Errore ricevuto dalla risposta dell'API: {error_msg}")
-                    self.data_fetched.emit({'error': error_msg})
-                    return
-                else:
-                    logging.error("Formato dei dati ricevuti non riconosciuto.")
-                    self.data_fetched.emit({'error': "Formato dei dati ricevuti non riconosciuto."})
-                    return
-
-            if isinstance(data, list):
-                normavisitate_list = []
-                for item in data:
-                    logging.debug(f"Processando item: {item}")
-                    normavisitata = NormaVisitata.from_dict(item['norma_data'])
-                    normavisitata._article_text = item.get('article_text', '')
-                    normavisitata._brocardi_info = item.get('brocardi_info', {})
-                    normavisitate_list.append(normavisitata)
-
-                logging.info("Dati fetch_all_data elaborati con successo.")
-                self.data_fetched.emit(normavisitate_list)
+            result = await self._request_with_retries(request.endpoint_type, url, payload, collector)
+        except asyncio.CancelledError:
+            logging.info("Richiesta annullata.")
+            raise
+        if not request.cancelled:
+            request.data_fetched.emit(result)
+
+    async def _call(self, request, func, args):
+        loop = asyncio.get_running_loop()
+        try:
+            async with self._get_semaphore():
+                result = await loop.run_in_executor(self._executor, func, *args)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logging.error("Errore inaspettato durante l'esecuzione di %s: %s", getattr(func, '__name__', func), e)
+            result = {'error': str(e)}
+        if not request.cancelled:
+            request.data_fetched.emit(result)
+
+    async def _fetch_batch(self, batch, url, payloads, max_concurrency=None):
+        logging.info("Avvio di una ricerca multipla con %s richieste.", len(payloads))
+        results = [None] * len(payloads)
+        batch_limit = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+
+        async def fetch_one(index, payload):
+            if batch_limit is None:
+                result = await self._request_with_retries(batch.endpoint_type, url, payload)
             else:
-                logging.error("Formato dei dati ricevuti non riconosciuto.")
-                self.data_fetched.emit({'error': "Formato dei dati ricevuti non riconosciuto."})
+                async with batch_limit:
+                    result = await self._request_with_retries(batch.endpoint_type, url, payload)
+            results[index] = result
+            if not batch.cancelled:
+                batch.item_fetched.emit(index, result)
+
+        try:
+            await asyncio.gather(*(fetch_one(index, payload) for index, payload in enumerate(payloads)))
+        except asyncio.CancelledError:
+            logging.info("Ricerca multipla annullata.")
+            raise
+        if not batch.cancelled:
+            batch.data_fetched.emit(results)
+
+    async def _request_with_retries(self, endpoint_type, url, payload, collector=None):
+        """
+        Esegue una richiesta con i tentativi e il backoff esponenziale, restituendo il risultato elaborato.
+        Se è indicato un collector la risposta viene decodificata in streaming; gli elementi già
+        consegnati non vengono ripetuti da un nuovo tentativo.
+        """
+        loop = asyncio.get_running_loop()
+        result = None
+        attempts = 0
+        try:
+            while attempts < self.max_retries:
+                try:
+                    logging.info("Tentativo %s di inviare la richiesta a %s con payload: %s", attempts + 1, url, payload, extra=SAMPLED)
+                    # Il semaforo è tenuto solo durante la richiesta, non durante l'attesa tra i tentativi
+                    async with self._get_semaphore():
+                        if collector is None:
+                            data = await loop.run_in_executor(self._executor, self._post, url, payload)
+                        else:
+                            data = await loop.run_in_executor(
+                                self._executor, self._post_streaming, url, payload, collector, len(collector.items)
+                            )
+                    logging.debug("Dati ricevuti: %s", summarize(data))
+                    if collector is not None and data is None:
+                        result = list(collector.items)
+                    else:
+                        result = process_response(endpoint_type, data)
+                    logging.info("Richiesta completata con successo.", extra=SAMPLED)
+                    break
+                except (Timeout, ConnectionError) as e:
+                    attempts += 1
+                    logging.warning("Tentativo %s fallito: %s", attempts, e)
+                    if attempts == self.max_retries:
+                        logging.error("Numero massimo di tentativi raggiunto. Impossibile connettersi al server.")
+                        result = {'error': "Impossibile connettersi al server. Verifica la tua connessione internet."}
+                        break
+                    backoff_time = 2 ** attempts  # Exponential backoff
+                    logging.info("Attesa di %s secondi prima di riprovare.", backoff_time)
+                    await asyncio.sleep(backoff_time)
+                except HTTPError as e:
+                    logging.error("Errore HTTP: %s", e.response.status_code)
+                    result = {'error': f"Errore HTTP: {e.response.status_code}"}
+                    break
+                except json.JSONDecodeError:
+                    logging.error("Errore nel decodificare la risposta del server.")
+                    result = {'error': "Errore nel decodificare la risposta del server."}
+                    break
+                except RequestException as e:
+                    logging.error("Errore nella richiesta: %s", str(e))
+                    result = {'error': f"Errore nella richiesta: {str(e)}"}
+                    break
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
-            logging.error(f"Errore inaspettato: {e}")
-            self.data_fetched.emit({'error': "Si è verificato un errore inaspettato."})
+            logging.error("Errore inaspettato: %s", e)
+            result = {'error': "Si è verificato un errore inaspettato."}
+        return result
 
+    def shutdown(self):
+        """Annulla tutte le richieste in corso e arresta il loop."""
+        logging.info("Arresto del FetchEngine.")
+        for request in list(self._active_groups.values()):
+            request.cancel()
+
+        def _stop():
+            for task in asyncio.all_tasks(self._loop):
+                task.cancel()
+            self._loop.stop()
+
+        self._loop.call_soon_threadsafe(_stop)
+        self._thread.join(timeout=2)
+        self._executor.shutdown(wait=False)
+
+
+_engine = None
+
+
+def get_fetch_engine():
+    """Restituisce il FetchEngine condiviso, avviandolo al primo utilizzo."""
+    global _engine
+    if _engine is None:
+        _engine = FetchEngine()
+    return _engine
+
+
+def shutdown_fetch_engine():
+    """Arresta il FetchEngine condiviso, se è stato avviato."""
+    global _engine
+    if _engine is not None:
+        _engine.shutdown()
+        _engine = None
+
+
+def process_response(endpoint_type, data):
+    """
+    Converte la risposta JSON dell'API nel risultato da restituire all'interfaccia.
+
+    Returns:
+        list | dict: La lista di NormaVisitata oppure un dizionario con la chiave 'error'.
+    """
+    if endpoint_type == "fetch_all_data":
+        return handle_fetch_all_data(data)
+    elif endpoint_type == "fetch_article_text":
+        return handle_fetch_article_text(data)
+    elif endpoint_type == "fetch_brocardi_info":
+        return handle_fetch_brocardi_info(data)
+    elif endpoint_type == "fetch_normattiva_info":
+        return handle_fetch_normattiva_info(data)
+    logging.error("Endpoint non valido specificato")
+    return {'error': "Endpoint non valido"}
+
+
+def build_normavisitata(item):
+    """Costruisce una NormaVisitata da un elemento della risposta di fetch_all_data."""
+    logging.debug("Processando item: %s", summarize(item), extra=SAMPLED)
+    normavisitata = NormaVisitata.from_dict(item['norma_data'])
+    normavisitata._article_text = item.get('article_text', '')
+    normavisitata._brocardi_info = item.get('brocardi_info', {})
+    return normavisitata
+
+
+def handle_fetch_all_data(data):
+    logging.info("Gestione dei dati per fetch_all_data.")
+    try:
+        # Se data è un dict, estrai 'response' se presente
+        if isinstance(data, dict):
+            if 'response' in data:
+                data = data['response']
+            elif 'error' in data:
+                error_msg = data['error']
+                logging.error("Errore ricevuto dalla risposta dell'API: %s", error_msg)
+                return {'error': error_msg}
+            else:
+                logging.error("Formato dei dati ricevuti non riconosciuto.")
+                return {'error': "Formato dei dati ricevuti non riconosciuto."}
 
-    def handle_fetch_article_text(self, data):
-        logging.info("Gestione dei dati per fetch_article_text.")
-        if isinstance(data, list):
-            results = []
-            for item in data:
-                logging.debug(f"Processando item: {item}")
-                normavisitata = NormaVisitata.from_dict(item['norma_data'])
-                normavisitata._article_text = item.get('article_text', '')
-                results.append(normavisitata)
-            logging.info("Dati fetch_article_text elaborati con successo.")
-            self.data_fetched.emit(results)
-        else:
-            error_msg = data.get('error', "Errore nella risposta dell'API.")
-            logging.error(f"Errore ricevuto dalla risposta dell'API: {error_msg}")
-            self.data_fetched.emit({'error': error_msg})
-
-    def handle_fetch_brocardi_info(self, data):
-        logging.info("Gestione dei dati per fetch_brocardi_info.")
-        if isinstance(data, list):
-            results = []
-            for item in data:
-                logging.debug(f"Processando item: {item}")
-                normavisitata = NormaVisitata.from_dict(item['norma_data'])
-                normavisitata._brocardi_info = item.get('brocardi_info', {})
-                results.append(normavisitata)
-            logging.info("Dati fetch_brocardi_info elaborati con successo.")
-            self.data_fetched.emit(results)
-        else:
-            error_msg = data.get('error', "Errore nella risposta dell'API.")
-            logging.error(f"Errore ricevuto dalla risposta dell'API: {error_msg}")
-            self.data_fetched.emit({'error': error_msg})
-
-    def handle_fetch_normattiva_info(self, data):
-        logging.info("Gestione dei dati per fetch_normattiva_info.")
         if isinstance(data, list):
-            results = []
-            for item in data:
-                logging.debug(f"Processando item: {item}")
-                normavisitata = NormaVisitata.from_dict(item['norma_data'])
-                normavisitata._normattiva_info = item.get('normattiva_info', {})
-                results.append(normavisitata)
-            logging.info("Dati fetch_normattiva_info elaborati con successo.")
-            self.data_fetched.emit(results)
-        else:
-            error_msg = data.get('error', "Errore nella risposta dell'API.")
-            logging.error(f"Errore ricevuto dalla risposta dell'API: {error_msg}")
-            self.data_fetched.emit({'error': error_msg})
+            normavisitate_list = [build_normavisitata(item) for item in data]
+
+            logging.info("Dati fetch_all_data elaborati con successo.")
+            return normavisitate_list
+
+        logging.error("Formato dei dati ricevuti non riconosciuto.")
+        return {'error': "Formato dei dati ricevuti non riconosciuto."}
+    except Exception as e:
+        logging.error("Errore inaspettato: %s", e)
+        return {'error': "Si è verificato un errore inaspettato."}
+
+
+def handle_fetch_article_text(data):
+    logging.info("Gestione dei dati per fetch_article_text.")
+    if isinstance(data, list):
+        results = []
+        for item in data:
+            logging.debug("Processando item: %s", summarize(item), extra=SAMPLED)
+            normavisitata = NormaVisitata.from_dict(item['norma_data'])
+            normavisitata._article_text = item.get('article_text', '')
+            results.append(normavisitata)
+        logging.info("Dati fetch_article_text elaborati con successo.")
+        return results
+    error_msg = data.get('error', "Errore nella risposta dell'API.")
+    logging.error("Errore ricevuto dalla risposta dell'API: %s", error_msg)
+    return {'error': error_msg}
+
+
+def handle_fetch_brocardi_info(data):
+    logging.info("Gestione dei dati per fetch_brocardi_info.")
+    if isinstance(data, list):
+        results = []
+        for item in data:
+            logging.debug("Processando item: %s", summarize(item), extra=SAMPLED)
+            normavisitata = NormaVisitata.from_dict(item['norma_data'])
+            normavisitata._brocardi_info = item.get('brocardi_info', {})
+            results.append(normavisitata)
+        logging.info("Dati fetch_brocardi_info elaborati con successo.")
+        return results
+    error_msg = data.get('error', "Errore nella risposta dell'API.")
+    logging.error("Errore ricevuto dalla risposta dell'API: %s", error_msg)
+    return {'error': error_msg}
+
+
+def handle_fetch_normattiva_info(data):
+    logging.info("Gestione dei dati per fetch_normattiva_info.")
+    if isinstance(data, list):
+        results = []
+        for item in data:
+            logging.debug("Processando item: %s", summarize(item), extra=SAMPLED)
+            normavisitata = NormaVisitata.from_dict(item['norma_data'])
+            normavisitata._normattiva_info = item.get('normattiva_info', {})
+            results.append(normavisitata)
+        logging.info("Dati fetch_normattiva_info elaborati con successo.")
+        return results
+    error_msg = data.get('error', "Errore nella risposta dell'API.")
+    logging.error("Errore ricevuto dalla risposta dell'API: %s", error_msg)
+    return {'error': error_msg}
@@ -0,0 +1,69 @@
+# visualex_ui/network/http_client.py
+
+import threading
+import logging
+import requests
+from requests.adapters import HTTPAdapter
+from ..tools.config import HTTP_POOL_CONNECTIONS, HTTP_POOL_MAXSIZE, HTTP_POOL_BLOCK, HTTP_POOL_PER_HOST
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def _make_adapter(pool_connections, pool_maxsize, pool_block):
+    # I tentativi sono gestiti dai chiamanti, l'adapter non deve ripetere le richieste
+    return HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+                       pool_block=pool_block, max_retries=0)
+
+
+def create_session(pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=HTTP_POOL_MAXSIZE,
+                   pool_block=HTTP_POOL_BLOCK, per_host=None):
+    """
+    Crea una sessione HTTP con connection pooling e keep-alive.
+
+    Args:
+        pool_connections (int): Numero di host per cui mantenere un pool di connessioni.
+        pool_maxsize (int): Numero massimo di connessioni riutilizzabili per host.
+        pool_block (bool): Se True, attende una connessione libera invece di aprirne di nuove oltre il limite.
+        per_host (dict): Dimensioni del pool specifiche, indicizzate per prefisso URL.
+
+    Returns:
+        requests.Session: La sessione configurata.
+    """
+    session = requests.Session()
+    adapter = _make_adapter(pool_connections, pool_maxsize, pool_block)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    # requests sceglie l'adapter con il prefisso più lungo, quindi questi hanno la precedenza
+    per_host = HTTP_POOL_PER_HOST if per_host is None else per_host
+    for prefix, host_maxsize in per_host.items():
+        session.mount(prefix, _make_adapter(1, host_maxsize, pool_block))
+    session.headers.update({"Connection": "keep-alive"})
+    logging.debug("Sessione HTTP creata (pool_connections=%s, pool_maxsize=%s)", pool_connections, pool_maxsize)
+    return session
+
+
+def get_session():
+    """
+    Restituisce la sessione HTTP condivisa, creandola al primo utilizzo.
+
+    Returns:
+        requests.Session: La sessione condivisa da tutti i client dell'applicazione.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = create_session()
+    return _session
+
+
+def close_session():
+    """Chiude la sessione condivisa rilasciando le connessioni aperte."""
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
+            logging.debug("Sessione HTTP condivisa chiusa.")
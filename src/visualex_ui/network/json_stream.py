@@ -0,0 +1,178 @@
+# visualex_ui/network/json_stream.py
+
+import re
+import json
+import codecs
+
+# Risposta di /fetch_all_data incapsulata in un oggetto: {"response": [ ... ]}
+_WRAPPED_ARRAY_PATTERN = re.compile(r'\{\s*"response"\s*:\s*\[')
+# Prefisso massimo da attendere prima di decidere se la risposta è un array in streaming
+_WRAPPED_PREFIX_MAX = 64
+_WHITESPACE = ' \t\n\r'
+_DELIMITERS = _WHITESPACE + ',]'
+# Parentesi e virgole che delimitano gli elementi dell'array; stringhe JSON complete e corpo di una stringa aperta
+_STRUCTURAL_PATTERN = re.compile(r'[][{},]')
+_STRING_PATTERN = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+_STRING_BODY_PATTERN = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*', re.DOTALL)
+
+
+class JsonArrayStream:
+    """
+    Decodificatore JSON incrementale per risposte che contengono una lista di elementi,
+    sia come array di primo livello sia nella forma {"response": [...]}.
+
+    feed() restituisce gli elementi dell'array man mano che sono completi. I blocchi ricevuti sono tenuti
+    in una lista e scanditi una sola volta per riconoscere dove finisce l'elemento in arrivo: il JSON viene
+    decodificato solo quando almeno un elemento è completo, così il costo resta lineare anche per elementi
+    di molti megabyte. Le risposte con un'altra struttura (ad esempio {"error": ...}) vengono accumulate e
+    decodificate per intero da close().
+    """
+
+    def __init__(self, encoding='utf-8'):
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors='strict')
+        self._json = json.JSONDecoder()
+        self._buffer = ''  # Inizio della risposta, finché il formato non è riconosciuto
+        self._chunks = []  # Testo ricevuto e non ancora decodificato
+        self._state = 'start'  # start -> array -> done, oppure start -> document
+        self._reset_scan()
+        self.items_decoded = 0
+
+    def feed(self, chunk, final=False):
+        """
+        Aggiunge un blocco di byte alla risposta.
+
+        Returns:
+            list: Gli elementi dell'array completati da questo blocco.
+        """
+        text = self._decoder.decode(chunk, final)
+        if self._state == 'start':
+            self._buffer += text
+            self._detect_format(final)
+            if self._state == 'start':
+                return []
+            text, self._buffer = self._buffer, ''
+        if self._state == 'document':
+            self._chunks.append(text)
+            return []
+        if self._state != 'array':
+            return []
+
+        self._chunks.append(text)
+        if not (self._scan(text) or final):
+            return []
+        items, rest = self._drain(''.join(self._chunks), final)
+        self._chunks = [rest] if rest else []
+        self._reset_scan()
+        self._scan(rest)
+        return items
+
+    def close(self):
+        """
+        Conclude la decodifica.
+
+        Returns:
+            object: Il documento decodificato se la risposta non era una lista in streaming, altrimenti None.
+
+        Raises:
+            json.JSONDecodeError: Se la risposta è incompleta o non valida.
+        """
+        self.feed(b'', final=True)
+        if self._state == 'document':
+            return json.loads(''.join(self._chunks))
+        if self._state != 'done':
+            rest = ''.join(self._chunks)
+            raise json.JSONDecodeError("Risposta JSON incompleta", rest, len(rest))
+        return None
+
+    def _detect_format(self, final):
+        text = self._buffer.lstrip(_WHITESPACE)
+        if not text:
+            if final:
+                self._state = 'document'
+            return
+        if text[0] == '[':
+            self._buffer = text[1:]
+            self._state = 'array'
+            return
+        match = _WRAPPED_ARRAY_PATTERN.match(text)
+        if match:
+            self._buffer = text[match.end():]
+            self._state = 'array'
+        elif final or text[0] != '{' or len(text) >= _WRAPPED_PREFIX_MAX:
+            self._state = 'document'
+
+    def _reset_scan(self):
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    def _scan(self, text):
+        """
+        Prosegue la scansione dell'elemento in arrivo con un nuovo blocco di testo.
+
+        Returns:
+            bool: True se nel blocco si chiude almeno un elemento (o l'array).
+        """
+        if self._in_string:
+            pos = 1 if self._escape else 0
+            self._escape = False
+            end = _STRING_BODY_PATTERN.match(text, min(pos, len(text))).end()
+            if end >= len(text):
+                self._escape = pos > len(text)
+                return False
+            if text[end] == '\\':  # Barra rovesciata a fine blocco: il carattere escapato arriva dopo
+                self._escape = True
+                return False
+            self._in_string = False
+            text = text[end + 1:]
+            if self._depth == 0:
+                return True  # Una stringa come elemento dell'array
+        # Le stringhe complete non contano: restano parentesi, virgole e l'eventuale stringa aperta in coda
+        text = _STRING_PATTERN.sub('', text)
+        quote = text.find('"')
+        if quote >= 0:
+            tail = text[quote + 1:]
+            self._in_string = True
+            self._escape = _STRING_BODY_PATTERN.match(tail).end() < len(tail)
+            text = text[:quote]
+        if self._depth and ']' not in text and '}' not in text:
+            self._depth += text.count('[') + text.count('{')
+            return False
+        for char in _STRUCTURAL_PATTERN.findall(text):
+            if char in '[{':
+                self._depth += 1
+            elif char == ',':
+                if self._depth == 0:
+                    return True  # La virgola chiude un numero o un letterale
+            elif self._depth <= 1:
+                return True  # Chiusura di un elemento, o dell'array stesso
+            else:
+                self._depth -= 1
+        return False
+
+    def _drain(self, buffer, final):
+        items = []
+        pos = 0
+        length = len(buffer)
+        while True:
+            while pos < length and (buffer[pos] in _WHITESPACE or buffer[pos] == ','):
+                pos += 1
+            if pos >= length:
+                break
+            if buffer[pos] == ']':
+                # Il resto della risposta (la chiusura dell'oggetto contenitore) viene ignorato
+                self._state = 'done'
+                pos = length
+                break
+            try:
+                item, end = self._json.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if final:
+                    raise
+                break  # Elemento incompleto: si attende il prossimo blocco
+            if not final and not isinstance(item, (dict, list)) and (end == length or buffer[end] not in _DELIMITERS):
+                break  # Un numero o un letterale potrebbe continuare nel prossimo blocco ("-2500." + "0")
+            items.append(item)
+            pos = end
+        self.items_decoded += len(items)
+        return items, buffer[pos:]
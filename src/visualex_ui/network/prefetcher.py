@@ -0,0 +1,171 @@
+# visualex_ui/network/prefetcher.py
+
+import logging
+from PyQt6.QtCore import QObject, pyqtSignal
+from .data_fetcher import get_fetch_engine
+from ..utils.cache_manager import make_cache_key
+from ..tools.text_op import normalize_article
+from ..tools.config import PREFETCH_WINDOW, PREFETCH_MAX_CONCURRENCY
+
+
+def _load_article_list(norma):
+    """Recupera l'elenco degli articoli della norma dal suo albero. Eseguita sul pool di I/O del motore."""
+    tree = norma.tree
+    if isinstance(tree, tuple) and tree[1]:
+        return tuple(normalize_article(article) for article in tree[0])
+    logging.warning("Albero non disponibile per %s: %s", norma, tree)
+    return ()
+
+
+class ArticlePrefetcher(QObject):
+    """
+    Scarica in anticipo nella cache gli articoli che precedono e seguono quello visualizzato,
+    seguendo l'ordine dell'albero della norma (Norma.tree).
+
+    Le richieste di prefetch usano il gruppo "prefetch" del motore di fetch: un nuovo prefetch
+    annulla quello precedente, e il cambio di atto annulla anche il recupero dell'albero in corso.
+    Tutti i metodi vanno chiamati dal thread principale.
+    """
+    tree_loaded = pyqtSignal(str)  # url della norma il cui elenco di articoli è ora disponibile
+
+    def __init__(self, cache_manager, window=PREFETCH_WINDOW, max_concurrency=PREFETCH_MAX_CONCURRENCY, parent=None):
+        super().__init__(parent)
+        self.cache_manager = cache_manager
+        self.window = window
+        self.max_concurrency = max_concurrency
+        self.trees = {}  # url della norma -> elenco normalizzato degli articoli (tupla)
+        self._current_url = None
+        self._tree_request = None
+        self._batch = None
+        self._in_flight = set()
+        self._latest = None  # Ultima richiesta di prefetch, ripresa quando l'albero è disponibile
+
+    def payload_for(self, normavisitata, article, base_payload=None):
+        """
+        Costruisce il payload di ricerca per un altro articolo della stessa norma.
+
+        Args:
+            normavisitata (NormaVisitata): L'articolo di riferimento.
+            article (str): Il numero dell'articolo da cercare.
+            base_payload (dict): Il payload della ricerca originale, da cui riprendere versione e data di vigenza.
+        """
+        norma = normavisitata.norma
+        base_payload = base_payload or {}
+        return {
+            'act_type': norma.tipo_atto_str,
+            'version': base_payload.get('version') or normavisitata.versione or 'vigente',
+            'date': norma.data,
+            'act_number': norma.numero_atto,
+            'article': article,
+            'version_date': base_payload.get('version_date') or normavisitata.data_versione,
+            'annex': normavisitata.allegato,
+        }
+
+    def neighbour(self, normavisitata, offset):
+        """
+        Restituisce il numero dell'articolo che si trova a `offset` posizioni da quello indicato,
+        oppure None se l'albero della norma non è ancora noto o si esce dai suoi limiti.
+        """
+        articles = self.trees.get(normavisitata.norma._url)
+        if not articles:
+            return None
+        try:
+            index = articles.index(normalize_article(normavisitata.numero_articolo))
+        except ValueError:
+            return None
+        target = index + offset
+        if 0 <= target < len(articles):
+            return articles[target]
+        return None
+
+    def prefetch_around(self, api_url, normavisitata, base_payload=None):
+        """
+        Avvia in background il recupero degli articoli vicini a quello visualizzato.
+
+        Args:
+            api_url (str): L'URL base dell'API.
+            normavisitata (NormaVisitata): L'articolo visualizzato.
+            base_payload (dict): Il payload della ricerca originale.
+        """
+        if not self.window:
+            return
+        self._latest = (api_url, normavisitata, base_payload)
+        url = normavisitata.norma._url
+        if not url:
+            # Senza URL fornito dal server servirebbe generarlo qui, con un possibile accesso a Selenium
+            logging.debug("Prefetch saltato: URL della norma non disponibile.")
+            return
+
+        if url != self._current_url:
+            self.cancel()
+            self._current_url = url
+
+        if url not in self.trees:
+            if self._tree_request is None:
+                self._load_tree(normavisitata.norma)
+            return
+
+        payloads = {}
+        for offset in list(range(1, self.window + 1)) + list(range(-1, -self.window - 1, -1)):
+            article = self.neighbour(normavisitata, offset)
+            if article is None:
+                continue
+            payload = self.payload_for(normavisitata, article, base_payload)
+            key = make_cache_key(payload)
+            if key in payloads or self.cache_manager.get_cached_data(key) is not None:
+                continue
+            payloads[key] = payload
+
+        if not payloads or set(payloads) <= self._in_flight:
+            return
+
+        logging.debug("Prefetch di %s articoli vicini: %s", len(payloads), [p['article'] for p in payloads.values()])
+        keys = list(payloads)
+        batch = get_fetch_engine().submit_batch(
+            url=api_url+'/fetch_all_data', payloads=list(payloads.values()), endpoint_type="fetch_all_data",
+            group="prefetch", max_concurrency=self.max_concurrency
+        )
+        batch.item_fetched.connect(lambda index, data: self._on_item_fetched(batch, keys[index], payloads[keys[index]], data))
+        batch.data_fetched.connect(lambda results: self._on_batch_finished(batch))
+        self._batch = batch
+        self._in_flight = set(keys)
+
+    def cancel(self):
+        """Annulla il prefetch e il recupero dell'albero in corso."""
+        if self._tree_request is not None:
+            self._tree_request.cancel()
+            self._tree_request = None
+        if self._batch is not None:
+            self._batch.cancel()
+            self._batch = None
+        self._in_flight = set()
+
+    def _load_tree(self, norma):
+        url = norma._url
+        request = get_fetch_engine().submit_call(_load_article_list, norma, group="prefetch_tree")
+        request.data_fetched.connect(lambda articles: self._on_tree_loaded(request, url, articles))
+        self._tree_request = request
+
+    def _on_tree_loaded(self, request, url, articles):
+        if request.cancelled:
+            return
+        self._tree_request = None
+        if isinstance(articles, dict):
+            articles = ()
+        self.trees[url] = articles
+        logging.debug("Albero caricato per il prefetch: %s articoli.", len(articles))
+        self.tree_loaded.emit(url)
+        if articles and url == self._current_url:
+            self.prefetch_around(*self._latest)
+
+    def _on_item_fetched(self, batch, key, payload, data):
+        if batch.cancelled:
+            return
+        self._in_flight.discard(key)
+        if isinstance(data, list) and data:
+            self.cache_manager.cache_data(key, data, version=payload.get('version'))
+
+    def _on_batch_finished(self, batch):
+        if batch is self._batch:
+            self._batch = None
+            self._in_flight = set()
@@ -79,7 +79,7 @@ class ThemeManager:
 
             return final_stylesheet
         except Exception as e:
-            logging.error(f"Errore nella generazione del foglio di stile: {e}")
+            logging.error("Errore nella generazione del foglio di stile: %s", e)
             return ""
 
     @staticmethod
@@ -0,0 +1,438 @@
+"""
+Micro-benchmarks for the hot paths of the tools package.
+
+Usage: python -m visualex_ui.tools.benchmarks [name ...] [-- extra arguments]
+Without names every benchmark runs. Benchmarks use synthetic inputs unless given real ones.
+The exit status is non-zero if a check of the output failed.
+"""
+import gc
+import re
+import sys
+import time
+import random
+import logging
+import statistics
+import tracemalloc
+
+BENCHMARKS = {}
+FAILURES = []
+
+
+def benchmark(name):
+    """Registers a benchmark function under name."""
+    def register(func):
+        BENCHMARKS[name] = func
+        return func
+    return register
+
+
+def measure(func, repeat=5):
+    """
+    Runs func repeat times.
+
+    Returns:
+    tuple -- (median seconds, last result)
+    """
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), result
+
+
+def fail(message):
+    """Reports a failed check; main() then exits with a non-zero status."""
+    FAILURES.append(message)
+    print(f"  !! {message}")
+
+
+def report(label, seconds, baseline=None):
+    line = f"  {label:<40} {seconds * 1000:10.2f} ms"
+    if baseline:
+        line += f"   x{baseline / seconds:6.1f}"
+    print(line)
+
+
+def _synthetic_normattiva_page(articles=2000, filler=4000, tree_first=False):
+    body = "".join(f"<div class='bodyTesto'><p>Comma {i} del testo <b>in grassetto</b> e "
+                   f"<a href='#n{i}'>rinvio</a>.</p></div>" for i in range(filler))
+    items = []
+    for i in range(1, articles + 1):
+        items.append(f"<li><a class='numero_articolo' href='/art{i}'>art. {i}</a></li>")
+        if i % 10 == 0:
+            items.append(f"<li><a class='numero_articolo' href='/art{i}bis'>art. {i} bis</a></li>")
+        if i % 50 == 0:
+            items.append(f"<li class='agg1'><a class='numero_articolo' href='/agg{i}'>art. {i}</a></li>")
+    tree = "<div id='albero'><ul>" + "".join(items) + "</ul></div>"
+    content = tree + body if tree_first else body + tree
+    return f"<html><head><meta charset='utf-8'><title>Norma</title></head><body>{content}</body></html>".encode("utf-8")
+
+
+def _synthetic_eurlex_page(articles=360, paragraphs=12):
+    parts = ["<html><head><meta charset='utf-8'></head><body><div id='TOC'>"]
+    parts += [f"<p><a href='#art_{i}'>Articolo {i}</a></p>" for i in range(1, articles + 1)]
+    parts.append("</div>")
+    for i in range(1, articles + 1):
+        parts.append(f"<div class='eli-subdivision' id='art_{i}'><p class='ti-art'>Articolo {i}</p>")
+        parts += [f"<p class='normal'>{j}. L'Unione <span>persegue</span> i suoi obiettivi con i mezzi appropriati; "
+                  f"vedi <a href='#art_{(i + j) % articles + 1}'>Articolo {(i + j) % articles + 1}</a>.</p>"
+                  for j in range(paragraphs)]
+        parts.append("</div>")
+    parts.append("</body></html>")
+    return "".join(parts).encode("utf-8")
+
+
+def _load_page(source):
+    if source.startswith("http"):
+        from ..network.http_client import get_session
+        return get_session().get(source, timeout=30).content
+    with open(source, "rb") as f:
+        return f.read()
+
+
+@benchmark("tree")
+def bench_tree(args):
+    """treextractor.parse_tree_page with each installed parser backend, with and without BeautifulSoup scoping."""
+    from .treextractor import parse_tree_page, available_parser
+
+    if args:
+        pages = [(source, _load_page(source)) for source in args]
+    else:
+        pages = [("https://www.normattiva.it/uri-res/N2Ls?urn:nir:synthetic", _synthetic_normattiva_page()),
+                 ("https://eur-lex.europa.eu/synthetic", _synthetic_eurlex_page())]
+
+    backends = [b for b in ("html.parser", "lxml-bs4", "html5lib", "lxml") if available_parser((b,)) == b]
+    for url, markup in pages:
+        print(f"{url} ({len(markup) / 1024:.0f} KB)")
+        baseline, expected = measure(lambda: parse_tree_page(markup, url, parser="html.parser", scoped=False), repeat=3)
+        report("html.parser, whole page", baseline)
+        for backend in backends:
+            for scoped in (False, True):
+                if (backend == "html.parser" and not scoped) or (backend == "lxml" and scoped):
+                    continue  # The baseline, and lxml is not driven by BeautifulSoup so it cannot be scoped
+                seconds, result = measure(lambda: parse_tree_page(markup, url, parser=backend, scoped=scoped), repeat=3)
+                report(f"{backend}, {'scoped' if scoped else 'whole page'}", seconds, baseline)
+                if result != expected:
+                    fail(f"{backend} ({'scoped' if scoped else 'whole page'}) returned a different tree")
+
+
+@benchmark("tree-stream")
+def bench_tree_stream(args):
+    """Normattiva pages read in full versus streamed until div#albero closes."""
+    from .treextractor import parse_tree_page, extract_albero
+    from .config import TREE_STREAM_CHUNK_SIZE
+
+    url = "https://www.normattiva.it/uri-res/N2Ls?urn:nir:synthetic"
+    for label, page in (("tree before the text", _synthetic_normattiva_page(tree_first=True)),
+                        ("tree after the text", _synthetic_normattiva_page())):
+        chunks = [page[i:i + TREE_STREAM_CHUNK_SIZE] for i in range(0, len(page), TREE_STREAM_CHUNK_SIZE)]
+        print(f"{label} ({len(page) / 1024:.0f} KB)")
+        baseline, expected = measure(lambda: parse_tree_page(b"".join(chunks), url), repeat=3)
+        report("whole page", baseline)
+
+        def streamed():
+            markup, bytes_read, content = extract_albero(iter(chunks))
+            return parse_tree_page(markup if markup is not None else content, url), bytes_read
+
+        seconds, (result, bytes_read) = measure(streamed, repeat=3)
+        report(f"streamed, {bytes_read / 1024:.0f} KB read", seconds, baseline)
+        if result != expected:
+            fail("streaming returned a different tree")
+
+
+def _clean_text_reference(article_text):
+    """The eight-pass text_op.clean_text that the single-pass version must reproduce byte for byte."""
+    if not article_text:
+        return ''
+    article_text = re.sub(r'\(\([\n\s]*(.*?)\n*\)\)', r'((\1))', article_text, flags=re.DOTALL)
+    cleaned_text = re.sub(r'(\bArt\.\s*\d+)\n+', r'\1\n\n', article_text)
+    cleaned_text = re.sub(r'(\b\d+(-[a-z]+)?\.)\s*\n(?!\d+\.|\S*\.)', r'\1 ', cleaned_text)
+    cleaned_text = re.sub(r'(?<=\.)\n+', '\n\n', cleaned_text)
+    cleaned_text = re.sub(r'\n{3,}', '\n\n', cleaned_text)
+    cleaned_text = re.sub(r'[ \t]+\n', '\n', cleaned_text)
+    cleaned_text = re.sub(r'\n[ \t]+', '\n', cleaned_text)
+    return cleaned_text.strip()
+
+
+def _synthetic_article(number, commas=8):
+    parts = [f"Art. {number}\n\n(Rubrica dell'articolo {number})\n"]
+    for comma in range(1, commas + 1):
+        suffix = "-bis" if comma % 4 == 0 else ""
+        parts.append(f"{comma}{suffix}.\n  Il testo del comma {comma} richiama l'art. {comma + 3} e "
+                     f"((\n\t le parole modificate dalla legge n. {comma}\n\n)) , poi prosegue.  \n\n\n")
+    return "".join(parts)
+
+
+# Fragments for the fuzz check, chosen to hit every pattern of clean_text and their interactions
+_FUZZ_FRAGMENTS = ["((", "))", "(", ")", "\n", "\n\n", " ", "\t", ".", "1", "23", "-bis", "Art.", "Art. 4",
+                   "a", "testo", "\u00a0", "\r", "x.y", "2.", "-", "\\"]
+
+
+def _fuzz_text(rng):
+    return "".join(rng.choice(_FUZZ_FRAGMENTS) for _ in range(rng.randint(0, 60)))
+
+
+@benchmark("clean-text")
+def bench_clean_text(args):
+    """text_op.clean_text against the eight-pass implementation, with a fuzz check of identical output."""
+    from .text_op import clean_text
+
+    if args:
+        texts = []
+        for source in args:
+            with open(source, encoding="utf-8") as f:
+                texts.append(f.read())
+        corpora = [("given texts", texts)]
+    else:
+        corpora = [("synthetic articles", [_synthetic_article(number) for number in range(1, 400)]),
+                   # Unclosed (( made the old non-greedy DOTALL pattern rescan the rest of the text each time
+                   ("unclosed double parentheses", [("((" + " testo" * 2000 + "\n") * 200])]
+
+    for label, texts in corpora:
+        print(f"{label}: {len(texts)} texts ({sum(map(len, texts)) / 1024:.0f} KB)")
+        baseline, expected = measure(lambda: [_clean_text_reference(text) for text in texts], repeat=3)
+        report("eight re.sub passes", baseline)
+        seconds, result = measure(lambda: [clean_text(text) for text in texts], repeat=3)
+        report("compiled normalizer", seconds, baseline)
+        if result != expected:
+            fail("the compiled normalizer returned a different text")
+        seconds, _ = measure(lambda: [clean_text(text, urn=f"{label}/{i}") for i, text in enumerate(texts)], repeat=3)
+        report("memoised per urn (after the first run)", seconds, baseline)
+
+    rng = random.Random(0)
+    mismatches = 0
+    for _ in range(20000):
+        text = _fuzz_text(rng)
+        if clean_text(text) != _clean_text_reference(text):
+            mismatches += 1
+            if mismatches <= 3:
+                print(f"  fuzz mismatch on {text!r}")
+    if mismatches:
+        fail(f"fuzz: {mismatches} mismatches over 20000 random texts")
+    else:
+        print("  fuzz: no mismatches over 20000 random texts")
+
+
+def _fetch_all_data_items(articles=300):
+    """A fetch_all_data response for consecutive articles of one act, as the API returns it."""
+    return [{"norma_data": {"tipo_atto": "codice civile", "data": "1942-03-16", "numero_atto": "262",
+                            "url": "https://www.normattiva.it/uri-res/N2Ls?urn:nir:stato:regio.decreto:1942-03-16;262",
+                            "numero_articolo": str(number), "versione": "vigente", "data_versione": None,
+                            "allegato": "2"},
+             "article_text": f"Art. {number}", "brocardi_info": {}}
+            for number in range(1, articles + 1)]
+
+
+def measure_memory(func):
+    """Returns the bytes still allocated by the result of func, as traced by tracemalloc."""
+    tracemalloc.start()
+    try:
+        result = func()
+        allocated, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del result
+    return allocated
+
+
+def _reference_norma_classes():
+    """Norma and NormaVisitata as regular dataclasses with a record per article, as before interning."""
+    from dataclasses import dataclass, field
+    from .text_op import normalize_act_type
+    from ..utils.logging_setup import SAMPLED
+
+    @dataclass
+    class ReferenceNorma:
+        tipo_atto: str
+        data: str = None
+        numero_atto: str = None
+        _url: str = None
+        _tree: any = field(default=None, repr=False)
+
+        def __post_init__(self):
+            logging.debug("Initializing Norma with tipo_atto: %s, data: %s, numero_atto: %s", self.tipo_atto,
+                          self.data, self.numero_atto, extra=SAMPLED)
+            self.tipo_atto_str = normalize_act_type(self.tipo_atto, search=True)
+            self.tipo_atto_urn = normalize_act_type(self.tipo_atto)
+            logging.debug("Norma initialized: %s", self, extra=SAMPLED)
+
+    @dataclass(eq=False)
+    class ReferenceNormaVisitata:
+        norma: ReferenceNorma
+        allegato: str = None
+        numero_articolo: str = None
+        versione: str = None
+        data_versione: str = None
+        _urn: str = field(default=None, repr=False)
+
+        def __post_init__(self):
+            logging.debug("NormaVisitata initialized: %s", self, extra=SAMPLED)
+
+    return ReferenceNorma, ReferenceNormaVisitata
+
+
+@benchmark("norma")
+def bench_norma(args):
+    """NormaVisitata for a multi-article response: a dataclass record per article versus slotted, interned records."""
+    from ..network.data_fetcher import handle_fetch_all_data
+    from ..utils.logging_setup import SAMPLED, summarize
+
+    articles = int(args[0]) if args else 300
+    items = _fetch_all_data_items(articles)
+    ReferenceNorma, ReferenceNormaVisitata = _reference_norma_classes()
+
+    def one_norma_per_article():
+        results = []
+        for item in items:
+            # The logging calls of the former build_normavisitata and NormaVisitata.from_dict
+            logging.debug("Processando item: %s", summarize(item), extra=SAMPLED)
+            data = item["norma_data"]
+            logging.debug("Creating NormaVisitata from dict: %s", summarize(data), extra=SAMPLED)
+            norma = ReferenceNorma(tipo_atto=data["tipo_atto"], data=data.get("data"),
+                                   numero_atto=data.get("numero_atto"), _url=data.get("url"))
+            visitata = ReferenceNormaVisitata(norma=norma, numero_articolo=data.get("numero_articolo"),
+                                              versione=data.get("versione"), data_versione=data.get("data_versione"),
+                                              allegato=data.get("allegato"))
+            logging.debug("NormaVisitata created: %s", visitata, extra=SAMPLED)
+            visitata._article_text = item.get("article_text", "")
+            visitata._brocardi_info = item.get("brocardi_info", {})
+            results.append(visitata)
+        return results
+
+    def interned():
+        return handle_fetch_all_data(items)
+
+    print(f"{articles} articles of one act")
+    baseline, expected = measure(one_norma_per_article, repeat=20)
+    report("a dataclass Norma per article", baseline)
+    seconds, result = measure(interned, repeat=20)
+    report("slotted, interned (handle_fetch_all_data)", seconds, baseline)
+    for visitata, reference in zip(result, expected):
+        if (visitata.norma.tipo_atto_urn, visitata.numero_articolo, visitata._article_text) != \
+                (reference.norma.tipo_atto_urn, reference.numero_articolo, reference._article_text):
+            fail("the interned records describe different articles")
+            break
+    if len({id(visitata.norma) for visitata in result}) != 1:
+        fail("the articles do not share one Norma record")
+
+    baseline_bytes = measure_memory(one_norma_per_article)
+    interned_bytes = measure_memory(interned)
+    print(f"  {'memory, a dataclass Norma per article':<40} {baseline_bytes / 1024:10.1f} KB")
+    print(f"  {'memory, slotted and interned':<40} {interned_bytes / 1024:10.1f} KB   x{baseline_bytes / interned_bytes:6.1f}")
+
+
+@benchmark("norma-memory")
+def bench_norma_memory(args):
+    """Memory held after thousands of searches: it must level off once the bounded caches are full."""
+    from ..network.data_fetcher import handle_fetch_all_data
+
+    searches = int(args[0]) if args else 5000
+    checkpoint = max(searches // 5, 1)
+    article_text = "Il testo dell'articolo. " * 800  # About 19 KB, a long article
+
+    def search(number):
+        item = {"norma_data": {"tipo_atto": "legge", "data": f"{1950 + number % 70}-01-01", "numero_atto": str(number),
+                               "numero_articolo": str(number % 40 + 1), "versione": "vigente"},
+                "article_text": article_text + str(number), "brocardi_info": {}}
+        for visitata in handle_fetch_all_data([item]):
+            # What the viewer does with a result before it is replaced by the next search
+            visitata.to_dict()
+            str(visitata)
+
+    print(f"{searches} searches, each of a different act, with a {len(article_text) / 1024:.0f} KB article")
+    tracemalloc.start()
+    try:
+        samples = []
+        start = time.perf_counter()
+        for number in range(1, searches + 1):
+            search(number)
+            if number % checkpoint == 0:
+                gc.collect()
+                samples.append((number, tracemalloc.get_traced_memory()[0]))
+        elapsed = time.perf_counter() - start
+    finally:
+        tracemalloc.stop()
+    for number, allocated in samples:
+        print(f"  {f'after {number} searches':<40} {allocated / 1024:10.1f} KB")
+    report("total time", elapsed)
+    # Past the first checkpoint every cache is full: what is still growing is leaking
+    growth = samples[-1][1] - samples[0][1]
+    if len(samples) > 1 and growth > len(article_text) * 10:
+        fail(f"memory grew by {growth / 1024:.0f} KB after the first {samples[0][0]} searches")
+    # Results of past searches, and their article texts, must not be kept alive by any cache
+    if samples[-1][1] > len(article_text) * 100:
+        fail(f"{samples[-1][1] / 1024:.0f} KB still held, more than the text of 100 articles")
+
+
+@benchmark("urns")
+def bench_urns(args):
+    """urngenerator.generate_urns against one generate_urn call per article, with a check of identical output."""
+    from .urngenerator import generate_urn, generate_urns
+
+    articles = int(args[0]) if args else 300
+    numbers = [f"{number}-bis" if number % 10 == 0 else f"art. {number}" for number in range(1, articles + 1)]
+    acts = [("codice civile", None, None), ("legge", "2000-05-10", "123"), ("decreto legislativo", "10 maggio 2000", "45")]
+
+    for act_type, date, act_number in acts:
+        print(f"{act_type}: {articles} articles")
+
+        def one_call_per_article():
+            generate_urn.cache_clear()  # A range is new to the cache the first time it is validated
+            return [generate_urn(act_type, date, act_number, article=number, version="vigente",
+                                 version_date="2024-01-01") for number in numbers]
+
+        baseline, expected = measure(one_call_per_article)
+        report("generate_urn per article", baseline)
+        seconds, result = measure(lambda: generate_urns(act_type, date, act_number, numbers, version="vigente",
+                                                        version_date="2024-01-01"))
+        report("generate_urns", seconds, baseline)
+        if result != expected:
+            fail("generate_urns returned different URNs")
+
+
+@benchmark("urn-parse")
+def bench_urn_parse(args):
+    """urn_parser.parse_urn on generated URNs, with a check that serializing gives back the same string."""
+    from .urngenerator import generate_urns
+    from .urn_parser import parse_urn
+
+    articles = int(args[0]) if args else 1000
+    numbers = [f"{number}-bis" if number % 10 == 0 else str(number) for number in range(1, articles + 1)]
+    urns = (generate_urns("codice civile", articles=numbers, version="vigente", version_date="2024-01-01")
+            + generate_urns("legge", "2000-05-10", "123", numbers, annex="1", version="originale")
+            + generate_urns("costituzione", articles=numbers))
+    parse = parse_urn.__wrapped__  # Without the lru_cache, to time the parser itself
+
+    print(f"{len(urns)} URNs")
+    seconds, parsed = measure(lambda: [parse(urn) for urn in urns])
+    report("parse_urn, uncached", seconds)
+    seconds, _ = measure(lambda: [item.to_string() for item in parsed])
+    report("Urn.to_string", seconds)
+    mismatches = sum(1 for urn, item in zip(urns, parsed) if item is None or item.to_string() != urn)
+    if mismatches:
+        fail(f"{mismatches} URNs did not survive the round trip")
+
+
+def main(argv):
+    if "--" in argv:
+        split = argv.index("--")
+        names, args = argv[:split], argv[split + 1:]
+    else:
+        names, args = argv, []
+    for name in names or BENCHMARKS:
+        if name not in BENCHMARKS:
+            print(f"Unknown benchmark {name!r}; available: {', '.join(BENCHMARKS)}")
+            return 1
+        print(f"[{name}] {BENCHMARKS[name].__doc__}")
+        BENCHMARKS[name](args)
+    if FAILURES:
+        print(f"{len(FAILURES)} failed checks")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    logging.disable(logging.CRITICAL)
+    sys.exit(main(sys.argv[1:]))
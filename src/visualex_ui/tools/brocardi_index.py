@@ -0,0 +1,186 @@
+import re
+import time
+import bisect
+import logging
+import threading
+import unicodedata
+from collections import defaultdict
+
+_TOKEN_PATTERN = re.compile(r'[a-z]+|\d+')
+# Words too common to narrow a query down
+STOPWORDS = frozenset({
+    "a", "al", "alla", "alle", "con", "d", "da", "dal", "de", "dei", "del", "della", "delle", "dello", "di",
+    "e", "ed", "gli", "i", "il", "in", "l", "la", "le", "lo", "n", "nel", "nella", "o", "per", "su", "un", "una",
+    "https", "www", "brocardi", "it", "html",
+})
+_MAX_PREFIX_TERMS = 64  # Vocabulary terms a prefix may expand to
+_MAX_FUZZY_TERMS = 5  # Vocabulary terms a misspelt word may expand to
+_MIN_FUZZY_SIMILARITY = 0.45
+
+# Weight of each kind of token match in the ranking
+_EXACT, _PREFIX, _FUZZY = 1.0, 0.8, 0.5
+
+
+def fold(text):
+    """Lowercases text and strips accents ("Indennità" -> "indennita")."""
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).lower()
+
+
+def tokenize(text):
+    """
+    Splits text into folded words and numbers, dropping stopwords.
+    Digits and letters are split apart, so "art3" and "art. 3" yield the same tokens.
+    """
+    return [token for token in _TOKEN_PATTERN.findall(fold(text)) if token not in STOPWORDS]
+
+
+def _trigrams(term):
+    padded = f"  {term} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class BrocardiIndex:
+    """
+    Search index over the headings and URLs of BROCARDI_MAP.
+
+    Every entry is indexed by the words of its heading and of its URL path, so that
+    "affido condiviso art 3" finds .../affido-condiviso/art3.html. A sorted vocabulary answers
+    prefix queries by bisection, and a trigram index over the vocabulary finds misspelt words.
+    """
+
+    def __init__(self, table):
+        start = time.perf_counter()
+        self.entries = list(table.items())  # (heading, url)
+        self.entry_tokens = []  # entry id -> frozenset of its tokens
+        postings = defaultdict(list)
+        for entry_id, (heading, url) in enumerate(self.entries):
+            path = url.split("://", 1)[-1].split("/", 1)[-1]
+            tokens = frozenset(tokenize(heading) + tokenize(path))
+            self.entry_tokens.append(tokens)
+            for token in tokens:
+                postings[token].append(entry_id)
+        self.postings = dict(postings)
+        self.vocabulary = sorted(self.postings)
+
+        trigrams = defaultdict(list)
+        for term in self.vocabulary:
+            if not term.isdigit():
+                for trigram in _trigrams(term):
+                    trigrams[trigram].append(term)
+        self.trigrams = dict(trigrams)
+        logging.info("BrocardiIndex built: %s entries, %s terms in %.0f ms", len(self.entries), len(self.vocabulary), (time.perf_counter() - start) * 1000)
+
+    def expand(self, token, prefix=True):
+        """
+        Finds the vocabulary terms a query token may stand for.
+
+        Arguments:
+        token -- A folded query token
+        prefix -- If True, terms starting with the token also match
+
+        Returns:
+        dict -- term -> match weight
+        """
+        terms = {}
+        if token in self.postings:
+            terms[token] = _EXACT
+        if token.isdigit():
+            # Numbers only match exactly: "3" must not find articles 30 to 39
+            return terms
+        if prefix:
+            start = bisect.bisect_left(self.vocabulary, token)
+            for term in self.vocabulary[start:start + _MAX_PREFIX_TERMS + 1]:
+                if not term.startswith(token):
+                    break
+                terms.setdefault(term, _PREFIX)
+        if not terms and len(token) >= 3:
+            terms = {term: _FUZZY * similarity for term, similarity in self._similar_terms(token)}
+        return terms
+
+    def _similar_terms(self, token):
+        query_trigrams = _trigrams(token)
+        shared = defaultdict(int)
+        for trigram in query_trigrams:
+            for term in self.trigrams.get(trigram, ()):
+                shared[term] += 1
+        scored = []
+        for term, count in shared.items():
+            similarity = count / (len(query_trigrams) + len(term) + 1 - count)  # Jaccard over trigram sets
+            if similarity >= _MIN_FUZZY_SIMILARITY:
+                scored.append((similarity, term))
+        scored.sort(reverse=True)
+        return [(term, similarity) for similarity, term in scored[:_MAX_FUZZY_TERMS]]
+
+    def search(self, query, limit=10):
+        """
+        Finds the entries matching every word of the query, by exact word, prefix or fuzzy match.
+
+        Arguments:
+        query -- Free text, e.g. "ammortizzatori titolo II"
+        limit -- Maximum number of results
+
+        Returns:
+        list -- (heading, url) pairs, best match first
+        """
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return []
+        expansions = []
+        for token in tokens:
+            terms = self.expand(token)
+            if not terms:
+                return []
+            size = sum(len(self.postings[term]) for term in terms)
+            expansions.append((size, terms))
+
+        # Rarest token first: its postings are the candidates, the other tokens only filter them
+        expansions.sort(key=lambda item: item[0])
+        first_terms = expansions[0][1]
+        candidates = set()
+        for term in first_terms:
+            candidates.update(self.postings[term])
+        for _, terms in expansions[1:]:
+            term_set = terms.keys()
+            candidates = {entry_id for entry_id in candidates if not term_set.isdisjoint(self.entry_tokens[entry_id])}
+            if not candidates:
+                return []
+
+        def score(entry_id):
+            entry_tokens = self.entry_tokens[entry_id]
+            total = sum(max(weight for term, weight in terms.items() if term in entry_tokens)
+                        for _, terms in expansions)
+            # At equal score, prefer the shorter URL (higher-level page), then the entry with fewer extra words
+            return (-total, len(self.entries[entry_id][1]), len(entry_tokens))
+
+        results = []
+        seen_urls = set()
+        for entry_id in sorted(candidates, key=score):
+            heading, url = self.entries[entry_id]
+            if url in seen_urls:
+                continue  # Several headings may point to the same page
+            seen_urls.add(url)
+            results.append((heading, url))
+            if len(results) == limit:
+                break
+        return results
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_brocardi_index():
+    """
+    Returns the shared BrocardiIndex, building it (and loading BROCARDI_MAP) on first use.
+
+    Returns:
+    BrocardiIndex -- The index over BROCARDI_MAP
+    """
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                from .map import BROCARDI_MAP
+                _index = BrocardiIndex(BROCARDI_MAP)
+    return _index
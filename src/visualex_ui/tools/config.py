@@ -1,4 +1,74 @@
+import os
+
 MAX_CACHE_SIZE = 1000
+NORMA_INTERN_SIZE = 512  # Atti distinti tenuti nella tabella di interning di Norma (vedi tools/norma.py)
+
+# Cache persistente delle risposte (vedi utils/cache_manager.py)
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".visualex")
+CACHE_DB_FILENAME = "cache.sqlite3"
+CACHE_TTL_VIGENTE = 7 * 24 * 3600  # Le versioni vigenti possono cambiare: scadono dopo una settimana
+CACHE_TTL_ORIGINALE = None  # Le versioni originali non cambiano mai
+DISK_CACHE_MAX_ENTRIES = 20000
+
+# Pool di connessioni HTTP condiviso (vedi network/http_client.py)
+HTTP_POOL_CONNECTIONS = 10  # Numero di host con un pool dedicato
+HTTP_POOL_MAXSIZE = 10  # Connessioni keep-alive riutilizzabili per host
+HTTP_POOL_BLOCK = False  # Se True le richieste attendono una connessione libera
+# Dimensioni del pool specifiche per host, indicizzate per prefisso URL (es. "https://www.normattiva.it")
+HTTP_POOL_PER_HOST = {}
+
+# Motore di fetch asincrono (vedi network/data_fetcher.py)
+FETCH_MAX_CONCURRENCY = 4  # Richieste HTTP contemporanee verso l'API
+FETCH_MAX_RETRIES = 3  # Numero massimo di tentativi per richiesta
+FETCH_TIMEOUT = 1000  # Timeout per le richieste in secondi
+FETCH_STREAM_CHUNK_SIZE = 16 * 1024  # Dimensione dei blocchi letti dalle risposte in streaming
+
+# Prefetch degli articoli vicini durante la navigazione (vedi network/prefetcher.py)
+PREFETCH_WINDOW = 3  # Articoli precedenti e successivi da scaricare in anticipo
+PREFETCH_MAX_CONCURRENCY = 2  # Richieste di prefetch contemporanee, per non rallentare le ricerche
+
+# Cache persistente degli alberi delle norme (vedi tools/tree_cache.py)
+TREE_CACHE_DB_FILENAME = "trees.sqlite3"
+TREE_CACHE_REVALIDATE_AFTER = 3600  # Secondi in cui un albero è usato senza nemmeno una GET condizionale
+TREE_CACHE_MAX_ENTRIES = 2000
+
+# Parser HTML per gli alberi delle norme, in ordine di preferenza (vedi tools/treextractor.py)
+HTML_PARSER_BACKENDS = ("lxml", "html.parser")
+TREE_STREAMING = True  # Le pagine Normattiva si leggono solo fino alla chiusura di div#albero
+TREE_STREAM_CHUNK_SIZE = 16 * 1024
+
+# Indice locale delle date degli atti, usato per completare le date con il solo anno (vedi tools/date_index.py)
+DATE_INDEX_FILENAME = "date_index.json"
+
+# Pool di browser headless per il completamento delle date (vedi tools/sys_op.py)
+WEBDRIVER_POOL_SIZE = 2  # Browser Chrome aperti al massimo contemporaneamente
+WEBDRIVER_IDLE_TIMEOUT = 300  # Secondi di inattività dopo cui un browser viene chiuso
+WEBDRIVER_MAX_AGE = 1800  # Secondi dopo cui un browser viene sostituito anche se in uso continuo
+WEBDRIVER_MAX_USES = 50  # Utilizzi dopo cui un browser viene sostituito
+WEBDRIVER_ACQUIRE_TIMEOUT = 60  # Secondi di attesa massima per un browser libero
+
+# Logging (vedi utils/logging_setup.py)
+LOG_LEVEL = "INFO"  # Livello predefinito, sovrascrivibile con la variabile d'ambiente VISUALEX_LOG_LEVEL
+LOG_FILENAME = "norma.log"  # Scritto nella cartella CACHE_DIR
+LOG_BUFFER_CAPACITY = 200  # Record tenuti in memoria prima di scrivere il file
+LOG_SAMPLE_BURST = 5  # Record per elemento (marcati come campionati) registrati sempre per ogni messaggio
+LOG_SAMPLE_EVERY = 100  # Dopo i primi, se ne registra uno ogni LOG_SAMPLE_EVERY
+
+# Profilo dell'avvio (vedi utils/startup_profiler.py)
+STARTUP_BUDGET_MS = 1500  # Tempo massimo atteso fra l'avvio del processo e la prima finestra disegnata
+STARTUP_HISTORY_FILENAME = "startup_history.jsonl"  # Scritto nella cartella CACHE_DIR, un avvio per riga
+STARTUP_HISTORY_MAX = 200  # Avvii conservati nello storico
+STARTUP_HISTORY_TREND = 10  # Avvii recenti di cui si riporta la mediana
+STARTUP_REPORT_TOP = 15  # Moduli più lenti elencati nel rapporto
+
+# Controllo degli aggiornamenti (vedi utils/updater.py)
+UPDATE_VERSION_URL = "https://raw.githubusercontent.com/capazme/VisuaLexUI/main/src/visualex_ui/resources/version.txt"
+UPDATE_CHECK_DELAY_MS = 3000  # Attesa dopo la prima finestra prima del controllo automatico
+UPDATE_CHECK_INTERVAL = 24 * 3600  # Secondi in cui il risultato dell'ultimo controllo è riutilizzato senza rete
+UPDATE_CHECK_TIMEOUT = 5  # Timeout in secondi della richiesta della versione remota
+
+# Visualizzazione del testo delle norme (vedi components/output_area.py)
+OUTPUT_CHUNK_SIZE = 32 * 1024  # Caratteri inseriti per ciclo dell'event loop nei testi lunghi
 
 # Definisci i temi disponibili e i loro fogli di stile associati
 THEMES = {
@@ -0,0 +1,193 @@
+import os
+import re
+import csv
+import json
+import logging
+import threading
+from .config import CACHE_DIR, DATE_INDEX_FILENAME
+from .map import NORMATTIVA_URN_CODICI
+from .text_op import normalize_act_type, parse_date
+
+# Matches the "<act type>:<YYYY-MM-DD>;<number>" part of a Normattiva URN
+_URN_DATE_PATTERN = re.compile(r'([a-z.]+):(\d{4})-(\d{2}-\d{2});(\d+)')
+_FULL_DATE_PATTERN = re.compile(r'^(\d{4})-(\d{2}-\d{2})$')
+
+
+def _act_key(act_type):
+    """Folds the URN ("regio.decreto"), search ("regio decreto") and abbreviated forms of an act type together."""
+    return " ".join(normalize_act_type(act_type).replace(".", " ").split())
+
+
+def make_key(act_type, year, act_number):
+    """
+    Builds the index key for an act.
+
+    Arguments:
+    act_type -- Type of the legal act, in any form accepted by normalize_act_type
+    year -- Year of the act
+    act_number -- Number of the act
+
+    Returns:
+    str -- The key "act type|year|number"
+    """
+    return f"{_act_key(act_type)}|{str(year).strip()}|{str(act_number).strip().lstrip('0')}"
+
+
+class ActDateIndex:
+    """
+    Local index of (act type, year, number) -> full date, so that year-only citations can be
+    resolved without opening a browser on Normattiva.
+
+    Entries are kept in a dict for O(1) lookups and persisted as a JSON object mapping each key
+    to the month and day only ("MM-DD"), since the year is already part of the key.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or os.path.join(CACHE_DIR, DATE_INDEX_FILENAME)
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._seed_from_codes()
+        self._load()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def lookup(self, act_type, year, act_number):
+        """
+        Returns the full date of an act, if known.
+
+        Returns:
+        str -- The date as YYYY-MM-DD, or None if the act is not in the index
+        """
+        month_day = self._entries.get(make_key(act_type, year, act_number))
+        if month_day is None:
+            return None
+        return f"{str(year).strip()}-{month_day}"
+
+    def add(self, act_type, full_date, act_number, save=True):
+        """
+        Records the full date of an act.
+
+        Arguments:
+        act_type -- Type of the legal act
+        full_date -- Date of the act as YYYY-MM-DD
+        act_number -- Number of the act
+        save -- If True the index is written to disk when the entry is new
+
+        Returns:
+        bool -- True if the entry was added or changed
+        """
+        match = _FULL_DATE_PATTERN.match(full_date or "")
+        if not match or not act_number:
+            logging.debug("Not indexing act date %s for %s n. %s", full_date, act_type, act_number)
+            return False
+        year, month_day = match.groups()
+        key = make_key(act_type, year, act_number)
+        with self._lock:
+            if self._entries.get(key) == month_day:
+                return False
+            self._entries[key] = month_day
+        logging.info("Indexed act date: %s -> %s", key, full_date)
+        if save:
+            self.save()
+        return True
+
+    def import_file(self, path):
+        """
+        Imports entries in bulk from a CSV or JSON dump.
+
+        CSV files need an act_type, date and act_number header. JSON files may contain a list of
+        objects with the same fields, or an object mapping "act type|year|number" to a full date.
+        Dates may be in YYYY-MM-DD or extended Italian format ("16 marzo 1942").
+
+        Returns:
+        int -- Number of entries added or changed
+        """
+        logging.info("Importing act dates from %s", path)
+        if path.lower().endswith(".csv"):
+            with open(path, newline="", encoding="utf-8") as f:
+                rows = list(csv.DictReader(f))
+        else:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                rows = []
+                for key, full_date in data.items():
+                    act_type, _, act_number = key.split("|")
+                    rows.append({"act_type": act_type, "date": full_date, "act_number": act_number})
+            else:
+                rows = data
+
+        added = 0
+        for row in rows:
+            try:
+                full_date = parse_date(str(row["date"]))
+            except (KeyError, ValueError) as e:
+                logging.warning("Skipping act date row %s: %s", row, e)
+                continue
+            if self.add(row.get("act_type", ""), full_date, row.get("act_number"), save=False):
+                added += 1
+        if added:
+            self.save()
+        logging.info("Imported %s act dates from %s", added, path)
+        return added
+
+    def save(self):
+        """Writes the index to disk, replacing the previous file atomically."""
+        with self._lock:
+            data = dict(sorted(self._entries.items()))
+        tmp_path = f"{self.path}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"), ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logging.error("Failed to save the act date index to %s: %s", self.path, e)
+
+    def _load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logging.error("Failed to load the act date index from %s: %s", self.path, e)
+            return
+        self._entries.update(data)
+        logging.debug("Loaded %s act dates from %s", len(data), self.path)
+
+    def _seed_from_codes(self):
+        for urn in NORMATTIVA_URN_CODICI.values():
+            match = _URN_DATE_PATTERN.search(urn)
+            if match:
+                act_type, year, month_day, act_number = match.groups()
+                self._entries[make_key(act_type, year, act_number)] = month_day
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_date_index():
+    """
+    Returns the shared ActDateIndex, loading it on first use.
+
+    Returns:
+    ActDateIndex -- The index shared by all URN generations
+    """
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = ActDateIndex()
+    return _index
+
+
+if __name__ == "__main__":
+    # Bulk import: python -m visualex_ui.tools.date_index dump.csv [dump.json ...]
+    import sys
+    index = get_date_index()
+    for dump in sys.argv[1:]:
+        index.import_file(dump)
+    print(f"{len(index)} act dates in {index.path}")
@@ -2,8 +2,6 @@ import logging
 from .config import MAX_CACHE_SIZE
 from functools import lru_cache
 from .map import EURLEX
-import requests
-from bs4 import BeautifulSoup
 
 def get_eur_uri(act_type, year, num):
     """
@@ -17,8 +15,8 @@ def get_eur_uri(act_type, year, num):
     Returns:
     str -- The constructed URI
     """
-    logging.debug(f"Constructing URI for act_type: {act_type}, year: {year}, num: {num}")
+    logging.debug("Constructing URI for act_type: %s, year: %s, num: %s", act_type, year, num)
     base_url = 'https://eur-lex.europa.eu/eli'
     uri = f'{base_url}/{act_type}/{year}/{num}/oj/ita'
-    logging.info(f"Constructed URI: {uri}")
+    logging.info("Constructed URI: %s", uri)
     return uri
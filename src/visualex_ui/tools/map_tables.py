@@ -0,0 +1,90 @@
+import os
+import sys
+import time
+import marshal
+import logging
+import importlib
+
+# Tables too large to build at import time: attribute of tools.map -> source module in this package
+LAZY_TABLES = {
+    "BROCARDI_MAP": "brocardi_map",
+}
+
+# Header of the compiled files; marshal data is only guaranteed readable by the same format version
+_MAGIC = f"VXTABLE{marshal.version}\n".encode("ascii")
+
+
+def _resources_dir():
+    if hasattr(sys, '_MEIPASS'):
+        return os.path.join(sys._MEIPASS, 'resources')
+    return os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'resources'))
+
+
+def compiled_path(module_name):
+    """Returns the path of the compiled copy of a table module."""
+    return os.path.join(_resources_dir(), f"{module_name}.marshal")
+
+
+def _source_path(module_name):
+    return os.path.join(os.path.dirname(__file__), f"{module_name}.py")
+
+
+def _load_source(name):
+    module = importlib.import_module(f".{LAZY_TABLES[name]}", __package__)
+    return getattr(module, name)
+
+
+def compile_tables():
+    """
+    Compiles every lazy table into a marshal file in the resources folder.
+    Meant to run at build time, before PyInstaller collects the resources.
+
+    Returns:
+    list -- Paths of the written files
+    """
+    written = []
+    for name, module_name in LAZY_TABLES.items():
+        path = compiled_path(module_name)
+        with open(path, "wb") as f:
+            f.write(_MAGIC)
+            f.write(marshal.dumps(_load_source(name)))
+        logging.info("Compiled %s into %s", name, path)
+        written.append(path)
+    return written
+
+
+def load_table(name):
+    """
+    Loads a lazy table, preferring its compiled copy unless the source is newer.
+
+    Arguments:
+    name -- Name of the table, a key of LAZY_TABLES
+
+    Returns:
+    dict -- The table
+    """
+    start = time.perf_counter()
+    module_name = LAZY_TABLES[name]
+    path = compiled_path(module_name)
+    source = _source_path(module_name)
+    table = None
+    if os.path.exists(path) and not (os.path.exists(source) and os.path.getmtime(source) > os.path.getmtime(path)):
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            if data.startswith(_MAGIC):
+                table = marshal.loads(data[len(_MAGIC):])
+            else:
+                logging.warning("Compiled table %s was built by an incompatible Python version", path)
+        except (OSError, ValueError, EOFError, TypeError) as e:
+            logging.warning("Failed to read compiled table %s: %s", path, e)
+    if table is None:
+        table = _load_source(name)
+    logging.debug("Loaded %s (%s entries) in %.1f ms", name, len(table), (time.perf_counter() - start) * 1000)
+    return table
+
+
+if __name__ == "__main__":
+    # Build step: python -m visualex_ui.tools.map_tables
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+    compile_tables()
@@ -1,24 +1,75 @@
+import sys
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass, field
-from functools import lru_cache
 import logging
-from .urngenerator import generate_urn
+from .urngenerator import generate_urn, generate_urns
 from .text_op import normalize_act_type
-from .config import MAX_CACHE_SIZE
+from .config import NORMA_INTERN_SIZE
 from .treextractor import get_tree
 
-@dataclass
+# Le dataclass con __slots__ sono disponibili da Python 3.10; prima le istanze restano con __dict__
+_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+_interned = OrderedDict()  # (tipo_atto, data, numero_atto) -> Norma, dal meno al più recente
+_interned_lock = threading.Lock()
+
+
+@dataclass(frozen=True, **_SLOTS)
 class Norma:
+    """
+    Record immutabile di un atto. Gli articoli dello stesso atto condividono un solo record, ottenuto con
+    Norma.intern; soltanto l'URL e l'albero sono calcolati alla prima richiesta e memorizzati nel record.
+    """
     tipo_atto: str
     data: str = None
     numero_atto: str = None
     _url: str = None
     _tree: any = field(default=None, repr=False)
+    tipo_atto_str: str = field(default=None, init=False, repr=False, compare=False)
+    tipo_atto_urn: str = field(default=None, init=False, repr=False, compare=False)
 
     def __post_init__(self):
-        logging.debug(f"Initializing Norma with tipo_atto: {self.tipo_atto}, data: {self.data}, numero_atto: {self.numero_atto}")
-        self.tipo_atto_str = normalize_act_type(self.tipo_atto, search=True)
-        self.tipo_atto_urn = normalize_act_type(self.tipo_atto)
-        logging.debug(f"Norma initialized: {self}")
+        object.__setattr__(self, 'tipo_atto_str', normalize_act_type(self.tipo_atto, search=True))
+        object.__setattr__(self, 'tipo_atto_urn', normalize_act_type(self.tipo_atto))
+
+    @classmethod
+    def intern(cls, tipo_atto, data=None, numero_atto=None, url=None, tree=None):
+        """
+        Restituisce il record condiviso dell'atto, creandolo alla prima richiesta.
+        La tabella tiene gli ultimi NORMA_INTERN_SIZE atti usati.
+
+        Args:
+            tipo_atto (str): Tipo dell'atto, come inserito o come restituito dall'API.
+            data (str): Data dell'atto.
+            numero_atto (str): Numero dell'atto.
+            url (str): URL dell'atto, se già noto.
+            tree: Albero degli articoli, se già noto.
+
+        Returns:
+            Norma: Il record dell'atto.
+        """
+        key = (tipo_atto, data, numero_atto)
+        with _interned_lock:
+            norma = _interned.get(key)
+            if norma is not None:
+                _interned.move_to_end(key)
+            else:
+                norma = cls(tipo_atto=tipo_atto, data=data, numero_atto=numero_atto)
+                logging.debug("Norma interned: %s", norma)
+                _interned[key] = norma
+                if len(_interned) > NORMA_INTERN_SIZE:
+                    _interned.popitem(last=False)
+        if url and not norma._url:
+            object.__setattr__(norma, '_url', url)
+        if tree and not norma._tree:
+            object.__setattr__(norma, '_tree', tree)
+        return norma
+
+    def __reduce__(self):
+        # L'albero non viene serializzato (get_tree ha la sua cache persistente) e al caricamento il record
+        # torna a essere quello condiviso
+        return (Norma.intern, (self.tipo_atto, self.data, self.numero_atto, self._url))
 
     def __hash__(self):
         """Implementazione di __hash__ per rendere la classe hashable."""
@@ -36,20 +87,20 @@ class Norma:
     def url(self):
         if not self._url:
             logging.debug("Generating URL for Norma.")
-            self._url = generate_urn(
+            object.__setattr__(self, '_url', generate_urn(
                 act_type=self.tipo_atto_urn,
                 date=self.data,
                 act_number=self.numero_atto,
                 urn_flag=False
-            )
+            ))
         return self._url
 
     @property
-    @lru_cache(maxsize=MAX_CACHE_SIZE)
     def tree(self):
+        # get_tree keeps a persistent cache per URL, so the instance only needs its own backing field
         if not self._tree:
             logging.debug("Fetching tree structure for Norma.")
-            self._tree = get_tree(self.url)
+            object.__setattr__(self, '_tree', get_tree(self.url))
         return self._tree
 
     def __str__(self):
@@ -68,7 +119,7 @@ class Norma:
             'url': self.url,
         }
 
-@dataclass(eq=False)
+@dataclass(eq=False, **_SLOTS)
 class NormaVisitata:
     norma: Norma
     allegato: str = None
@@ -76,6 +127,10 @@ class NormaVisitata:
     versione: str = None
     data_versione: str = None
     _urn: str = field(default=None, repr=False)
+    # Contenuti scaricati dall'API, assegnati dopo la costruzione
+    _article_text: str = field(default=None, repr=False)
+    _brocardi_info: dict = field(default=None, repr=False)
+    _normattiva_info: dict = field(default=None, repr=False)
     #timestamp: str = field(default_factory=lambda: datetime.now().isoformat())
 
     def __hash__(self):
@@ -106,13 +161,9 @@ class NormaVisitata:
                 self.data_versione == other.data_versione and
                 self.allegato == other.allegato)
 
-
-    def __post_init__(self):
-        logging.debug(f"NormaVisitata initialized: {self}")
-
     @property
-    @lru_cache(maxsize=MAX_CACHE_SIZE)
     def urn(self):
+        # Calcolato una volta e conservato nell'istanza: niente cache esterne che la tengano in vita
         if not self._urn:
             logging.debug("Generating URN for NormaVisitata.")
             self._urn = generate_urn(
@@ -126,6 +177,30 @@ class NormaVisitata:
             )
         return self._urn
 
+    @staticmethod
+    def fill_urns(normavisitate):
+        """
+        Calcola insieme gli URN degli articoli che non lo hanno ancora, con una chiamata a generate_urns
+        per norma invece di una generate_urn per articolo: gli articoli di una ricerca multipla condividono
+        lo stesso record Norma, e tipo, data e numero dell'atto vengono risolti una volta sola.
+        """
+        pending = {}
+        for normavisitata in normavisitate:
+            if not normavisitata._urn:
+                pending.setdefault(normavisitata.norma, []).append(normavisitata)
+        for norma, articles in pending.items():
+            urns = generate_urns(
+                act_type=norma.tipo_atto_urn,
+                date=norma.data,
+                act_number=norma.numero_atto,
+                articles=[item.numero_articolo for item in articles],
+                annex=[item.allegato for item in articles],
+                version=[item.versione for item in articles],
+                version_date=[item.data_versione for item in articles]
+            )
+            for normavisitata, urn in zip(articles, urns):
+                normavisitata._urn = urn
+
     def __str__(self):
         base_str = str(self.norma)
         if self.numero_articolo:
@@ -146,13 +221,12 @@ class NormaVisitata:
 
     @staticmethod
     def from_dict(data):
-        logging.debug(f"Creating NormaVisitata from dict: {data}")
-        norma = Norma(
-            tipo_atto=data['tipo_atto'],
+        norma = Norma.intern(
+            data['tipo_atto'],
             data=data.get('data'),
             numero_atto=data.get('numero_atto'),
-            _url=data.get('url'),
-            _tree=data.get('tree')
+            url=data.get('url'),
+            tree=data.get('tree')
         )
         norma_visitata = NormaVisitata(
             norma=norma,
@@ -162,5 +236,4 @@ class NormaVisitata:
             allegato = data.get('allegato')
             #timestamp=data.get('timestamp')
         )
-        logging.debug(f"NormaVisitata created: {norma_visitata}")
         return norma_visitata
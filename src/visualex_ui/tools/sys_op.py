@@ -1,7 +1,12 @@
 import os
-from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
+import time
+import atexit
+import threading
+from contextlib import contextmanager
 import logging
+from .config import (
+    WEBDRIVER_POOL_SIZE, WEBDRIVER_IDLE_TIMEOUT, WEBDRIVER_MAX_AGE, WEBDRIVER_MAX_USES, WEBDRIVER_ACQUIRE_TIMEOUT
+)
 
 class WebDriverManager:
     def __init__(self):
@@ -20,7 +25,11 @@ class WebDriverManager:
         """
         if download_dir is None:
             download_dir = os.path.join(os.getcwd(), "download")
-        logging.info(f"Setting up WebDriver with download directory: {download_dir}")
+        logging.info("Setting up WebDriver with download directory: %s", download_dir)
+
+        # Selenium is only needed to complete dates, so it is imported on first use rather than at startup
+        from selenium import webdriver
+        from selenium.webdriver.chrome.options import Options
 
         chrome_options = Options()
         chrome_options.add_argument("--headless")
@@ -41,7 +50,7 @@ class WebDriverManager:
             logging.info("WebDriver initialized successfully")
             return new_driver
         except Exception as e:
-            logging.error(f"Failed to initialize WebDriver: {e}")
+            logging.error("Failed to initialize WebDriver: %s", e)
             raise
 
     def close_drivers(self):
@@ -54,7 +63,7 @@ class WebDriverManager:
                 driver.quit()
                 logging.info("WebDriver closed successfully")
             except Exception as e:
-                logging.warning(f"Failed to quit WebDriver: {e}")
+                logging.warning("Failed to quit WebDriver: %s", e)
         self.drivers.clear()
         logging.info("All WebDriver instances closed and cleared")
 
@@ -62,3 +71,210 @@ class WebDriverManager:
 # driver_manager = WebDriverManager()
 # driver = driver_manager.setup_driver()
 # driver_manager.close_drivers()
+
+
+def _create_driver():
+    return WebDriverManager().setup_driver()
+
+
+class _PooledDriver:
+    """Bookkeeping for a driver owned by a WebDriverPool."""
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.uses = 0
+
+
+class WebDriverPool:
+    """
+    Bounded pool of warm, reusable WebDriver instances shared between threads.
+
+    Drivers are created on demand up to max_size and handed out most-recently-used first.
+    A driver is health-checked before being handed out, replaced once it exceeds max_age
+    seconds or max_uses uses, and quit by a background reaper after idle_timeout seconds unused.
+    """
+
+    def __init__(self, max_size=WEBDRIVER_POOL_SIZE, idle_timeout=WEBDRIVER_IDLE_TIMEOUT,
+                 max_age=WEBDRIVER_MAX_AGE, max_uses=WEBDRIVER_MAX_USES, factory=_create_driver):
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.max_age = max_age
+        self.max_uses = max_uses
+        self._factory = factory
+        self._cond = threading.Condition()
+        self._idle = []  # Idle drivers, the most recently used last
+        self._in_use = {}  # id(driver) -> _PooledDriver
+        self._size = 0  # Drivers alive or being created
+        self._closed = False
+        self._reaper = None
+        logging.info("WebDriverPool initialized (max_size=%s)", max_size)
+
+    def acquire(self, timeout=WEBDRIVER_ACQUIRE_TIMEOUT):
+        """
+        Takes a healthy driver from the pool, creating one if the pool is not full.
+
+        Arguments:
+        timeout -- Seconds to wait for a free driver when the pool is full (None waits forever)
+
+        Returns:
+        WebDriver -- A driver to hand back with release()
+
+        Raises:
+        TimeoutError -- If no driver became free within timeout
+        RuntimeError -- If the pool has been closed
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            entry = None
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("WebDriverPool is closed")
+                    if self._idle:
+                        entry = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1  # Reserve the slot before the slow driver startup
+                        break
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError(f"No WebDriver available within {timeout} seconds")
+                    self._cond.wait(remaining)
+
+            if entry is None:
+                try:
+                    entry = _PooledDriver(self._factory())
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+                self._start_reaper()
+            elif not self._is_reusable(entry, time.monotonic()) or not self._is_healthy(entry):
+                self._discard(entry)
+                continue
+
+            entry.uses += 1
+            entry.last_used = time.monotonic()
+            with self._cond:
+                self._in_use[id(entry.driver)] = entry
+            return entry.driver
+
+    def release(self, driver, discard=False):
+        """
+        Returns a driver to the pool.
+
+        Arguments:
+        driver -- A driver obtained from acquire()
+        discard -- If True the driver is quit instead of being reused
+        """
+        with self._cond:
+            entry = self._in_use.pop(id(driver), None)
+        if entry is None:
+            logging.warning("Released a WebDriver that does not belong to the pool")
+            return
+        entry.last_used = time.monotonic()
+        if discard or self._closed or not self._is_reusable(entry, entry.last_used):
+            self._discard(entry)
+            return
+        with self._cond:
+            self._idle.append(entry)
+            self._cond.notify()
+
+    @contextmanager
+    def driver(self, timeout=WEBDRIVER_ACQUIRE_TIMEOUT):
+        """
+        Context manager wrapping acquire() and release().
+
+        If the body raises, the driver may be left on a broken page or session, so it is discarded.
+        """
+        driver = self.acquire(timeout)
+        try:
+            yield driver
+        except BaseException:
+            self.release(driver, discard=True)
+            raise
+        self.release(driver)
+
+    def close(self):
+        """Quits the idle drivers; drivers still in use are quit when released."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for entry in idle:
+            self._discard(entry)
+        logging.info("WebDriverPool closed")
+
+    def _is_reusable(self, entry, now):
+        return now - entry.created_at < self.max_age and entry.uses < self.max_uses
+
+    def _is_healthy(self, entry):
+        try:
+            return entry.driver.execute_script("return 1") == 1
+        except Exception as e:
+            logging.warning("Pooled WebDriver failed the health check: %s", e)
+            return False
+
+    def _discard(self, entry):
+        try:
+            entry.driver.quit()
+        except Exception as e:
+            logging.warning("Failed to quit WebDriver: %s", e)
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+        logging.debug("WebDriver retired after %s uses", entry.uses)
+
+    def _start_reaper(self):
+        with self._cond:
+            if self._reaper is not None:
+                return
+            self._reaper = threading.Thread(target=self._reap_idle, name="WebDriverPoolReaper", daemon=True)
+        self._reaper.start()
+
+    def _reap_idle(self):
+        """Background loop that quits drivers left idle or grown too old."""
+        interval = max(1.0, min(self.idle_timeout, self.max_age) / 2)
+        while True:
+            with self._cond:
+                self._cond.wait(interval)
+                if self._closed:
+                    return
+                now = time.monotonic()
+                stale = [e for e in self._idle
+                         if now - e.last_used >= self.idle_timeout or not self._is_reusable(e, now)]
+                self._idle = [e for e in self._idle if e not in stale]
+            for entry in stale:
+                self._discard(entry)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_webdriver_pool():
+    """
+    Returns the shared WebDriverPool, creating it on first use.
+
+    Returns:
+    WebDriverPool -- The pool shared by all date completions
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = WebDriverPool()
+                atexit.register(close_webdriver_pool)
+    return _pool
+
+
+def close_webdriver_pool():
+    """Closes the shared WebDriverPool, quitting its browsers."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
@@ -16,10 +16,10 @@ class Norma:
     _tree: any = field(default=None, repr=False)
 
     def __post_init__(self):
-        logging.debug(f"Initializing Norma with tipo_atto: {self.tipo_atto}, data: {self.data}, numero_atto: {self.numero_atto}")
+        logging.debug("Initializing Norma with tipo_atto: %s, data: %s, numero_atto: %s", self.tipo_atto, self.data, self.numero_atto)
         self.tipo_atto_str = normalize_act_type(self.tipo_atto, search=True)
         self.tipo_atto_urn = normalize_act_type(self.tipo_atto)
-        logging.debug(f"Norma initialized: {self}")
+        logging.debug("Norma initialized: %s", self)
 
     @property
     def url(self):
@@ -123,7 +123,7 @@ def convert_dict_to_norma_visitata(norm_dict):
             norma_visitata = parse_urn(urn)
             result_dict[norm_name] = norma_visitata
         except ValueError as e:
-            logging.error(f"Error parsing URN for {norm_name}: {e}")
+            logging.error("Error parsing URN for %s: %s", norm_name, e)
     return result_dict
 
 # Esempio di utilizzo
@@ -1,15 +1,13 @@
 import re
+import bisect
 import datetime
 from functools import lru_cache
+from collections import OrderedDict
 from .config import MAX_CACHE_SIZE
 from .map import NORMATTIVA, NORMATTIVA_SEARCH, BROCARDI_SEARCH
+from .urn_parser import parse_urn
 import logging
 
-# Configure logging
-logging.basicConfig(level=logging.INFO,
-                    format='%(asctime)s %(levelname)s %(message)s',
-                    )
-
 def clean_article_input(article_string):
     """Pulisce e valida la stringa degli articoli rimuovendo virgole finali e spazi extra."""
     # Rimuovi spazi e virgole finali
@@ -21,29 +19,147 @@ def clean_article_input(article_string):
     # Rimuovi eventuali stringhe vuote dalla lista risultante
     return [article.strip() for article in articles if article.strip()]
 
-def parse_articles(article_str):
+_ARTICLE_PATTERN = re.compile(r'(\d+)(?:\s*-?\s*([a-z]+))?', re.IGNORECASE)
+_RANGE_EXTENSION_PATTERN = re.compile(r'-\s*[a-zA-Z]')
+
+
+def normalize_article(article):
+    """Uniforma un numero di articolo ("2 bis", "2-Bis") alla forma "2-bis"."""
+    return "-".join(str(article).lower().split())
+
+
+@lru_cache(maxsize=MAX_CACHE_SIZE)
+def article_sort_key(article):
     """
-    Parse a string of articles which can contain ranges (e.g., "1-5") or comma-separated values (e.g., "1,2,3").
-    Excludes ranges where the dash is followed by a letter (e.g., "2-bis").
-    Returns a list of individual article numbers.
+    Sort key for article identifiers: number first, then Latin extension ("2" < "2-bis" < "2-ter" < "3").
+
+    Arguments:
+    article -- An article identifier, e.g. "2", "2-bis" or "2 bis"
+
+    Returns:
+    tuple -- (number, extension number, article); identifiers without a number sort first
     """
-    articles = set()
-    parts = article_str.split(',')
-    
-    for part in parts:
+    match = _ARTICLE_PATTERN.match(article.strip())
+    if not match:
+        return (0, 0, article)
+    extension = match.group(2).lower() if match.group(2) else None
+    return (int(match.group(1)), estrai_numero_da_estensione(extension), article)
+
+
+def _available_articles(available):
+    """
+    Normalizes and sorts the articles of a tree (a list or tuple, or the (list, count) pair returned by Norma.tree).
+
+    Returns:
+    tuple -- (sorted articles, their sort keys)
+    """
+    if isinstance(available, tuple) and available and isinstance(available[0], list):
+        available = available[0]
+    articles = []
+    for entry in available:
+        # With links the tree holds {article: url} dicts
+        articles.extend(entry.keys() if isinstance(entry, dict) else [entry])
+    normalized = sorted(set(normalize_article(article) for article in articles), key=article_sort_key)
+    return normalized, [article_sort_key(article) for article in normalized]
+
+
+def _iter_article_parts(article_str):
+    """
+    Splits a string of articles into its parts, without expanding ranges.
+
+    Yields:
+    tuple -- (start, end) for a range, or (article, None) for a single article, normalized as "2-bis"
+    """
+    for part in article_str.split(','):
         part = part.strip()
-        # Verifica se il trattino è presente e non è seguito da una lettera (come in "2-bis")
-        if '-' in part and not re.search(r'-\s*[a-zA-Z]', part):
+        if not part:
+            continue
+        if '-' in part and not _RANGE_EXTENSION_PATTERN.search(part):
             try:
-                start, end = part.split('-')
-                articles.update(str(range(int(start), int(end) + 1)))
+                start, end = (int(bound) for bound in part.split('-'))
             except ValueError:
                 # In caso di errore di conversione a intero, ignorare e trattare come singolo articolo
-                articles.add(part)
+                pass
+            else:
+                yield start, end
+                continue
+        yield normalize_article(part), None
+
+
+def iter_articles(article_str, available=None):
+    """
+    Expands a string of articles lazily, yielding one identifier at a time in the order written.
+
+    Ranges ("1-5") are expanded; a dash followed by letters is an extension ("2-bis"), not a range.
+    If the articles that actually exist are given, ranges only yield those (extensions included,
+    so "1-3" yields "2-bis" too) and single articles that do not exist are skipped.
+
+    Arguments:
+    article_str -- The articles, e.g. "1-5, 7, 2-bis"
+    available -- Optional existing articles: a list or tuple, or the (list, count) pair returned by Norma.tree
+
+    Yields:
+    str -- Article identifiers, normalized as "2-bis"
+    """
+    existing, existing_keys, existing_set = None, None, None
+    if available is not None:
+        existing, existing_keys = _available_articles(available)
+        existing_set = set(existing)
+    for start, end in _iter_article_parts(article_str):
+        if end is None:
+            if existing_set is None or start in existing_set:
+                yield start
+        elif existing is None:
+            for number in range(start, end + 1):
+                yield str(number)
+        else:
+            # The keys are sorted, so the range starts at the first article numbered start
+            index = bisect.bisect_left(existing_keys, (start,))
+            while index < len(existing) and existing_keys[index][0] <= end:
+                yield existing[index]
+                index += 1
+
+
+def parse_articles(article_str, available=None):
+    """
+    Parse a string of articles which can contain ranges (e.g., "1-5") or comma-separated values (e.g., "1,2,3").
+    Excludes ranges where the dash is followed by a letter (e.g., "2-bis").
+    Returns a sorted list of individual article numbers, without duplicates.
+    If available is given (see iter_articles), only articles that exist are returned.
+    """
+    return sorted(set(iter_articles(article_str, available)), key=article_sort_key)
+
+
+def article_runs(article_str):
+    """
+    Compact canonical form of a string of articles: the articles of parse_articles, with consecutive
+    numbers merged into runs ("3, 1-2, 2 bis, 7" -> ["1-3", "2-bis", "7"]).
+
+    Ranges are merged as intervals and never expanded, so "1-1000000" costs the same as "1-2".
+
+    Returns:
+    list -- Runs ("1-3") and single articles, sorted like parse_articles
+    """
+    intervals = []
+    others = set()
+    for start, end in _iter_article_parts(article_str):
+        if end is not None:
+            if start <= end:
+                intervals.append((start, end))
+        elif start.isdigit() and str(int(start)) == start:
+            intervals.append((int(start), int(start)))
         else:
-            articles.add(part)
+            others.add(start)  # Extensions, and numbers not written in canonical form ("05")
 
-    return sorted(articles, key=lambda x: (int(re.match(r'\d+', x).group()) if re.match(r'\d+', x) else 0, x))
+    runs = []
+    for start, end in sorted(intervals):
+        if runs and start <= runs[-1][1] + 1:
+            runs[-1][1] = max(runs[-1][1], end)
+        else:
+            runs.append([start, end])
+    items = [(article_sort_key(str(start)), f"{start}-{end}" if end > start else str(start)) for start, end in runs]
+    items.extend((article_sort_key(article), article) for article in others)
+    return [article for _, article in sorted(items)]
 
 def nospazi(text):
     """
@@ -57,7 +173,7 @@ def nospazi(text):
     """
     logging.debug("Removing extra spaces from text")
     textout = ' '.join(text.split())
-    logging.debug(f"Text after removing spaces: {textout}")
+    logging.debug("Text after removing spaces: %s", textout)
     return textout
 
 @lru_cache(maxsize=MAX_CACHE_SIZE)
@@ -72,7 +188,7 @@ def parse_date(input_date):
     Returns:
     str -- The formatted date string in YYYY-MM-DD or raises ValueError if invalid
     """
-    logging.debug(f"Parsing date: {input_date}")
+    logging.debug("Parsing date: %s", input_date)
     
     month_map = {
         "gennaio": "01", "febbraio": "02", "marzo": "03", "aprile": "04",
@@ -89,7 +205,7 @@ def parse_date(input_date):
             logging.error("Invalid month found in date string")
             raise ValueError("Mese non valido")
         formatted_date = f"{year}-{month}-{day.zfill(2)}"
-        logging.debug(f"Formatted date: {formatted_date}")
+        logging.debug("Formatted date: %s", formatted_date)
         return formatted_date
     
     try:
@@ -110,7 +226,7 @@ def format_date_to_extended(input_date):
     Returns:
     str -- The date in extended format (e.g., "12 settembre 2024") or raises ValueError if invalid
     """
-    logging.debug(f"Formatting date: {input_date}")
+    logging.debug("Formatting date: %s", input_date)
 
     month_map = {
         "01": "gennaio", "02": "febbraio", "03": "marzo", "04": "aprile",
@@ -125,7 +241,7 @@ def format_date_to_extended(input_date):
         month = month_map[date_obj.strftime("%m")]
         year = date_obj.year
         extended_date = f"{day} {month} {year}"
-        logging.debug(f"Extended format date: {extended_date}")
+        logging.debug("Extended format date: %s", extended_date)
         return extended_date
     except ValueError:
         logging.error("Invalid date format")
@@ -144,7 +260,7 @@ def normalize_act_type(input_type, search=False, source='normattiva'):
     Returns:
     str -- The normalized act type or the original input if not found
     """
-    logging.debug(f"Normalizing act type: {input_type}, search: {search}, source: {source}")
+    logging.debug("Normalizing act type: %s, search: %s, source: %s", input_type, search, source)
     
     act_types = NORMATTIVA_SEARCH if source == 'normattiva' and search else NORMATTIVA
     if source == 'brocardi':
@@ -155,7 +271,7 @@ def normalize_act_type(input_type, search=False, source='normattiva'):
 
     normalized_type = act_types.get(input_type.lower().strip().replace(" ", ""), input_type.lower().strip())
     
-    logging.debug(f"Normalized act type: {normalized_type}")
+    logging.debug("Normalized act type: %s", normalized_type)
     return normalized_type
 
 @lru_cache(maxsize=MAX_CACHE_SIZE)
@@ -169,14 +285,14 @@ def estrai_data_da_denominazione(denominazione):
     Returns:
     str -- The extracted date or the original denomination if no date is found
     """
-    logging.debug(f"Extracting date from denomination")
+    logging.debug("Extracting date from denomination")
     
     pattern = r"\b(\d{1,2})\s([Gg]ennaio|[Ff]ebbraio|[Mm]arzo|[Aa]prile|[Mm]aggio|[Gg]iugno|[Ll]uglio|[Aa]gosto|[Ss]ettembre|[Oo]ttobre|[Nn]ovembre|[Dd]icembre)\s(\d{4})\b"
     match = re.search(pattern, denominazione)
     
     if match:
         extracted_date = match.group(0)
-        logging.debug(f"Extracted date: {extracted_date}")
+        logging.debug("Extracted date: %s", extracted_date)
         return extracted_date
     
     logging.debug("No date found in denomination")
@@ -193,7 +309,7 @@ def estrai_numero_da_estensione(estensione):
     Returns:
     int -- The extracted number or 0 if the extension is not found
     """
-    logging.debug(f"Extracting number from extension: {estensione}")
+    logging.debug("Extracting number from extension: %s", estensione)
     
     estensioni_numeriche = {
         None: 0, 'bis': 2, 'tris': 3, 'ter': 3, 'quater': 4, 'quinquies': 5,
@@ -208,7 +324,7 @@ def estrai_numero_da_estensione(estensione):
     }
     
     number = estensioni_numeriche.get(estensione, 0)
-    logging.debug(f"Extracted number: {number}")
+    logging.debug("Extracted number: %s", number)
     return number
 
 def get_annex_from_urn(urn):
@@ -221,49 +337,114 @@ def get_annex_from_urn(urn):
     Returns:
     str -- The annex number if found, otherwise None
     """
-    logging.debug(f"Extracting annex from URN")
-    
-    ann_num = re.search(r":(\d+)(!vig=|@originale)$", urn)
-    if ann_num:
-        annex = ann_num.group(1)
-        logging.debug(f"Extracted annex: {annex}")
-        return annex
-    
-    logging.debug("No annex found in URN")
-    return None
+    logging.debug("Extracting annex from URN")
+    parsed = parse_urn(urn)
+    annex = parsed.annex if parsed is not None else None
+    logging.debug("Extracted annex: %s", annex)
+    return annex
+
+# Prima passata di clean_text: newline dopo "Art. N", e candidati numeri di comma ("1.", "1-bis.") a fine riga
+# seguiti da testo che non è un altro comma né una nuova frase. Le espressioni iniziano con un letterale o una
+# classe di caratteri, così la ricerca salta il testo senza tentare un confronto a ogni posizione
+_ARTICLE_OR_COMMA_BREAK = re.compile(r'Art\.(?<=\bArt\.)(\s*\d+)\n+|(?:\d|-[a-z]+)(\.)\s*\n(?!\d+\.|\S*\.)')
+# Seconda passata: un gruppo di newline dopo un punto diventa "\n\n", e così ogni gruppo di tre o più newline
+_NEWLINE_RUN = re.compile(r'\n(?:(?<=\.\n)\n*|\n\n+)')
+_LOWERCASE = frozenset('abcdefghijklmnopqrstuvwxyz')
+
+_cleaned_texts = OrderedDict()  # urn -> (testo originale, testo pulito)
 
-def clean_text(article_text):
+
+def _is_comma_number(text, dot):
+    """Verifica che il punto in posizione dot chiuda un numero di comma isolato (come \\b\\d+(-[a-z]+)?\\.)."""
+    start = dot
+    while start > 0 and text[start - 1] in _LOWERCASE:
+        start -= 1
+    if start < dot:
+        if start == 0 or text[start - 1] != '-':
+            return False
+        start -= 1
+    digits_end = start
+    while start > 0 and text[start - 1].isdecimal():
+        start -= 1
+    if start == digits_end:
+        return False
+    return start == 0 or not (text[start - 1].isalnum() or text[start - 1] == '_')
+
+
+def _join_article_or_comma(match):
+    if match.group(1) is not None:
+        return 'Art.' + match.group(1) + '\n\n'
+    dot = match.start(2)
+    if _is_comma_number(match.string, dot):
+        return match.string[match.start():dot] + '. '
+    return match.group(0)
+
+
+def _collapse_double_parentheses(text):
+    """Rimuove gli spazi iniziali e le newline finali all'interno delle doppie parentesi (( ... ))."""
+    parts = []
+    position = 0
+    while True:
+        start = text.find('((', position)
+        if start == -1:
+            break
+        end = text.find('))', start + 2)
+        if end == -1:
+            break  # Se manca la chiusura per queste parentesi, manca anche per tutte le successive
+        parts.append(text[position:start + 2])
+        parts.append(text[start + 2:end].lstrip().rstrip('\n'))
+        position = end
+    if not parts:
+        return text
+    parts.append(text[position:])
+    return ''.join(parts)
+
+
+def _strip_lines(text):
+    """Rimuove spazi e tabulazioni prima e dopo ogni newline."""
+    lines = text.split('\n')
+    if len(lines) == 1:
+        return text
+    lines[0] = lines[0].rstrip(' \t')
+    lines[-1] = lines[-1].lstrip(' \t')
+    for index in range(1, len(lines) - 1):
+        lines[index] = lines[index].strip(' \t')
+    return '\n'.join(lines)
+
+
+def clean_text(article_text, urn=None):
     """
     Pulisce il testo dell'articolo:
     - Rimuove le newline inutili.
     - Non va a capo dopo il numero del comma.
     - Mantiene le newline significative.
     - Rimuove le newline all'interno delle doppie parentesi (( ... )).
+
+    Il risultato è identico a quello della vecchia sequenza di otto re.sub (vedi il benchmark clean-text),
+    ottenuto con una scansione lineare per le doppie parentesi, due passate di espressioni precompilate
+    e una per riga per gli spazi attorno alle newline.
+
+    Arguments:
+    article_text -- Il testo dell'articolo
+    urn -- URN dell'articolo (o altra chiave che lo identifichi): se indicato, il testo pulito viene
+           memorizzato e riusato finché il testo originale per quella chiave non cambia
     """
     if not article_text:
         return ''
 
-    # Step 1: Rimuovi newline all'interno delle parentesi doppie (( ... ))
-    article_text = re.sub(r'\(\([\n\s]*(.*?)\n*\)\)', r'((\1))', article_text, flags=re.DOTALL)
-
-    # Step 2: Mantieni newline dopo Articoli (es. "Art. 1") ma non dopo i commi (es. "1.", "1-bis.")
-    cleaned_text = re.sub(r'(\bArt\.\s*\d+)\n+', r'\1\n\n', article_text)
-
-    # Step 3: Non rimuovere newline dopo numeri di commi se seguiti da un punto (numero di fine frase)
-    # Rimuovi newline solo se segue del testo che non è un numero e non è una nuova frase (che termina con un punto)
-    cleaned_text = re.sub(r'(\b\d+(-[a-z]+)?\.)\s*\n(?!\d+\.|\S*\.)', r'\1 ', cleaned_text)
-
-    # Step 4: Mantieni le newline dopo la fine dei commi (che terminano con un punto)
-    cleaned_text = re.sub(r'(?<=\.)\n+', '\n\n', cleaned_text)
-
-    # Step 5: Rimuovi multiple newline (più di 2) e sostituisci con singole newline
-    cleaned_text = re.sub(r'\n{3,}', '\n\n', cleaned_text)
-
-    # Step 6: Rimuovi spazi vuoti che precedono o seguono una newline
-    cleaned_text = re.sub(r'[ \t]+\n', '\n', cleaned_text)  # Rimuovi spazi alla fine di una riga
-    cleaned_text = re.sub(r'\n[ \t]+', '\n', cleaned_text)  # Rimuovi spazi all'inizio di una nuova riga
+    if urn is not None:
+        cached = _cleaned_texts.get(urn)
+        if cached is not None and cached[0] == article_text:
+            _cleaned_texts.move_to_end(urn)
+            return cached[1]
 
-    # Step 7: Elimina eventuali newline all'inizio o alla fine del testo
-    cleaned_text = cleaned_text.strip()
+    cleaned_text = _collapse_double_parentheses(article_text)
+    cleaned_text = _ARTICLE_OR_COMMA_BREAK.sub(_join_article_or_comma, cleaned_text)
+    cleaned_text = _NEWLINE_RUN.sub('\n\n', cleaned_text)
+    cleaned_text = _strip_lines(cleaned_text).strip()
 
-    return cleaned_text
\ No newline at end of file
+    if urn is not None:
+        _cleaned_texts[urn] = (article_text, cleaned_text)
+        if len(_cleaned_texts) > MAX_CACHE_SIZE:
+            _cleaned_texts.popitem(last=False)
+    return cleaned_text
@@ -0,0 +1,100 @@
+import os
+import time
+import sqlite3
+import logging
+import threading
+from .config import CACHE_DIR, TREE_CACHE_DB_FILENAME, TREE_CACHE_REVALIDATE_AFTER, TREE_CACHE_MAX_ENTRIES
+from .urn_parser import canonical_urn
+from ..utils.cache_manager import DiskCache
+
+
+class TreeCache:
+    """
+    Persistent cache of parsed article trees, keyed by the canonical URN of the act, so that URLs
+    of the same act that differ only in article or version share one entry.
+
+    Every entry keeps the validators of the page it was parsed from (ETag and Last-Modified),
+    so that get_tree can revalidate it with a conditional GET instead of downloading and
+    parsing the page again.
+    """
+
+    def __init__(self, path=None, revalidate_after=TREE_CACHE_REVALIDATE_AFTER, max_entries=TREE_CACHE_MAX_ENTRIES):
+        self.revalidate_after = revalidate_after
+        self.disk = DiskCache(path or os.path.join(CACHE_DIR, TREE_CACHE_DB_FILENAME), max_entries=max_entries)
+
+    @staticmethod
+    def _key(normurn, link):
+        return f"{'link' if link else 'plain'}|{canonical_urn(normurn, act_only=True)}"
+
+    def get(self, normurn, link=False):
+        """
+        Returns the cached entry for a norm page.
+
+        Returns:
+        dict -- Keys tree, etag, last_modified and validated_at, or None if the page is not cached
+        """
+        found, entry = self.disk.get(self._key(normurn, link))
+        return entry if found else None
+
+    def is_fresh(self, entry):
+        """True if the entry was validated recently enough to be used without contacting the server."""
+        return time.time() - entry['validated_at'] < self.revalidate_after
+
+    def headers_for(self, entry):
+        """Builds the conditional request headers for a cached entry."""
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def store(self, normurn, link, tree, response_headers):
+        """Stores a parsed tree along with the validators of the response it came from."""
+        entry = {
+            'tree': tree,
+            'etag': response_headers.get('ETag'),
+            'last_modified': response_headers.get('Last-Modified'),
+            'validated_at': time.time(),
+        }
+        self._save(normurn, link, entry)
+
+    def mark_validated(self, normurn, link, entry, response_headers):
+        """Records a 304 Not Modified answer, refreshing the validators the server sent back."""
+        entry = dict(entry, validated_at=time.time())
+        entry['etag'] = response_headers.get('ETag') or entry.get('etag')
+        entry['last_modified'] = response_headers.get('Last-Modified') or entry.get('last_modified')
+        self._save(normurn, link, entry)
+
+    def _save(self, normurn, link, entry):
+        try:
+            self.disk.set(self._key(normurn, link), entry)
+        except sqlite3.Error as e:
+            logging.error("Failed to store the tree of %s: %s", normurn, e)
+
+    def clear(self):
+        self.disk.clear()
+
+
+_tree_cache = None
+_tree_cache_lock = threading.Lock()
+_tree_cache_failed = False
+
+
+def get_tree_cache():
+    """
+    Returns the shared TreeCache, opening it on first use.
+
+    Returns:
+    TreeCache -- The cache, or None if the database cannot be opened
+    """
+    global _tree_cache, _tree_cache_failed
+    if _tree_cache is None and not _tree_cache_failed:
+        with _tree_cache_lock:
+            if _tree_cache is None and not _tree_cache_failed:
+                try:
+                    _tree_cache = TreeCache()
+                except (sqlite3.Error, OSError) as e:
+                    logging.error("Tree cache unavailable, trees will be downloaded every time: %s", e)
+                    _tree_cache_failed = True
+    return _tree_cache
@@ -1,15 +1,198 @@
 import requests
-from bs4 import BeautifulSoup
+import codecs
+from html.parser import HTMLParser
 from functools import lru_cache
 import logging
 import re
-from .config import MAX_CACHE_SIZE
+from .config import MAX_CACHE_SIZE, HTML_PARSER_BACKENDS, TREE_STREAMING, TREE_STREAM_CHUNK_SIZE
+from ..network.http_client import get_session
+from .tree_cache import get_tree_cache
 
-# Configure logging
-logging.basicConfig(level=logging.INFO,
-                    format='%(asctime)s %(levelname)s %(message)s',
-                    handlers=[logging.FileHandler("norma.log"),
-                              logging.StreamHandler()])
+# Backend that parses with lxml directly; any other name is a BeautifulSoup parser ("html.parser", "lxml-bs4"...)
+NATIVE_LXML = "lxml"
+
+
+@lru_cache(maxsize=None)
+def _strainer(page):
+    """
+    Returns the SoupStrainer for the parts of the page the BeautifulSoup tree parsers read:
+    Normattiva's article tree and EUR-Lex's links. bs4 is imported on first use, not at startup.
+    """
+    from bs4 import SoupStrainer
+    if page == "normattiva":
+        return SoupStrainer('div', id='albero')
+    return SoupStrainer('a')
+
+
+@lru_cache(maxsize=None)
+def available_parser(preferred=HTML_PARSER_BACKENDS):
+    """
+    Returns the first parser backend installed, in order of preference.
+
+    Arguments:
+    preferred -- Tuple of backend names, fastest first (e.g. "lxml", "html.parser")
+
+    Returns:
+    str -- The backend name
+    """
+    from bs4 import BeautifulSoup, FeatureNotFound
+    for parser in preferred:
+        try:
+            if parser == NATIVE_LXML:
+                import lxml.html  # noqa: F401
+            else:
+                BeautifulSoup("<p></p>", _bs4_feature(parser))
+        except (ImportError, FeatureNotFound):
+            logging.debug("HTML parser backend not available: %s", parser)
+            continue
+        logging.info("Using HTML parser backend: %s", parser)
+        return parser
+    return "html.parser"
+
+
+def _bs4_feature(parser):
+    return parser[:-len("-bs4")] if parser.endswith("-bs4") else parser
+
+
+def parse_tree_page(markup, normurn, link=False, parser=None, scoped=True, encoding=None):
+    """
+    Parses a Normattiva or EUR-Lex page into its article tree.
+
+    Arguments:
+    markup -- The page as bytes or text
+    normurn -- The URL of the norm page, used to pick the page format
+    link -- Boolean flag indicating if URLs should be included in the result
+    parser -- Parser backend (default: the fastest one installed)
+    scoped -- If True BeautifulSoup only builds the elements the tree parser reads
+    encoding -- Charset of markup when given as bytes, if known from the response headers
+
+    Returns:
+    tuple -- List of extracted article information and their count, or an error message
+    """
+    parser = parser or available_parser()
+    if parser != NATIVE_LXML:
+        from bs4 import BeautifulSoup
+    if "normattiva" in normurn:
+        if parser == NATIVE_LXML:
+            return _parse_normattiva_tree_lxml(_lxml_document(markup, encoding), normurn, link)
+        soup = BeautifulSoup(markup, _bs4_feature(parser), parse_only=_strainer("normattiva") if scoped else None,
+                             from_encoding=encoding)
+        return _parse_normattiva_tree(soup, normurn, link)
+    elif "eur-lex" in normurn:
+        if parser == NATIVE_LXML:
+            return _parse_eurlex_tree_lxml(_lxml_document(markup, encoding))
+        soup = BeautifulSoup(markup, _bs4_feature(parser), parse_only=_strainer("eurlex") if scoped else None,
+                             from_encoding=encoding)
+        return _parse_eurlex_tree(soup)
+
+    logging.warning("Unrecognized norm URN format: %s", normurn)
+    return "Unrecognized norm URN format"
+
+
+class _AlberoExtractor(HTMLParser):
+    """Tokenizes a page incrementally and keeps only the markup of the first div#albero."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.parts = []
+        self.inside = False
+        self.done = False
+        self._div_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if not self.inside:
+            if tag == 'div' and ('id', 'albero') in attrs:
+                self.inside = True
+                self._div_depth = 1
+                self.parts.append(self.get_starttag_text())
+            return
+        self.parts.append(self.get_starttag_text())
+        if tag == 'div':
+            self._div_depth += 1
+
+    def handle_startendtag(self, tag, attrs):
+        if self.inside:
+            self.parts.append(self.get_starttag_text())
+
+    def handle_endtag(self, tag):
+        if not self.inside:
+            return
+        self.parts.append(f"</{tag}>")
+        if tag == 'div':
+            self._div_depth -= 1
+            if self._div_depth == 0:
+                self.inside = False
+                self.done = True
+
+    def handle_data(self, data):
+        if self.inside:
+            self.parts.append(data)
+
+    def handle_entityref(self, name):
+        if self.inside:
+            self.parts.append(f"&{name};")
+
+    def handle_charref(self, name):
+        if self.inside:
+            self.parts.append(f"&#{name};")
+
+
+def extract_albero(chunks, encoding=None, parser=None):
+    """
+    Reads a Normattiva page chunk by chunk and stops as soon as div#albero is closed.
+
+    Arguments:
+    chunks -- Iterable of byte chunks of the page
+    encoding -- Charset of the page (default: declared by the page, or UTF-8)
+    parser -- Parser backend; "lxml" tokenizes with lxml's pull parser, anything else with html.parser
+
+    Returns:
+    tuple -- (markup of div#albero or None if the page has none, bytes read, raw bytes if the whole page was read)
+    """
+    if (parser or available_parser()) == NATIVE_LXML:
+        return _extract_albero_lxml(chunks, encoding)
+    decoder = codecs.getincrementaldecoder(encoding or 'utf-8')(errors='replace')
+    extractor = _AlberoExtractor()
+    raw = []
+    bytes_read = 0
+    for chunk in chunks:
+        bytes_read += len(chunk)
+        raw.append(chunk)
+        extractor.feed(decoder.decode(chunk))
+        if extractor.done:
+            return "".join(extractor.parts), bytes_read, None
+    extractor.feed(decoder.decode(b'', final=True))
+    extractor.close()
+    # Without a complete div#albero the page is handed whole to the regular parsers, which report the problem
+    return None, bytes_read, b"".join(raw)
+
+
+def _extract_albero_lxml(chunks, encoding):
+    from lxml import etree
+    pull_parser = etree.HTMLPullParser(events=('start', 'end'), encoding=encoding)
+    albero = None
+    raw = []
+    bytes_read = 0
+    for chunk in chunks:
+        bytes_read += len(chunk)
+        raw.append(chunk)
+        pull_parser.feed(chunk)
+        for event, element in pull_parser.read_events():
+            if event == 'start':
+                if albero is None and element.tag == 'div' and element.get('id') == 'albero':
+                    albero = element
+            elif element is albero:
+                return etree.tostring(albero, encoding='unicode', with_tail=False), bytes_read, None
+    return None, bytes_read, b"".join(raw)
+
+
+def _lxml_document(markup, encoding):
+    from lxml import etree, html
+    try:
+        return html.document_fromstring(markup, parser=html.HTMLParser(encoding=encoding))
+    except etree.ParserError as e:
+        logging.warning("Failed to parse the page: %s", e)
+        return None
 
  
 def get_tree(normurn, link=False):
@@ -23,24 +206,43 @@ def get_tree(normurn, link=False):
     Returns:
     tuple -- List of extracted article information and their count, or an error message
     """
-    logging.info(f"Fetching tree for norm URN: {normurn}")
+    cache = get_tree_cache()
+    cached = cache.get(normurn, link) if cache else None
+    if cached and cache.is_fresh(cached):
+        logging.info("Using cached tree for norm URN: %s", normurn)
+        return cached['tree']
+
+    logging.info("Fetching tree for norm URN: %s", normurn)
     try:
-        # Sending HTTP GET request to the provided URL
-        response = requests.get(normurn, timeout=30)
-        response.raise_for_status()
+        # Sending HTTP GET request to the provided URL, conditional if the tree is already cached
+        headers = cache.headers_for(cached) if cached else {}
+        response = get_session().get(normurn, headers=headers, timeout=30, stream=True)
+        with response:
+            if cached and response.status_code == 304:
+                logging.info("Cached tree still valid (304 Not Modified) for norm URN: %s", normurn)
+                cache.mark_validated(normurn, link, cached, response.headers)
+                return cached['tree']
+            response.raise_for_status()
+
+            declared = 'charset=' in response.headers.get('Content-Type', '').lower()
+            encoding = response.encoding if declared else None
+            if TREE_STREAMING and "normattiva" in normurn:
+                markup, bytes_read, content = extract_albero(response.iter_content(TREE_STREAM_CHUNK_SIZE), encoding)
+                logging.info("Read %s bytes of the page, %s div#albero", bytes_read, 'stopping after' if markup else 'without finding')
+                if markup is not None:
+                    # Closing the response before the end drops the rest of the download
+                    content, encoding = markup, None
+            else:
+                content = response.content
     except requests.exceptions.RequestException as e:
-        logging.error(f"Failed to retrieve the page: {e}", exc_info=True)
+        logging.error("Failed to retrieve the page: %s", e, exc_info=True)
         return f"Failed to retrieve the page: {e}"
-    
-    soup = BeautifulSoup(response.text, 'html.parser')
 
-    if "normattiva" in normurn:
-        return _parse_normattiva_tree(soup, normurn, link)
-    elif "eur-lex" in normurn:
-        return _parse_eurlex_tree(soup)
-
-    logging.warning(f"Unrecognized norm URN format: {normurn}")
-    return "Unrecognized norm URN format"
+    # Hand the raw bytes to the parser: it decodes them itself, without requests guessing the charset over the whole page
+    tree = parse_tree_page(content, normurn, link, encoding=encoding)
+    if cache and isinstance(tree, tuple) and tree[1]:
+        cache.store(normurn, link, tree, response.headers)
+    return tree
 
  
 def _parse_normattiva_tree(soup, normurn, link):
@@ -57,44 +259,97 @@ def _parse_normattiva_tree(soup, normurn, link):
         logging.warning("No 'ul' element found within the 'albero' div")
         return "No 'ul' element found within the 'albero' div", 0
 
+    def article_texts():
+        for ul in uls:
+            list_items = ul.find_all('a', class_='numero_articolo')
+            for a in list_items:
+                parent_li = a.find_parent('li')
+                if parent_li and _is_hidden_item(parent_li.get('class', [])):
+                    continue
+                yield a.get_text(separator=" ", strip=True)
+
+    return _normattiva_result(article_texts(), normurn, link)
+
+
+def _parse_normattiva_tree_lxml(document, normurn, link):
+    """Parses the Normattiva-specific tree structure from an lxml document."""
+    logging.info("Parsing Normattiva structure")
+    trees = document.xpath("//div[@id='albero']") if document is not None else []
+
+    if not trees:
+        logging.warning("Div with id 'albero' not found")
+        return "Div with id 'albero' not found", 0
+
+    uls = list(trees[0].iter('ul'))
+    if not uls:
+        logging.warning("No 'ul' element found within the 'albero' div")
+        return "No 'ul' element found within the 'albero' div", 0
+
+    def article_texts():
+        for ul in uls:
+            for a in ul.iter('a'):
+                if 'numero_articolo' not in a.get('class', '').split():
+                    continue
+                parent_li = next(a.iterancestors('li'), None)
+                if parent_li is not None and _is_hidden_item(parent_li.get('class', '').split()):
+                    continue
+                yield " ".join(text.strip() for text in a.itertext() if text.strip())
+
+    return _normattiva_result(article_texts(), normurn, link)
+
+
+def _is_hidden_item(classes):
+    """Amended or collapsed entries of the Normattiva tree are not articles of the current text."""
+    return any(cls.startswith('agg') or 'collapse' in cls for cls in classes)
+
+
+def _normattiva_result(article_texts, normurn, link):
+    """Builds the (result, count) pair from the text of the tree's article links, in document order."""
     article_part_pattern = re.compile(r'art\d+')
     result = []  # List to preserve the order
     seen = set()  # Set to track seen articles
     count = 0
 
-    for ul in uls:
-        list_items = ul.find_all('a', class_='numero_articolo')
-        for a in list_items:
-            parent_li = a.find_parent('li')
-            if parent_li and any(cls.startswith('agg') or 'collapse' in cls for cls in parent_li.get('class', [])):
-                continue
-
-            text_content = a.get_text(separator=" ", strip=True).replace("art. ", "")
-
-            if text_content not in seen:  # Check for duplicates
-                seen.add(text_content)  # Add to the set to track duplicates
-                if link:
-                    article_part = article_part_pattern.search(normurn)
-                    modified_url = normurn.replace(article_part.group(), 'art' + text_content.split()[0]) if article_part else normurn
-                    result.append({text_content: modified_url})  # Add as dictionary if link is true
-                else:
-                    result.append(text_content)  # Add text content to the list
-                
-                count += 1
-
-    logging.info(f"Extracted {count} unique articles from Normattiva")
+    for text in article_texts:
+        text_content = text.replace("art. ", "")
+
+        if text_content not in seen:  # Check for duplicates
+            seen.add(text_content)  # Add to the set to track duplicates
+            if link:
+                article_part = article_part_pattern.search(normurn)
+                modified_url = normurn.replace(article_part.group(), 'art' + text_content.split()[0]) if article_part else normurn
+                result.append({text_content: modified_url})  # Add as dictionary if link is true
+            else:
+                result.append(text_content)  # Add text content to the list
+
+            count += 1
+
+    logging.info("Extracted %s unique articles from Normattiva", count)
     return result, count  # Return the list and count
 
  
 def _parse_eurlex_tree(soup):
     """Parses the Eurlex-specific tree structure."""
     logging.info("Parsing Eurlex structure")
+    return _eurlex_result(soup.find_all('a'), lambda a_tag: a_tag.text, lambda a_tag: a_tag.get_text(strip=True))
+
+
+def _parse_eurlex_tree_lxml(document):
+    """Parses the Eurlex-specific tree structure from an lxml document."""
+    logging.info("Parsing Eurlex structure")
+    anchors = document.iter('a') if document is not None else ()
+    return _eurlex_result(anchors, lambda a_tag: "".join(a_tag.itertext()),
+                          lambda a_tag: "".join(text.strip() for text in a_tag.itertext()))
+
+
+def _eurlex_result(anchors, text_of, stripped_text_of):
+    """Builds the (result, count) pair from the article links, in document order."""
     result = []  # List to preserve the order
     seen = set()  # Set to track seen articles
 
-    for a_tag in soup.find_all('a'):
-        if 'Articolo' in a_tag.text:
-            match = re.search(r'Articolo\s+(\d+\s*\w*)', a_tag.get_text(strip=True))
+    for a_tag in anchors:
+        if 'Articolo' in text_of(a_tag):
+            match = re.search(r'Articolo\s+(\d+\s*\w*)', stripped_text_of(a_tag))
             if match:
                 article_number = match.group(1).strip()
                 if article_number not in seen:  # Check for duplicates
@@ -102,5 +357,5 @@ def _parse_eurlex_tree(soup):
                     result.append(article_number)  # Add to the list
     
     count = len(result)
-    logging.info(f"Extracted {count} unique articles from Eurlex")
+    logging.info("Extracted %s unique articles from Eurlex", count)
     return result, count  # Return the list and count
@@ -0,0 +1,170 @@
+import re
+import sys
+import logging
+from dataclasses import dataclass, replace
+from functools import lru_cache
+from .config import MAX_CACHE_SIZE
+
+NORMATTIVA_RESOLVER = "https://www.normattiva.it/uri-res/N2Ls?"
+NORMATTIVA_URN_BASE = NORMATTIVA_RESOLVER + "urn:nir:stato:"
+EURLEX_ELI_BASE = "https://eur-lex.europa.eu/eli/"
+EURLEX_CELEX_BASE = "https://eur-lex.europa.eu/legal-content/IT/TXT/HTML/?uri=CELEX:"
+
+_NIR = "urn:nir:"
+_VIGENTE = "!vig="
+_ORIGINALE = "@originale"
+_ARTICLE = "~art"
+_DATE_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2}$")
+_ARTICLE_PATTERN = re.compile(r"(\d*)(.*)$", re.DOTALL)
+
+# Slotted dataclasses need Python 3.10+
+_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(frozen=True, **_SLOTS)
+class Urn:
+    """
+    Structured form of a Normattiva URN or of an EUR-Lex URI, as built by urngenerator.generate_urn.
+
+    Normattiva: act_type is the URN act type ("regio.decreto", "costituzione"), date is ISO formatted,
+    article/extension split "~art3bis" into "3" and "bis", version is "vigente" or "originale".
+    EUR-Lex: act_type is "reg" or "dir" with date holding the year (ELI URIs), or "celex" with the
+    CELEX number in number (the treaties).
+    """
+    source: str
+    act_type: str
+    date: str = None
+    number: str = None
+    annex: str = None
+    article: str = None
+    extension: str = None
+    version: str = None
+    version_date: str = None
+    authority: str = "stato"
+
+    @property
+    def is_normattiva(self):
+        return self.source == "normattiva"
+
+    def act(self):
+        """Returns the URN of the act itself, without article and version."""
+        return replace(self, article=None, extension=None, version=None, version_date=None)
+
+    def to_string(self):
+        """Serializes the URN in its canonical form, the one generate_urn produces."""
+        if self.source == "eurlex":
+            if self.act_type == "celex":
+                return f"{EURLEX_CELEX_BASE}{self.number}/TXT"
+            return f"{EURLEX_ELI_BASE}{self.act_type}/{self.date}/{self.number}/oj/ita"
+        parts = [NORMATTIVA_RESOLVER, _NIR, self.authority, ":", self.act_type]
+        if self.date:
+            parts += [":", self.date]
+        if self.number:
+            parts += [";", self.number]
+        if self.annex:
+            parts += [":", self.annex]
+        if self.article or self.extension:
+            parts += [_ARTICLE, self.article or "", self.extension or ""]
+        if self.version == "originale":
+            parts.append(_ORIGINALE)
+        elif self.version == "vigente":
+            parts += [_VIGENTE, self.version_date or ""]
+        return "".join(parts)
+
+    __str__ = to_string
+
+
+@lru_cache(maxsize=MAX_CACHE_SIZE)
+def parse_urn(urn):
+    """
+    Parses a Normattiva URN (with or without the resolver URL) or an EUR-Lex URI.
+
+    Arguments:
+    urn -- The URN string
+
+    Returns:
+    Urn -- The structured URN, or None if the string is not a URN this application builds
+    """
+    if not urn:
+        return None
+    urn = urn.strip()
+    if urn.startswith(EURLEX_CELEX_BASE):
+        return _parse_celex(urn)
+    if urn.startswith(EURLEX_ELI_BASE):
+        return _parse_eli(urn)
+    return _parse_normattiva(urn)
+
+
+def _parse_normattiva(urn):
+    # The last "urn:nir:" wins: a few codes in NORMATTIVA_URN_CODICI carry a whole resolver path of their own
+    start = urn.rfind(_NIR)
+    if start < 0:
+        return None
+    authority, separator, rest = urn[start + len(_NIR):].partition(":")
+    if not separator or not authority or not rest:
+        return None
+
+    version = version_date = None
+    if rest.endswith(_ORIGINALE):
+        version = "originale"
+        rest = rest[:-len(_ORIGINALE)]
+    else:
+        rest, separator, vigency = rest.partition(_VIGENTE)
+        if separator:
+            version = "vigente"
+            version_date = vigency or None
+
+    rest, separator, article_part = rest.partition(_ARTICLE)
+    article = extension = None
+    if separator:
+        article, extension = _ARTICLE_PATTERN.match(article_part).groups()
+        article = article or None
+        extension = extension or None
+
+    date = number = annex = None
+    if ";" in rest:
+        type_and_date, _, number_and_annex = rest.partition(";")
+        act_type, _, date = type_and_date.partition(":")
+        number, _, annex = number_and_annex.partition(":")
+    else:
+        act_type, _, qualifier = rest.partition(":")
+        if _DATE_PATTERN.match(qualifier):
+            date = qualifier
+        else:
+            annex = qualifier
+    if not act_type:
+        return None
+    return Urn("normattiva", act_type, date or None, number or None, annex or None, article, extension,
+               version, version_date, authority)
+
+
+def _parse_eli(urn):
+    parts = urn[len(EURLEX_ELI_BASE):].split("/")
+    if len(parts) < 3 or not all(parts[:3]):
+        return None
+    return Urn("eurlex", parts[0], date=parts[1], number=parts[2], authority=None)
+
+
+def _parse_celex(urn):
+    celex = urn[len(EURLEX_CELEX_BASE):].split("/", 1)[0]
+    if not celex:
+        return None
+    return Urn("eurlex", "celex", number=celex, authority=None)
+
+
+def canonical_urn(urn, act_only=False):
+    """
+    Returns the canonical string of a URN, so that equivalent URNs compare equal.
+
+    Arguments:
+    urn -- The URN string
+    act_only -- If True, the article and the version are dropped
+
+    Returns:
+    str -- The canonical URN, or the input unchanged if it cannot be parsed
+    """
+    parsed = parse_urn(urn)
+    if parsed is None:
+        logging.debug("URN not recognised, used as is: %s", urn)
+        return urn
+    return (parsed.act() if act_only else parsed).to_string()
@@ -1,19 +1,15 @@
 import re
 import logging
 from functools import lru_cache
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import WebDriverWait
 from .config import MAX_CACHE_SIZE
 from .text_op import normalize_act_type, parse_date, estrai_data_da_denominazione
 from .map import NORMATTIVA_URN_CODICI, EURLEX
-from .sys_op import WebDriverManager
+from .sys_op import get_webdriver_pool
+from .date_index import get_date_index
 from . import eurlex
-
-# Configure logging
-logging.basicConfig(level=logging.INFO,
-                    format='%(asctime)s %(levelname)s %(message)s',
-                    )
+from .urn_parser import NORMATTIVA_URN_BASE, parse_urn
+_ARTICLE_LABEL_PATTERN = re.compile(r'\b[Aa]rticoli?\b|\b[Aa]rt\.?\b')
+_YEAR_PATTERN = re.compile(r"^\d{4}$")
 
 @lru_cache(maxsize=MAX_CACHE_SIZE)
 def complete_date(act_type, date, act_number):
@@ -28,30 +24,40 @@ def complete_date(act_type, date, act_number):
     Returns:
     str -- Completed date or error message
     """
-    logging.info(f"Completing date for act_type: {act_type}, date: {date}, act_number: {act_number}")
+    logging.info("Completing date for act_type: %s, date: %s, act_number: %s", act_type, date, act_number)
 
-    driver_manager = WebDriverManager()
     try:
-        driver = driver_manager.setup_driver()
-        driver.get("https://www.normattiva.it/")
-        search_box = driver.find_element(By.CSS_SELECTOR, "#testoRicerca")
-        search_criteria = f"{act_type} {act_number} {date}"
-        logging.info(f"Search criteria: {search_criteria}")
-        
-        search_box.send_keys(search_criteria)
-        WebDriverWait(driver, 5).until(EC.element_to_be_clickable((By.XPATH, "//*[@id=\"button-3\"]"))).click()
-        element = WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.XPATH, '//*[@id="heading_1"]/p[1]/a')))
-        element_text = element.text
-        logging.info(f"Element text found: {element_text}")
-        
-        completed_date = estrai_data_da_denominazione(element_text)
-        logging.info(f"Completed date: {completed_date}")
+        with get_webdriver_pool().driver() as driver:
+            completed_date = _search_act_date(driver, act_type, date, act_number)
+        logging.info("Completed date: %s", completed_date)
+        try:
+            get_date_index().add(act_type, parse_date(completed_date), act_number)
+        except ValueError:
+            logging.warning("Completed date not indexed, unrecognised format: %s", completed_date)
         return completed_date
     except Exception as e:
-        logging.error(f"Error in complete_date: {e}", exc_info=True)
+        logging.error("Error in complete_date: %s", e, exc_info=True)
         return f"Errore nel completamento della data, inserisci la data completa: {e}"
-    finally:
-        driver_manager.close_drivers()
+
+def _search_act_date(driver, act_type, date, act_number):
+    """Runs the Normattiva search for the act on a pooled driver and returns its full date."""
+    # Imported here so that Selenium is only loaded when a date actually needs completing
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+
+    driver.get("https://www.normattiva.it/")
+    search_box = driver.find_element(By.CSS_SELECTOR, "#testoRicerca")
+    search_criteria = f"{act_type} {act_number} {date}"
+    logging.info("Search criteria: %s", search_criteria)
+
+    search_box.send_keys(search_criteria)
+    WebDriverWait(driver, 5).until(EC.element_to_be_clickable((By.XPATH, "//*[@id=\"button-3\"]"))).click()
+    element = WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.XPATH, '//*[@id="heading_1"]/p[1]/a')))
+    element_text = element.text
+    logging.info("Element text found: %s", element_text)
+
+    return estrai_data_da_denominazione(element_text)
 
 @lru_cache(maxsize=MAX_CACHE_SIZE)
 def generate_urn(act_type, date=None, act_number=None, article=None, annex=None, version=None, version_date=None, urn_flag=True):
@@ -71,52 +77,129 @@ def generate_urn(act_type, date=None, act_number=None, article=None, annex=None,
     Returns:
     str -- The generated URN
     """
-    logging.info(f"Generating URN for act_type: {act_type}, date: {date}, act_number: {act_number}, article: {article}, annex: {annex}, version: {version}, version_date: {version_date}, urn_flag: {urn_flag}")
-    codici_urn = NORMATTIVA_URN_CODICI  
-    base_url = "https://www.normattiva.it/uri-res/N2Ls?urn:nir:stato:"
-    normalized_act_type = normalize_act_type(act_type)  
-    
-    # Check if 'article' is a valid string before attempting to split it
-    extension = None
-    if article and '-' in article:
-        parts = article.split('-')
-        article = parts[0]
-        extension = parts[1]
-    
-    # Handle EURLEX cases
-    if normalized_act_type in EURLEX:  # Assuming EURLEX is a dictionary defined elsewhere
-        if normalized_act_type in {"CDFUE", "TUE", "TFUE"}:
-            logging.info(f"Returning EURLEX URN for trattato: {EURLEX[normalized_act_type]}")
-            return EURLEX[normalized_act_type]
-        else:
-            return eurlex.get_eur_uri(act_type=EURLEX[normalized_act_type], year=date, num=act_number)  # Assuming eurlex is defined
-
-    # Handle other cases with codici_urn
-    if normalized_act_type in codici_urn:
-        urn = codici_urn[normalized_act_type]
-        logging.info(f"URN found in codici_urn: {urn}")
-    else:
-        try:
-            formatted_date = complete_date_or_parse(date, act_type, act_number)  # Assuming this function is defined
-            urn = f"{normalized_act_type}:{formatted_date};{act_number}"
-            logging.info(f"Generated base URN: {urn}")
-        except Exception as e:
-            logging.error(f"Error generating URN: {e}", exc_info=True)
-            return None
-    
+    logging.debug("Generating URN for act_type: %s, date: %s, act_number: %s, article: %s, annex: %s, "
+                  "version: %s, version_date: %s, urn_flag: %s",
+                  act_type, date, act_number, article, annex, version, version_date, urn_flag)
+    urn, complete = resolve_act_urn(act_type, date, act_number)
+    if complete or urn is None:
+        return urn
+
     if annex:
         urn = urn + f':{annex.strip()}'
-    
-    # Assuming these functions are defined elsewhere
-    urn = append_article_info(urn, article, extension)  
+
+    urn += article_suffix(article)
     urn = append_version_info(urn, version, version_date)
 
-    final_urn = base_url + urn
+    final_urn = NORMATTIVA_URN_BASE + urn
     result = final_urn if urn_flag else final_urn.split("~")[0]
-    logging.info(f"Final URN: {result}")
-    
+    logging.debug("Final URN: %s", result)
+
     return result
 
+def generate_urns(act_type, date=None, act_number=None, articles=(), annex=None, version=None, version_date=None, urn_flag=True):
+    """
+    Generates the URNs of several articles of one act, resolving the act and its date only once.
+    The result is the same as calling generate_urn for each article.
+
+    Arguments:
+    act_type -- Type of the legal act
+    date -- Date of the act
+    act_number -- Number of the act
+    articles -- Article numbers; None or "" stands for the act itself
+    annex -- Annex, either one value for every article or a list with a value per article
+    version -- Version, either one value for every article or a list with a value per article
+    version_date -- Version date, either one value for every article or a list with a value per article
+    urn_flag -- Boolean flag to include full URN or not
+
+    Returns:
+    list -- The URNs, in the order of articles
+    """
+    articles = list(articles)
+    annexes = _per_article(annex, len(articles), "annex")
+    versions = _per_article(version, len(articles), "version")
+    version_dates = _per_article(version_date, len(articles), "version_date")
+    logging.debug("Generating %s URNs for act_type: %s, date: %s, act_number: %s",
+                  len(articles), act_type, date, act_number)
+
+    act_urn, complete = resolve_act_urn(act_type, date, act_number)
+    if complete or act_urn is None:
+        return [act_urn] * len(articles)
+
+    # Articles and versions repeat across a range: each distinct one is formatted once
+    annex_parts = {}
+    article_parts = {}
+    version_parts = {}
+    urns = []
+    for article, item_annex, item_version, item_version_date in zip(articles, annexes, versions, version_dates):
+        annex_part = annex_parts.get(item_annex)
+        if annex_part is None:
+            annex_part = annex_parts[item_annex] = f':{item_annex.strip()}' if item_annex else ""
+        article_part = article_parts.get(article)
+        if article_part is None:
+            article_part = article_parts[article] = article_suffix(article)
+        version_part = version_parts.get((item_version, item_version_date))
+        if version_part is None:
+            version_part = version_parts[item_version, item_version_date] = append_version_info("", item_version, item_version_date)
+        urn = NORMATTIVA_URN_BASE + act_urn + annex_part + article_part + version_part
+        urns.append(urn if urn_flag else urn.split("~")[0])
+    return urns
+
+def _per_article(value, count, name):
+    if isinstance(value, (list, tuple)):
+        if len(value) != count:
+            raise ValueError(f"{name} has {len(value)} values for {count} articles")
+        return value
+    return [value] * count
+
+def resolve_act_urn(act_type, date, act_number):
+    """
+    Resolves the part of the URN that identifies the act, completing its date if needed.
+
+    Arguments:
+    act_type -- Type of the legal act
+    date -- Date of the act
+    act_number -- Number of the act
+
+    Returns:
+    tuple -- (urn, complete): complete is True when urn is already the final EUR-Lex URI,
+             urn is None when the date could not be resolved
+    """
+    normalized_act_type = normalize_act_type(act_type)
+
+    # Handle EURLEX cases
+    if normalized_act_type in EURLEX:
+        if normalized_act_type in {"CDFUE", "TUE", "TFUE"}:
+            logging.debug("Returning EURLEX URN for trattato: %s", EURLEX[normalized_act_type])
+            return EURLEX[normalized_act_type], True
+        return eurlex.get_eur_uri(act_type=EURLEX[normalized_act_type], year=date, num=act_number), True
+
+    if normalized_act_type in NORMATTIVA_URN_CODICI:
+        urn = NORMATTIVA_URN_CODICI[normalized_act_type]
+        logging.debug("URN found in codici_urn: %s", urn)
+        return urn, False
+    try:
+        formatted_date = complete_date_or_parse(date, act_type, act_number)
+        urn = f"{normalized_act_type}:{formatted_date};{act_number}"
+        logging.debug("Generated base URN: %s", urn)
+        return urn, False
+    except Exception as e:
+        logging.error("Error generating URN: %s", e, exc_info=True)
+        return None, False
+
+def article_suffix(article):
+    """
+    Returns the article part of the URN ("~art3bis" for "3-bis"), or an empty string if there is no article.
+
+    Arguments:
+    article -- Article number, with an optional extension after a dash
+    """
+    extension = None
+    if article and '-' in article:
+        parts = article.split('-')
+        article = parts[0]
+        extension = parts[1]
+    return append_article_info("", article, extension)
+
 def complete_date_or_parse(date, act_type, act_number):
     """
     Completes the date if necessary or parses the date.
@@ -129,7 +212,12 @@ def complete_date_or_parse(date, act_type, act_number):
     Returns:
     str -- Formatted date
     """
-    if re.match(r"^\d{4}$", date) and act_number:
+    if _YEAR_PATTERN.match(date) and act_number:
+        # The local index covers the codes and every act completed before, without opening a browser
+        indexed_date = get_date_index().lookup(act_type, date, act_number)
+        if indexed_date:
+            logging.debug("Date found in the act date index: %s", indexed_date)
+            return indexed_date
         act_type_for_search = normalize_act_type(act_type, search=True)
         full_date = complete_date(act_type=act_type_for_search, date=date, act_number=act_number)
         return parse_date(full_date)
@@ -150,11 +238,11 @@ def append_article_info(urn, article, extension):
     if article:
         if "-" in article:
             article, extension = article.split("-")
-        article = re.sub(r'\b[Aa]rticoli?\b|\b[Aa]rt\.?\b', "", article).strip()
+        article = _ARTICLE_LABEL_PATTERN.sub("", article).strip()
         urn += f"~art{article}"
         if extension:
             urn += extension
-        logging.info(f"Appended article info to URN: {urn}")
+        logging.debug("Appended article info to URN: %s", urn)
     return urn
 
 def append_version_info(urn, version, version_date):
@@ -176,7 +264,7 @@ def append_version_info(urn, version, version_date):
         if version_date:
             formatted_version_date = parse_date(version_date)
             urn += formatted_version_date
-        logging.info(f"Appended version info to URN: {urn}")
+        logging.debug("Appended version info to URN: %s", urn)
     return urn
 
 def urn_to_filename(urn):
@@ -189,21 +277,15 @@ def urn_to_filename(urn):
     Returns:
     str -- The generated filename
     """
-    logging.info(f"Converting URN to filename: {urn}")
-    try:
-        act_type_section = urn.split('stato:')[1].split('~')[0]
-    except IndexError:
+    logging.debug("Converting URN to filename: %s", urn)
+    parsed = parse_urn(urn)
+    if parsed is None or not parsed.is_normattiva:
         logging.error("Invalid URN format")
         raise ValueError("Invalid URN format")
-    
-    if ':' in act_type_section and ';' in act_type_section:
-        type_and_date, number = act_type_section.split(';')
-        year = type_and_date.split(':')[1].split('-')[0]
-        filename = f"{number}_{year}.pdf"
-        logging.info(f"Generated filename: {filename}")
-        return filename
-
-    act_type = act_type_section.split('/')[-1]
-    filename = f"{act_type.capitalize()}.pdf"
-    logging.info(f"Generated filename: {filename}")
+
+    if parsed.date and parsed.number:
+        filename = f"{parsed.number}_{parsed.date.split('-')[0]}.pdf"
+    else:
+        filename = f"{parsed.act_type.capitalize()}.pdf"
+    logging.debug("Generated filename: %s", filename)
     return filename
@@ -1,36 +1,318 @@
 # visualex_ui/utils/cache_manager.py
 
+import os
+import re
+import time
+import pickle
+import datetime
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
 from functools import lru_cache
+from ..tools.config import (
+    MAX_CACHE_SIZE, CACHE_DIR, CACHE_DB_FILENAME, CACHE_TTL_VIGENTE, CACHE_TTL_ORIGINALE, DISK_CACHE_MAX_ENTRIES
+)
+from ..tools.map import NORMATTIVA_URN_CODICI
+from ..tools.date_index import get_date_index
+from ..tools.text_op import normalize_act_type, parse_date, article_runs
+
+# Campi del payload che compongono la chiave canonica; gli altri vi entrano così come sono
+_KEY_FIELDS = ('act_type', 'date', 'act_number', 'article', 'annex', 'version', 'version_date')
+_ARTICLE_LABEL = re.compile(r'\b(?:articol[oi]|art)\b\.?', re.IGNORECASE)
+# Forme di data riconosciute senza parse_date: anno, YYYY-MM-DD, dd/mm/yyyy (anche con . o -), "10 maggio 2000"
+_YEAR = re.compile(r'\d{4}$')
+_ISO_DATE = re.compile(r'(\d{4})-(\d{1,2})-(\d{1,2})$')
+_NUMERIC_DATE = re.compile(r'(\d{1,2})[/.-](\d{1,2})[/.-](\d{4})$')
+_EXTENDED_DATE = re.compile(r'\d{1,2}\s+[a-z]+\s+\d{4}')
+
+
+def make_cache_key(payload):
+    """
+    Genera la chiave di cache canonica di un payload di ricerca, uguale per richieste equivalenti
+    scritte in modo diverso ("Codice civile" / "c.c.", "art. 2043" / "2043 ", "1-3" / "1, 2, 3").
+
+    La chiave dipende soltanto dal payload: gli intervalli di articoli vi entrano compatti ("1-1000000")
+    e non ristretti all'albero della norma, che può essere noto o no al momento della ricerca.
+
+    Args:
+        payload (dict): Il payload costruito dalla sezione di input di ricerca.
+
+    Returns:
+        str: La chiave di cache.
+    """
+    values = tuple(str(payload.get(field) or '').strip() for field in _KEY_FIELDS)
+    extra = tuple(sorted((key, str(value)) for key, value in payload.items() if value and key not in _KEY_FIELDS))
+    # La data odierna fa parte dell'input: la chiave di una richiesta "vigente" dipende da quale giorno è oggi
+    return _canonical_key(values, extra, datetime.date.today().isoformat())
+
+
+@lru_cache(maxsize=MAX_CACHE_SIZE)
+def _canonical_key(values, extra, today):
+    act_type, date, act_number, article, annex, version, version_date = values
+    parts = [f"act={_canonical_act(act_type, date, act_number)}"]
+    if article:
+        # Intervalli compatti ("1-1000000"), non espansi: la dimensione della chiave non dipende dall'intervallo
+        articles = article_runs(_ARTICLE_LABEL.sub(' ', article.lower()))
+        parts.append(f"article={','.join(articles) or article.lower()}")
+    if annex:
+        parts.append(f"annex={annex.lower()}")
+    version = version.lower() or 'vigente'
+    parts.append(f"version={version}")
+    if version == 'vigente' and version_date:
+        version_date = _canonical_date(version_date)
+        # Il testo vigente a oggi è quello attuale: niente data, così la voce non cambia chiave a ogni mezzanotte
+        # e scade soltanto per CACHE_TTL_VIGENTE. Le date future restano: Normattiva vi applica le modifiche differite
+        if version_date != today:
+            parts.append(f"version_date={version_date}")
+    parts.extend(f"{key}={value}" for key, value in extra)
+    return "&".join(parts)
+
+
+def _canonical_act(act_type, date, act_number):
+    """Identifica l'atto: l'URN per i codici (data e numero sono impliciti), altrimenti tipo, data e numero normalizzati."""
+    urn_type = normalize_act_type(act_type)
+    if urn_type in NORMATTIVA_URN_CODICI:
+        return NORMATTIVA_URN_CODICI[urn_type]
+    act = normalize_act_type(act_type, search=True).lower()
+    if date:
+        act += f":{_canonical_date(date, act_type, act_number)}"
+    if act_number:
+        act += f";{act_number.lower()}"
+    return act
+
+
+def _canonical_date(date, act_type=None, act_number=None):
+    """
+    Porta una data alla forma YYYY-MM-DD senza passare da parse_date per le forme che non gestisce
+    (che registrerebbe un errore a ogni ricerca): l'anno da solo, YYYY-MM-DD e dd/mm/yyyy sono riconosciuti qui.
+    """
+    date = date.strip().lower()
+    if _YEAR.match(date):
+        # Solo l'anno: la data completa se l'indice locale la conosce, così la chiave coincide con quella della data intera
+        if act_type and act_number:
+            return get_date_index().lookup(act_type, date, act_number) or date
+        return date
+    match = _ISO_DATE.match(date)
+    if match:
+        year, month, day = match.groups()
+    else:
+        match = _NUMERIC_DATE.match(date)
+        if match:
+            day, month, year = match.groups()
+    if match:
+        try:
+            return datetime.date(int(year), int(month), int(day)).isoformat()
+        except ValueError:
+            return date
+    if _EXTENDED_DATE.search(date):
+        try:
+            return parse_date(date)  # "10 maggio 2000"
+        except ValueError:
+            pass
+    return date
+
+
+def ttl_for_version(version):
+    """
+    Restituisce la durata di validità (in secondi) di una voce di cache in base alla versione richiesta.
+
+    Args:
+        version (str): "vigente" oppure "originale".
+
+    Returns:
+        float: La durata in secondi, o None se la voce non scade mai.
+    """
+    if version == "originale":
+        return CACHE_TTL_ORIGINALE
+    return CACHE_TTL_VIGENTE
+
+
+class DiskCache:
+    """Archivio persistente su SQLite con scadenza per voce."""
+
+    def __init__(self, path, max_entries=DISK_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._writes_since_prune = 0
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries(accessed_at)")
+        self._conn.commit()
+        logging.debug("DiskCache aperta in %s", path)
+
+    def get(self, key):
+        """
+        Recupera un valore dall'archivio.
+
+        Returns:
+            tuple: (trovato, valore). Le voci scadute o illeggibili vengono rimosse e contano come assenti.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT value, expires_at FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return False, None
+            blob, expires_at = row
+            if expires_at is not None and expires_at <= now:
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._conn.commit()
+                return False, None
+            try:
+                value = pickle.loads(blob)
+            except Exception as e:
+                # Voce scritta da una versione incompatibile dell'applicazione
+                logging.warning("Voce di cache non leggibile per la chiave %s: %s", key, e)
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._conn.commit()
+                return False, None
+            self._conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            return True, value
+
+    def set(self, key, value, ttl=None):
+        """Memorizza un valore con una durata di validità opzionale (in secondi)."""
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+        blob = sqlite3.Binary(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, blob, expires_at, now)
+            )
+            self._writes_since_prune += 1
+            if self._writes_since_prune >= 100:
+                self._prune(now)
+            self._conn.commit()
+
+    def _prune(self, now):
+        """Elimina le voci scadute e, oltre il limite, quelle usate meno di recente."""
+        self._writes_since_prune = 0
+        self._conn.execute("DELETE FROM entries WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,))
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()
+        if count > self.max_entries:
+            self._conn.execute(
+                "DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY accessed_at LIMIT ?)",
+                (count - self.max_entries,)
+            )
+
+    def delete(self, key):
+        with self._lock:
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
 
 class CacheManager:
-    def __init__(self):
-        self.cache = {}  # Dizionario per memorizzare i dati della cache
+    """
+    Cache a due livelli: LRU in memoria limitata a MAX_CACHE_SIZE voci, con un archivio
+    persistente su disco alle spalle che sopravvive ai riavvii dell'applicazione.
+    """
+
+    def __init__(self, max_size=MAX_CACHE_SIZE, disk_path=None):
+        self.max_size = max_size
+        self.cache = OrderedDict()  # Livello in memoria, ordinato dal meno al più recente
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+
+        if disk_path is None:
+            disk_path = os.path.join(CACHE_DIR, CACHE_DB_FILENAME)
+        try:
+            self.disk = DiskCache(disk_path)
+        except (sqlite3.Error, OSError) as e:
+            logging.error("Impossibile aprire la cache su disco (%s), uso solo la memoria: %s", disk_path, e)
+            self.disk = None
 
-    @lru_cache(maxsize=32)
     def get_cached_data(self, key):
         """
         Funzione per ottenere i dati memorizzati nella cache utilizzando una chiave specifica.
-        
+
         Args:
             key (str): La chiave per cui recuperare i dati nella cache.
-        
+
         Returns:
             object: I dati memorizzati nella cache o None se non presenti.
         """
-        return self.cache.get(key)
+        with self._lock:
+            if key in self.cache:
+                self.cache.move_to_end(key)
+                self.hits += 1
+                return self.cache[key]
+
+        if self.disk is not None:
+            found, data = self.disk.get(key)
+            if found:
+                with self._lock:
+                    self._store_in_memory(key, data)
+                    self.hits += 1
+                    self.disk_hits += 1
+                return data
+
+        with self._lock:
+            self.misses += 1
+        return None
 
-    def cache_data(self, key, data):
+    def cache_data(self, key, data, version=None):
         """
         Funzione per memorizzare i dati nella cache associandoli a una chiave specifica.
-        
+
         Args:
             key (str): La chiave con cui memorizzare i dati.
             data (object): I dati da memorizzare nella cache.
+            version (str): "vigente" o "originale", determina la scadenza della voce su disco.
         """
+        with self._lock:
+            self._store_in_memory(key, data)
+
+        if self.disk is not None:
+            try:
+                self.disk.set(key, data, ttl=ttl_for_version(version))
+            except (sqlite3.Error, pickle.PicklingError, TypeError) as e:
+                logging.error("Impossibile salvare la voce %s nella cache su disco: %s", key, e)
+
+    def _store_in_memory(self, key, data):
         self.cache[key] = data
+        self.cache.move_to_end(key)
+        while len(self.cache) > self.max_size:
+            self.cache.popitem(last=False)
+
+    def stats(self):
+        """
+        Restituisce le statistiche di utilizzo della cache.
+
+        Returns:
+            dict: Contatori di hit (totali e da disco), miss e numero di voci in memoria.
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'memory_entries': len(self.cache),
+            }
 
     def clear_cache(self):
         """
         Funzione per cancellare tutti i dati nella cache.
         """
-        self.cache.clear()
+        with self._lock:
+            self.cache.clear()
+        if self.disk is not None:
+            self.disk.clear()
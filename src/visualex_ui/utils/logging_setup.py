@@ -0,0 +1,135 @@
+# visualex_ui/utils/logging_setup.py
+
+import os
+import logging
+import logging.handlers
+import threading
+from ..tools.config import (
+    CACHE_DIR, LOG_LEVEL, LOG_FILENAME, LOG_BUFFER_CAPACITY, LOG_SAMPLE_BURST, LOG_SAMPLE_EVERY
+)
+
+LOG_FORMAT = '%(asctime)s %(levelname)s %(message)s'
+
+# Da passare come extra= ai log ripetuti per ogni elemento di una risposta o di un ciclo
+SAMPLED = {'sampled': True}
+
+_configured = False
+_configure_lock = threading.Lock()
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Limita i record marcati come campionati (extra=SAMPLED): per ogni punto del codice che li emette
+    lascia passare i primi `burst`, poi uno ogni `every`. Gli altri record passano sempre.
+    """
+
+    def __init__(self, burst=LOG_SAMPLE_BURST, every=LOG_SAMPLE_EVERY):
+        super().__init__()
+        self.burst = burst
+        self.every = every
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if not getattr(record, 'sampled', False):
+            return True
+        key = (record.pathname, record.lineno)
+        with self._lock:
+            count = self._counts.get(key, 0) + 1
+            self._counts[key] = count
+        if count <= self.burst:
+            return True
+        return bool(self.every) and (count - self.burst) % self.every == 0
+
+
+class summarize:
+    """
+    Riassunto di un payload per i log: tipo, numero di elementi e dimensione, mai il contenuto.
+    Il riassunto è calcolato solo se il record viene effettivamente formattato.
+    """
+    __slots__ = ('payload',)
+
+    def __init__(self, payload):
+        self.payload = payload
+
+    def __str__(self):
+        payload = self.payload
+        if isinstance(payload, (bytes, bytearray)):
+            return f"{type(payload).__name__} di {_format_size(len(payload))}"
+        if isinstance(payload, str):
+            return f"testo di {_format_size(len(payload.encode('utf-8', 'replace')))}"
+        if isinstance(payload, dict):
+            keys = ", ".join(str(key) for key in list(payload)[:8])
+            if len(payload) > 8:
+                keys += ", ..."
+            return f"dict con {len(payload)} chiavi ({keys})"
+        if isinstance(payload, (list, tuple, set, frozenset)):
+            return f"{type(payload).__name__} di {len(payload)} elementi"
+        if payload is None:
+            return "None"
+        return type(payload).__name__
+
+    __repr__ = __str__
+
+
+def _format_size(size):
+    if size < 1024:
+        return f"{size} B"
+    if size < 1024 * 1024:
+        return f"{size / 1024:.1f} KB"
+    return f"{size / (1024 * 1024):.1f} MB"
+
+
+def log_file_path():
+    """Restituisce il percorso del file di log."""
+    return os.path.join(CACHE_DIR, LOG_FILENAME)
+
+
+def setup_logging(level=None, log_file=True):
+    """
+    Configura il logging dell'applicazione. Va chiamata una sola volta all'avvio; le chiamate successive
+    aggiornano solo il livello.
+
+    I record vanno sulla console e, attraverso un MemoryHandler, nel file di log: il file viene scritto
+    a blocchi di LOG_BUFFER_CAPACITY record, subito in caso di WARNING o superiore, e alla chiusura.
+
+    Args:
+        level (str|int): Livello di logging. Se assente si usa VISUALEX_LOG_LEVEL o LOG_LEVEL.
+        log_file (bool): Se False i record vanno solo sulla console.
+    """
+    global _configured
+    level = level or os.environ.get('VISUALEX_LOG_LEVEL') or LOG_LEVEL
+    if isinstance(level, str):
+        level = logging.getLevelName(level.upper())
+        if not isinstance(level, int):
+            level = logging.INFO
+    root = logging.getLogger()
+
+    with _configure_lock:
+        root.setLevel(level)
+        if _configured:
+            return root
+        _configured = True
+
+        formatter = logging.Formatter(LOG_FORMAT)
+
+        console = logging.StreamHandler()
+        console.setFormatter(formatter)
+        console.addFilter(SamplingFilter())
+        root.addHandler(console)
+
+        if log_file:
+            path = log_file_path()
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                file_handler = logging.FileHandler(path, encoding='utf-8', delay=True)
+            except OSError as e:
+                logging.warning("Impossibile aprire il file di log %s: %s", path, e)
+            else:
+                file_handler.setFormatter(formatter)
+                buffered = logging.handlers.MemoryHandler(
+                    LOG_BUFFER_CAPACITY, flushLevel=logging.WARNING, target=file_handler
+                )
+                buffered.addFilter(SamplingFilter())  # Un filtro per handler: ognuno conta i record che riceve
+                root.addHandler(buffered)
+    return root
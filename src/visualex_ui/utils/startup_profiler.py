@@ -0,0 +1,255 @@
+# visualex_ui/utils/startup_profiler.py
+
+import os
+import sys
+import json
+import time
+import logging
+import datetime
+import statistics
+import threading
+from importlib.abc import MetaPathFinder
+from ..tools.config import (
+    CACHE_DIR, STARTUP_BUDGET_MS, STARTUP_HISTORY_FILENAME, STARTUP_HISTORY_MAX, STARTUP_HISTORY_TREND,
+    STARTUP_REPORT_TOP
+)
+
+# Istante di riferimento: main.py importa questo modulo prima di ogni altra dipendenza
+_START = time.perf_counter()
+
+
+def profiling_requested(argv=None):
+    """Indica se è stato chiesto il profilo dettagliato dell'avvio (--profile-startup o VISUALEX_PROFILE_STARTUP)."""
+    argv = sys.argv if argv is None else argv
+    return "--profile-startup" in argv or os.environ.get("VISUALEX_PROFILE_STARTUP", "") not in ("", "0")
+
+
+class _TimedLoader:
+    """Avvolge il loader di un modulo per misurarne l'esecuzione; ogni altro attributo è quello del loader."""
+
+    def __init__(self, loader, timer):
+        self._loader = loader
+        self._timer = timer
+
+    def __getattr__(self, name):
+        return getattr(self._loader, name)
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        # Il modulo conserva il loader originale: il proxy serve solo durante l'esecuzione
+        module.__loader__ = self._loader
+        if getattr(module, "__spec__", None) is not None:
+            module.__spec__.loader = self._loader
+        with self._timer.timing(module.__name__):
+            self._loader.exec_module(module)
+
+
+class ImportTimer(MetaPathFinder):
+    """
+    Misura il tempo di import di ogni modulo caricato mentre è installato in sys.meta_path.
+
+    Per ogni modulo registra il tempo totale (compresi i moduli che importa) e il tempo proprio
+    (escluso quello dei moduli importati), come `python -X importtime`.
+    """
+
+    def __init__(self):
+        self.timings = {}  # modulo -> (tempo proprio, tempo totale) in secondi
+        self._stack = []  # [nome, tempo dei moduli figli] dei moduli in esecuzione
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def install(self):
+        if self not in sys.meta_path:
+            sys.meta_path.insert(0, self)
+
+    def uninstall(self):
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def find_spec(self, fullname, path, target=None):
+        if getattr(self._local, "searching", False) or threading.current_thread() is not threading.main_thread():
+            return None
+        self._local.searching = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self._local.searching = False
+        if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+            spec.loader = _TimedLoader(spec.loader, self)
+        return spec
+
+    def timing(self, name):
+        return _ImportFrame(self, name)
+
+    def top(self, count=STARTUP_REPORT_TOP):
+        """Restituisce i `count` moduli con il tempo proprio più alto come (nome, proprio, totale)."""
+        ranked = sorted(self.timings.items(), key=lambda item: item[1][0], reverse=True)
+        return [(name, own, total) for name, (own, total) in ranked[:count]]
+
+
+class _ImportFrame:
+    __slots__ = ("timer", "name", "start")
+
+    def __init__(self, timer, name):
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self):
+        self.timer._stack.append([self.name, 0.0])
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        total = time.perf_counter() - self.start
+        stack = self.timer._stack
+        _, children = stack.pop()
+        if stack:
+            stack[-1][1] += total
+        with self.timer._lock:
+            self.timer.timings[self.name] = (total - children, total)
+        return False
+
+
+class StartupProfiler:
+    """
+    Misura l'avvio dell'applicazione: le fasi segnate con mark() e, se richiesto, l'import di ogni modulo.
+
+    Il tempo fino alla prima finestra è sempre aggiunto allo storico (STARTUP_HISTORY_FILENAME in CACHE_DIR),
+    così da poterlo confrontare fra versioni con STARTUP_BUDGET_MS; il rapporto per modulo è prodotto
+    solo con il profilo dettagliato, perché l'hook sugli import ha un costo.
+    """
+
+    def __init__(self, detailed=False):
+        self.detailed = detailed
+        self.phases = []  # (nome, millisecondi dall'avvio)
+        self.import_timer = ImportTimer() if detailed else None
+        self._finished = False
+        if self.import_timer is not None:
+            self.import_timer.install()
+
+    @staticmethod
+    def elapsed_ms():
+        return (time.perf_counter() - _START) * 1000
+
+    def mark(self, phase):
+        """Registra la fine di una fase dell'avvio."""
+        elapsed = self.elapsed_ms()
+        self.phases.append((phase, elapsed))
+        logging.debug("Avvio: %s dopo %.0f ms", phase, elapsed)
+        return elapsed
+
+    def finish(self, phase="prima finestra"):
+        """
+        Chiude la misura: segna l'ultima fase, registra l'avvio nello storico e, con il profilo dettagliato,
+        scrive il rapporto nel log. Le chiamate successive alla prima non fanno nulla.
+
+        Returns:
+            float: Millisecondi dall'avvio alla fase finale.
+        """
+        if self._finished:
+            return self.phases[-1][1]
+        self._finished = True
+        total = self.mark(phase)
+        if self.import_timer is not None:
+            self.import_timer.uninstall()
+
+        history = append_history({
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "total_ms": round(total, 1),
+            "phases": {name: round(elapsed, 1) for name, elapsed in self.phases},
+            "python": sys.version.split()[0],
+            "frozen": bool(getattr(sys, "frozen", False)),
+        })
+        recent = [entry["total_ms"] for entry in history[-STARTUP_HISTORY_TREND:]]
+
+        if total > STARTUP_BUDGET_MS:
+            logging.warning("Avvio in %.0f ms, oltre il budget di %s ms", total, STARTUP_BUDGET_MS)
+        else:
+            logging.info("Avvio in %.0f ms (budget %s ms)", total, STARTUP_BUDGET_MS)
+        if self.detailed:
+            logging.info("%s", self.report(recent))
+        return total
+
+    def report(self, recent=()):
+        """Restituisce il rapporto testuale delle fasi, dei moduli più lenti e dell'andamento recente."""
+        lines = ["Profilo dell'avvio:"]
+        previous = 0.0
+        for name, elapsed in self.phases:
+            lines.append(f"  {name:<30} {elapsed:8.0f} ms  (+{elapsed - previous:.0f} ms)")
+            previous = elapsed
+        if self.import_timer is not None and self.import_timer.timings:
+            lines.append(f"  Moduli più lenti ({len(self.import_timer.timings)} importati), proprio / totale:")
+            for name, own, total in self.import_timer.top():
+                lines.append(f"    {name:<50} {own * 1000:8.1f} ms {total * 1000:8.1f} ms")
+        if recent:
+            lines.append(f"  Mediana degli ultimi {len(recent)} avvii: {statistics.median(recent):.0f} ms "
+                         f"(budget {STARTUP_BUDGET_MS} ms)")
+        return "\n".join(lines)
+
+
+def history_path():
+    """Restituisce il percorso dello storico degli avvii."""
+    return os.path.join(CACHE_DIR, STARTUP_HISTORY_FILENAME)
+
+
+def load_history():
+    """Legge lo storico degli avvii, dal più vecchio al più recente; le righe illeggibili sono ignorate."""
+    entries = []
+    try:
+        with open(history_path(), encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(entry, dict) and isinstance(entry.get("total_ms"), (int, float)):
+                    entries.append(entry)
+    except OSError:
+        pass
+    return entries
+
+
+def append_history(entry):
+    """
+    Aggiunge un avvio allo storico, tenendo soltanto gli ultimi STARTUP_HISTORY_MAX.
+
+    Returns:
+        list: Lo storico aggiornato.
+    """
+    history = load_history() + [entry]
+    path = history_path()
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if len(history) > STARTUP_HISTORY_MAX:
+            history = history[-STARTUP_HISTORY_MAX:]
+            with open(path, "w", encoding="utf-8") as f:
+                f.writelines(json.dumps(item) + "\n" for item in history)
+        else:
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+    except OSError as e:
+        logging.warning("Impossibile aggiornare lo storico degli avvii %s: %s", path, e)
+    return history
+
+
+if __name__ == "__main__":
+    # Andamento dell'avvio: python -m visualex_ui.utils.startup_profiler
+    history = load_history()
+    if not history:
+        print(f"Nessun avvio registrato in {history_path()}")
+        sys.exit(0)
+    for entry in history[-STARTUP_HISTORY_TREND:]:
+        flag = "  oltre il budget" if entry["total_ms"] > STARTUP_BUDGET_MS else ""
+        print(f"{entry.get('timestamp', '?'):<20} {entry['total_ms']:8.0f} ms{flag}")
+    totals = [entry["total_ms"] for entry in history]
+    print(f"Mediana: ultimi {min(len(totals), STARTUP_HISTORY_TREND)} avvii "
+          f"{statistics.median(totals[-STARTUP_HISTORY_TREND:]):.0f} ms, "
+          f"tutti i {len(totals)} avvii {statistics.median(totals):.0f} ms (budget {STARTUP_BUDGET_MS} ms)")
@@ -1,6 +1,5 @@
 # updater.py
 
-import requests
 import sys
 import os
 import shutil
@@ -9,13 +8,22 @@ import zipfile
 import platform
 import subprocess
 import logging
+import time
 
 from PyQt6.QtCore import QObject, pyqtSignal, pyqtSlot, QThread
 from PyQt6.QtWidgets import (
     QDialog, QVBoxLayout, QLabel, QProgressBar, QPushButton, QTextEdit, QMessageBox
 )
-from PyQt6.QtCore import QMetaObject, Qt
+from PyQt6.QtCore import QMetaObject, Qt, QSettings
 from .helpers import get_resource_path
+from ..network.http_client import get_session
+from ..tools.config import UPDATE_VERSION_URL, UPDATE_CHECK_INTERVAL, UPDATE_CHECK_TIMEOUT
+
+# Chiavi di QSettings con l'esito dell'ultimo controllo riuscito
+_SETTING_LAST_CHECK = "update/last_check"
+_SETTING_LATEST_VERSION = "update/latest_version"
+_SETTING_ETAG = "update/etag"
+_SETTING_LAST_MODIFIED = "update/last_modified"
 
 class ProgressDialog(QDialog):
     update_status_signal = pyqtSignal(str)
@@ -72,44 +80,62 @@ class ProgressDialog(QDialog):
 
 class UpdateCheckWorker(QObject):
     update_checked = pyqtSignal(bool, str)  # is_newer, latest_version
+    version_fetched = pyqtSignal(str, str, str)  # latest_version, etag, last_modified: solo se il controllo è riuscito
     finished = pyqtSignal()  # Segnale per indicare che il lavoro è terminato
 
-    def __init__(self, current_version):
+    def __init__(self, current_version, cached_version=None, etag=None, last_modified=None):
         super().__init__()
         self.current_version = current_version
+        # Validatori della risposta precedente: se il file non è cambiato il server risponde 304 senza corpo
+        self.cached_version = cached_version
+        self.etag = etag
+        self.last_modified = last_modified
 
     @pyqtSlot()
     def check_for_update(self):
-        logging.debug(f"Avvio del controllo aggiornamenti. Versione attuale: {self.current_version}")
+        logging.debug("Avvio del controllo aggiornamenti. Versione attuale: %s", self.current_version)
         try:
-            # URL del tuo file version.txt su GitHub
-            version_url = "https://raw.githubusercontent.com/capazme/VisuaLexUI/main/src/visualex_ui/resources/version.txt"
-            logging.debug(f"Controllo della versione remota: {version_url}")
-
-            response = requests.get(version_url, timeout=5)
-            if response.status_code == 200:
+            logging.debug("Controllo della versione remota: %s", UPDATE_VERSION_URL)
+            headers = {}
+            if self.cached_version:
+                if self.etag:
+                    headers['If-None-Match'] = self.etag
+                if self.last_modified:
+                    headers['If-Modified-Since'] = self.last_modified
+
+            response = get_session().get(UPDATE_VERSION_URL, headers=headers, timeout=UPDATE_CHECK_TIMEOUT)
+            if response.status_code == 304 and self.cached_version:
+                logging.debug("Versione remota invariata (304 Not Modified): %s", self.cached_version)
+                self.version_fetched.emit(self.cached_version, response.headers.get('ETag') or self.etag or "",
+                                          response.headers.get('Last-Modified') or self.last_modified or "")
+                is_newer = self.is_newer_version(self.current_version, self.cached_version)
+                self.update_checked.emit(is_newer, self.cached_version)
+            elif response.status_code == 200:
                 latest_version = response.text.strip()
-                logging.debug(f"Versione remota ottenuta: {latest_version}")
+                logging.debug("Versione remota ottenuta: %s", latest_version)
+                self.version_fetched.emit(latest_version, response.headers.get('ETag') or "",
+                                          response.headers.get('Last-Modified') or "")
                 is_newer = self.is_newer_version(self.current_version, latest_version)
                 self.update_checked.emit(is_newer, latest_version)
             else:
-                logging.error(f"Errore nel recupero della versione dal server. Codice di stato: {response.status_code}")
+                logging.error("Errore nel recupero della versione dal server. Codice di stato: %s", response.status_code)
                 self.update_checked.emit(False, self.current_version)
         except Exception as e:
-            logging.error(f"Errore durante il controllo degli aggiornamenti: {e}")
+            logging.error("Errore durante il controllo degli aggiornamenti: %s", e)
             self.update_checked.emit(False, self.current_version)
         finally:
             self.finished.emit()  # Emesso in ogni caso per terminare il thread
 
-    def is_newer_version(self, current_version, latest_version):
+    @staticmethod
+    def is_newer_version(current_version, latest_version):
         """Confronta le versioni."""
         try:
-            logging.debug(f"Confronto delle versioni. Attuale: {current_version}, Remota: {latest_version}")
+            logging.debug("Confronto delle versioni. Attuale: %s, Remota: %s", current_version, latest_version)
             def parse_version(v):
                 return [int(x) for x in v.split('.')]
             return parse_version(latest_version) > parse_version(current_version)
         except ValueError as e:
-            logging.error(f"Errore durante il parsing delle versioni: {e}")
+            logging.error("Errore durante il parsing delle versioni: %s", e)
             return False
 
 
@@ -131,7 +157,7 @@ class UpdateDownloadWorker(QObject):
             repo_zip_url = "https://github.com/capazme/VisuaLexUI/archive/refs/heads/main.zip"
             self.log_message_signal.emit(f"Scaricamento della repository da {repo_zip_url}...")
 
-            response = requests.get(repo_zip_url, stream=True)
+            response = get_session().get(repo_zip_url, stream=True)
             total_length = response.headers.get('content-length')
 
             if response.status_code == 200:
@@ -229,7 +255,7 @@ class UpdateDownloadWorker(QObject):
                 stdout, stderr = process.communicate()
                 if stderr:
                     self.log_message_signal.emit(f"Errori build: {stderr}")
-                    logging.error(f"Errori build: {stderr}")
+                    logging.error("Errori build: %s", stderr)
 
                 if process.returncode != 0:
                     self.log_message_signal.emit(f"Lo script di build ha fallito con codice di ritorno {process.returncode}")
@@ -253,7 +279,7 @@ class UpdateDownloadWorker(QObject):
                 self.update_completed_signal.emit(False, "Errore nel download della repository.")
 
         except Exception as e:
-            logging.error(f"Errore durante l'aggiornamento: {e}", exc_info=True)
+            logging.error("Errore durante l'aggiornamento: %s", e, exc_info=True)
             self.log_message_signal.emit(f"Errore durante l'aggiornamento: {e}")
             self.update_completed_signal.emit(False, f"Errore durante l'aggiornamento: {e}")
 
@@ -265,19 +291,34 @@ class UpdateNotifier(QObject):
         super().__init__()
         self.parent = parent
         self.latest_version = None
+        self.silent = False  # Se True il controllo in corso non mostra nulla quando non ci sono aggiornamenti
+        self.settings = QSettings("NormaApp", "NormaViewer")
         self.update_thread = None  # Thread per il controllo degli aggiornamenti
         self.download_thread = None  # Thread per il download e l'aggiornamento
         self.update_worker = None  # Worker per il controllo degli aggiornamenti
 
-    def check_for_update(self, current_version):
-        """Avvia un thread per controllare gli aggiornamenti."""
+    def check_for_update(self, current_version, silent=False):
+        """
+        Avvia un thread per controllare gli aggiornamenti.
+
+        Args:
+            current_version (str): Versione dell'applicazione in esecuzione.
+            silent (bool): Se True non si mostra alcun messaggio quando l'applicazione è già aggiornata.
+        """
         if self.update_thread is not None:
             logging.warning("Controllo aggiornamenti già in esecuzione.")
             return
-
-        # Inizializza il worker per il controllo degli aggiornamenti
-        self.update_worker = UpdateCheckWorker(current_version)
+        self.silent = silent
+
+        # Inizializza il worker per il controllo degli aggiornamenti, con i validatori dell'ultima risposta
+        self.update_worker = UpdateCheckWorker(
+            current_version,
+            cached_version=self.settings.value(_SETTING_LATEST_VERSION, "", type=str),
+            etag=self.settings.value(_SETTING_ETAG, "", type=str),
+            last_modified=self.settings.value(_SETTING_LAST_MODIFIED, "", type=str),
+        )
         self.update_worker.update_checked.connect(self.on_update_checked, Qt.ConnectionType.QueuedConnection)
+        self.update_worker.version_fetched.connect(self.on_version_fetched, Qt.ConnectionType.QueuedConnection)
         self.update_worker.finished.connect(self.on_update_thread_finished)  # Connetti il segnale finished
 
         # Crea un nuovo thread
@@ -288,6 +329,29 @@ class UpdateNotifier(QObject):
         self.update_thread.started.connect(self.update_worker.check_for_update)
         self.update_thread.start()
 
+    def check_for_update_in_background(self, current_version):
+        """
+        Controllo automatico: riusa l'esito dell'ultimo controllo se ha meno di UPDATE_CHECK_INTERVAL secondi,
+        altrimenti interroga il server. In entrambi i casi avvisa solo se c'è una versione più recente.
+        """
+        last_check = self.settings.value(_SETTING_LAST_CHECK, 0.0, type=float)
+        cached_version = self.settings.value(_SETTING_LATEST_VERSION, "", type=str)
+        if cached_version and 0 <= time.time() - last_check < UPDATE_CHECK_INTERVAL:
+            logging.debug("Controllo aggiornamenti saltato: ultimo controllo %.0f secondi fa", time.time() - last_check)
+            if UpdateCheckWorker.is_newer_version(current_version, cached_version):
+                self.silent = True
+                self.on_update_checked(True, cached_version)
+            return
+        self.check_for_update(current_version, silent=True)
+
+    @pyqtSlot(str, str, str)
+    def on_version_fetched(self, latest_version, etag, last_modified):
+        """Memorizza in QSettings l'esito del controllo riuscito e i validatori per la richiesta successiva."""
+        self.settings.setValue(_SETTING_LAST_CHECK, time.time())
+        self.settings.setValue(_SETTING_LATEST_VERSION, latest_version)
+        self.settings.setValue(_SETTING_ETAG, etag)
+        self.settings.setValue(_SETTING_LAST_MODIFIED, last_modified)
+
     def on_update_thread_finished(self):
         """Chiamato quando il worker ha finito il controllo degli aggiornamenti."""
         logging.debug("Il worker di controllo aggiornamenti ha terminato.")
@@ -304,11 +368,13 @@ class UpdateNotifier(QObject):
     @pyqtSlot(bool, str)
     def on_update_checked(self, is_newer, latest_version):
         self.latest_version = latest_version
-        logging.debug(f"on_update_checked: self.latest_version impostato a {self.latest_version}")
+        logging.debug("on_update_checked: self.latest_version impostato a %s", self.latest_version)
 
         if is_newer:
-            logging.info(f"Trovata nuova versione: {latest_version}. Avvio del processo di aggiornamento.")
+            logging.info("Trovata nuova versione: %s. Avvio del processo di aggiornamento.", latest_version)
             self.prompt_update()
+        elif self.silent:
+            logging.debug("L'applicazione è già aggiornata.")
         else:
             logging.info("L'applicazione è già aggiornata.")
             QMetaObject.invokeMethod(
@@ -319,7 +385,7 @@ class UpdateNotifier(QObject):
 
     @pyqtSlot()
     def prompt_update(self):
-        logging.debug(f"prompt_update: self.latest_version è {self.latest_version}")
+        logging.debug("prompt_update: self.latest_version è %s", self.latest_version)
 
         reply = QMessageBox.question(
             self.parent,
@@ -379,4 +445,4 @@ class UpdateNotifier(QObject):
             subprocess.Popen(['open', os.path.dirname(message)])
         else:
             QMessageBox.warning(self.parent, "Update Failed", message)
-            logging.error(f"Update failed: {message}")
+            logging.error("Update failed: %s", message)